@@ -27,3 +27,15 @@ DEFAULT_INTEREST_RATES = {
     "Car Loan": 9.5,
     "Personal Loan": 12.5
 }
+
+# Large file downloads and resumable uploads go through a small HTTP server instead of Streamlit widgets
+DOWNLOAD_SERVER_HOST = os.getenv('DOWNLOAD_SERVER_HOST', '127.0.0.1')
+DOWNLOAD_SERVER_PORT = int(os.getenv('DOWNLOAD_SERVER_PORT', '8765'))
+DOWNLOAD_BASE_URL = os.getenv('DOWNLOAD_BASE_URL', f'http://localhost:{DOWNLOAD_SERVER_PORT}')
+
+# Docker Engine API socket for local Docker tools
+DOCKER_SOCKET = os.getenv('DOCKER_SOCKET', '/var/run/docker.sock')
+
+# Docker Compose project discovery: roots separated by os.pathsep, directory globs to skip separated by commas
+COMPOSE_ROOTS = os.getenv('COMPOSE_ROOTS', '.').split(os.pathsep)
+COMPOSE_EXCLUDE = os.getenv('COMPOSE_EXCLUDE', '.git,node_modules,__pycache__,.venv,venv,.tox,.cache').split(',')
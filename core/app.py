@@ -1,5 +1,7 @@
 # App initialization and styling
 import streamlit as st
+from core.metrics_sampler import get_sampler
+from core.utils import format_bytes, format_duration, sparkline_svg
 
 def initialize_app():
     """Initialize the app with custom styling and branding"""
@@ -203,20 +205,26 @@ def create_header():
     """, unsafe_allow_html=True)
 
 def create_metrics():
-    """Create dashboard metrics"""
-    st.markdown("""
+    """Create dashboard metrics from the background sampler"""
+    sampler = get_sampler()
+    latest = sampler.latest
+    cpu_load = f"{latest['load_avg']:.2f}" if latest['load_avg'] is not None else f"{latest['cpu_percent']:.0f}%"
+    cpu_spark = sparkline_svg(sampler.history("cpu_percent", 60))
+    ram_spark = sparkline_svg(sampler.history("memory_percent", 60))
+    
+    st.markdown(f"""
     <div style="display: flex; justify-content: space-between; margin-bottom: 30px;">
         <div style="background-color: white; padding: 20px; border-radius: 10px; width: 30%; box-shadow: 0 4px 10px rgba(0,0,0,0.05); border-top: 4px solid #6a0dad;">
             <h3 style="margin: 0; color: #333333; font-size: 16px;">Server Uptime</h3>
-            <p style="margin: 0; font-size: 24px; font-weight: 600; color: #6a0dad;">5 days</p>
+            <p style="margin: 0; font-size: 24px; font-weight: 600; color: #6a0dad;">{format_duration(latest['uptime_seconds'])}</p>
         </div>
         <div style="background-color: white; padding: 20px; border-radius: 10px; width: 30%; box-shadow: 0 4px 10px rgba(0,0,0,0.05); border-top: 4px solid #6a0dad;">
             <h3 style="margin: 0; color: #333333; font-size: 16px;">CPU Load</h3>
-            <p style="margin: 0; font-size: 24px; font-weight: 600; color: #6a0dad;">0.67</p>
+            <p style="margin: 0; font-size: 24px; font-weight: 600; color: #6a0dad;">{cpu_load}</p>{cpu_spark}
         </div>
         <div style="background-color: white; padding: 20px; border-radius: 10px; width: 30%; box-shadow: 0 4px 10px rgba(0,0,0,0.05); border-top: 4px solid #6a0dad;">
             <h3 style="margin: 0; color: #333333; font-size: 16px;">RAM Usage</h3>
-            <p style="margin: 0; font-size: 24px; font-weight: 600; color: #6a0dad;">3.2 GB / 8 GB</p>
+            <p style="margin: 0; font-size: 24px; font-weight: 600; color: #6a0dad;">{format_bytes(latest['memory_used'])} / {format_bytes(latest['memory_total'])}</p>{ram_spark}
         </div>
     </div>
     """, unsafe_allow_html=True)
@@ -321,25 +329,30 @@ def create_sidebar():
             st.rerun()
         st.markdown("<div style='text-align:center;font-size:12px;'>User</div>", unsafe_allow_html=True)
     
-    # System stats in footer
-    st.sidebar.markdown("""
+    # System stats in footer, read from the background sampler
+    sampler = get_sampler()
+    info = sampler.static_info
+    cpu_freq = f" @ {info['cpu_freq_mhz'] / 1000:.1f}GHz" if info['cpu_freq_mhz'] else ""
+    net_speed = f"{info['net_speed_mbps'] / 1000:g}Gbps" if info['net_speed_mbps'] >= 1000 else f"{info['net_speed_mbps']}Mbps"
+    disk_io = [r + w for r, w in zip(sampler.history("disk_read_bps", 60), sampler.history("disk_write_bps", 60))]
+    net_io = [s + r for s, r in zip(sampler.history("net_sent_bps", 60), sampler.history("net_recv_bps", 60))]
+    latest = sampler.latest
+    
+    def stat_row(icon, text, spark, last=False):
+        margin = "" if last else " margin-bottom: 10px;"
+        # Stripped so no blank line ends the surrounding HTML block
+        return f"""
+        <div style="display: flex; align-items: center;{margin}">
+            <div style="background: linear-gradient(135deg, #333333 0%, #6a0dad 100%); color: white; width: 30px; height: 30px; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 10px; flex-shrink: 0;">{icon}</div>
+            <div><p style="margin: 0;">{text}</p>{spark}</div>
+        </div>""".strip()
+    
+    st.sidebar.markdown(f"""
     <div style="margin-top: 50px; padding: 20px; background: white; border-radius: 10px; font-size: 0.8rem; box-shadow: 0 4px 10px rgba(0,0,0,0.05); border-left: 4px solid #6a0dad;">
         <h4 style="color: #333333; margin-bottom: 15px; font-size: 1rem; font-weight: 600;">System Stats</h4>
-        <div style="display: flex; align-items: center; margin-bottom: 10px;">
-            <div style="background: linear-gradient(135deg, #333333 0%, #6a0dad 100%); color: white; width: 30px; height: 30px; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 10px;">🖥️</div>
-            <p style="margin: 0;">CPU: 4 cores @ 2.5GHz</p>
-        </div>
-        <div style="display: flex; align-items: center; margin-bottom: 10px;">
-            <div style="background: linear-gradient(135deg, #333333 0%, #6a0dad 100%); color: white; width: 30px; height: 30px; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 10px;">🧠</div>
-            <p style="margin: 0;">Memory: 8GB DDR4</p>
-        </div>
-        <div style="display: flex; align-items: center; margin-bottom: 10px;">
-            <div style="background: linear-gradient(135deg, #333333 0%, #6a0dad 100%); color: white; width: 30px; height: 30px; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 10px;">💾</div>
-            <p style="margin: 0;">Storage: 256GB SSD</p>
-        </div>
-        <div style="display: flex; align-items: center;">
-            <div style="background: linear-gradient(135deg, #333333 0%, #6a0dad 100%); color: white; width: 30px; height: 30px; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 10px;">🌐</div>
-            <p style="margin: 0;">Network: 1Gbps Ethernet</p>
-        </div>
+        {stat_row("🖥️", f"CPU: {info['cpu_cores']} cores{cpu_freq} ({latest['cpu_percent']:.0f}%)", sparkline_svg(sampler.history("cpu_percent", 60)))}
+        {stat_row("🧠", f"Memory: {format_bytes(info['memory_total'])} ({latest['memory_percent']:.0f}% used)", sparkline_svg(sampler.history("memory_percent", 60)))}
+        {stat_row("💾", f"Storage: {format_bytes(info['disk_total'])} ({format_bytes(latest['disk_read_bps'] + latest['disk_write_bps'])}/s)", sparkline_svg(disk_io))}
+        {stat_row("🌐", f"Network: {net_speed} ({format_bytes(latest['net_sent_bps'] + latest['net_recv_bps'])}/s)", sparkline_svg(net_io), last=True)}
     </div>
     """, unsafe_allow_html=True)
@@ -0,0 +1,179 @@
+# Streaming zip creation and extraction
+#
+# Members are copied in fixed-size chunks, so memory stays flat whatever the
+# size of the folder or archive. Jobs run on a background thread and expose
+# progress counters that pages poll. Extraction checks the central directory
+# against size, ratio and member-count limits before writing anything, and
+# still counts real bytes while writing in case the headers lie.
+import os
+import shutil
+import stat
+import threading
+import time
+import zipfile
+
+CHUNK_SIZE = 1024 * 1024
+
+# Already-compressed formats gain nothing from deflate, so they are stored
+STORED_EXTENSIONS = {
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar", ".jar", ".whl",
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic",
+    ".mp3", ".aac", ".ogg", ".flac", ".mp4", ".mkv", ".avi", ".mov", ".webm",
+    ".docx", ".xlsx", ".pptx", ".odt",
+}
+
+DEFAULT_MAX_EXTRACT_BYTES = 20 * 1024 ** 3
+DEFAULT_MAX_RATIO = 200
+DEFAULT_MAX_MEMBERS = 200000
+
+class ArchiveError(Exception):
+    """Raised when an archive is rejected or a job is cancelled"""
+
+class ArchiveJob:
+    """Progress of a zip or unzip running on a background thread"""
+
+    def __init__(self, description):
+        self.description = description
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.total_files = 0
+        self.done_files = 0
+        self.current = ""
+        self.error = None
+        self.result = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    @property
+    def fraction(self):
+        return self.done_bytes / self.total_bytes if self.total_bytes else (1.0 if self.finished else 0.0)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise ArchiveError("Cancelled")
+
+    def start(self, target, *args, **kwargs):
+        def run():
+            try:
+                self.result = target(*args, job=self, **kwargs)
+            except Exception as e:
+                self.error = str(e)
+            finally:
+                self.finished_at = time.time()
+
+        self._thread = threading.Thread(target=run, name="archive-job", daemon=True)
+        self._thread.start()
+        return self
+
+def _copy_stream(source, target, job, limit=None):
+    """Copy in chunks, updating progress; stop if more than limit bytes arrive"""
+    written = 0
+    while True:
+        if job:
+            job.check_cancelled()
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return written
+        written += len(chunk)
+        if limit is not None and written > limit:
+            raise ArchiveError("Member is larger than its header declares; possible zip bomb")
+        target.write(chunk)
+        if job:
+            job.done_bytes += len(chunk)
+
+def zip_folder(src_dir, zip_path, compresslevel=6, job=None):
+    """Zip a folder into zip_path, streaming each file; returns the archive size"""
+    src_dir = os.path.abspath(src_dir)
+    zip_path = os.path.abspath(zip_path)
+    files = []
+    for root, dirs, names in os.walk(src_dir):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if path == zip_path or not os.path.isfile(path) or os.path.islink(path):
+                continue
+            files.append((path, os.path.getsize(path)))
+    if job:
+        job.total_files = len(files)
+        job.total_bytes = sum(size for _, size in files)
+
+    # Written under a temporary name so a cancelled job never leaves a truncated archive
+    partial_path = zip_path + ".part"
+    try:
+        with zipfile.ZipFile(partial_path, "w", compression=zipfile.ZIP_DEFLATED,
+                             compresslevel=compresslevel, allowZip64=True) as archive:
+            for path, size in files:
+                arcname = os.path.relpath(path, src_dir)
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                stored = os.path.splitext(path)[1].lower() in STORED_EXTENSIONS
+                info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+                # ZipFile.open() ignores the archive's level for a caller-built ZipInfo
+                setattr(info, "compress_level" if hasattr(info, "compress_level") else "_compresslevel", compresslevel)
+                if job:
+                    job.current = arcname
+                with open(path, "rb") as source, archive.open(info, "w", force_zip64=size > 2 ** 31) as target:
+                    _copy_stream(source, target, job)
+                if job:
+                    job.done_files += 1
+        os.replace(partial_path, zip_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return os.path.getsize(zip_path)
+
+def check_archive(archive, max_total_bytes=DEFAULT_MAX_EXTRACT_BYTES, max_ratio=DEFAULT_MAX_RATIO,
+                  max_members=DEFAULT_MAX_MEMBERS):
+    """Reject archives whose central directory exceeds the limits; returns the total size"""
+    members = archive.infolist()
+    if len(members) > max_members:
+        raise ArchiveError(f"Archive has {len(members)} entries (limit {max_members})")
+    total = sum(m.file_size for m in members)
+    if total > max_total_bytes:
+        raise ArchiveError(f"Archive expands to {total} bytes (limit {max_total_bytes})")
+    for member in members:
+        # Tiny members can have huge ratios legitimately (e.g. a file of zeros)
+        if member.file_size > CHUNK_SIZE and member.file_size > max_ratio * max(member.compress_size, 1):
+            raise ArchiveError(f"'{member.filename}' has a compression ratio above {max_ratio}:1")
+    return total
+
+def extract_zip(zip_path, dest_dir, max_total_bytes=DEFAULT_MAX_EXTRACT_BYTES, max_ratio=DEFAULT_MAX_RATIO,
+                max_members=DEFAULT_MAX_MEMBERS, job=None):
+    """Extract a zip member by member with zip-bomb and path traversal guards"""
+    dest_dir = os.path.realpath(dest_dir)
+    with zipfile.ZipFile(zip_path) as archive:
+        total = check_archive(archive, max_total_bytes, max_ratio, max_members)
+        os.makedirs(dest_dir, exist_ok=True)
+        if total > shutil.disk_usage(dest_dir).free:
+            raise ArchiveError(f"Not enough free space in {dest_dir} for {total} bytes")
+        members = archive.infolist()
+        if job:
+            job.total_files = len(members)
+            job.total_bytes = total
+
+        for member in members:
+            target = os.path.realpath(os.path.join(dest_dir, member.filename))
+            if target != dest_dir and not target.startswith(dest_dir + os.sep):
+                raise ArchiveError(f"'{member.filename}' would be written outside {dest_dir}")
+            if job:
+                job.current = member.filename
+            mode = member.external_attr >> 16
+            if member.is_dir():
+                os.makedirs(target, exist_ok=True)
+            elif not stat.S_ISLNK(mode):
+                # Symlinks are skipped; they could point anywhere on the host
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with archive.open(member) as source, open(target, "wb") as out:
+                    _copy_stream(source, out, job, limit=member.file_size)
+            if job:
+                job.done_files += 1
+    return total
@@ -0,0 +1,205 @@
+# Run one compose command across many projects at once
+#
+# Each project runs as its own streaming docker-compose process on a bounded
+# thread pool. A project can name the projects it must come up after in a
+# top-level `x-depends-on` list; it starts as soon as those have succeeded,
+# so independent projects overlap and a whole environment takes about as long
+# as its longest chain. Teardown commands run in the reverse order. Output is
+# kept per project in bounded buffers that the page polls during the run.
+import shlex
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from core.streaming import StreamingCommand
+
+DEFAULT_MAX_WORKERS = 8
+LOG_LINES = 200
+# Dependents have to go first when tearing down
+REVERSED_COMMANDS = ("down", "stop", "kill", "rm")
+# Nothing runs, so there is nothing to order
+UNORDERED_COMMANDS = ("pull", "build", "config", "ps")
+FINISHED = ("ok", "failed", "timeout", "error", "skipped", "cancelled")
+
+def run_order(projects, reverse=False):
+    """{path: set of paths it waits for}, from x-depends-on names within the given projects
+
+    Names of projects that are not in the batch are ignored. Raises ValueError
+    on a cycle before anything is started.
+    """
+    by_name = {}
+    for project in projects:
+        by_name.setdefault(project.name, []).append(project.path)
+    waits = {project.path: {path for name in project.depends_on for path in by_name.get(name, [])
+                            if path != project.path}
+             for project in projects}
+    if reverse:
+        flipped = {path: set() for path in waits}
+        for path, needs in waits.items():
+            for need in needs:
+                flipped[need].add(path)
+        waits = flipped
+
+    remaining = {path: set(needs) for path, needs in waits.items()}
+    ready = [path for path, needs in remaining.items() if not needs]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for path, needs in remaining.items():
+            if done in needs:
+                needs.discard(done)
+                if not needs:
+                    ready.append(path)
+    if remaining:
+        names = sorted({p.name for p in projects if p.path in remaining})
+        raise ValueError(f"x-depends-on cycle between: {', '.join(names)}")
+    return waits
+
+class ProjectRun:
+    """State and output of one project in a batch"""
+
+    def __init__(self, project):
+        self.project = project
+        self.status = "pending"
+        self.returncode = None
+        self.error = ""
+        self.started = None
+        self.finished = None
+        self.lines = deque(maxlen=LOG_LINES)
+        self.line_count = 0
+        self.runner = None
+
+    @property
+    def seconds(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+class ComposeBatch:
+    """A compose command run over several projects on a bounded worker pool"""
+
+    def __init__(self, projects, command, max_workers=DEFAULT_MAX_WORKERS, timeout=None, ordered=True,
+                 compose_command="docker-compose"):
+        self.command = command
+        self.args = shlex.split(command)
+        if not self.args:
+            raise ValueError("Empty compose command")
+        self.compose_command = shlex.split(compose_command)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        ordered = ordered and self.args[0] not in UNORDERED_COMMANDS
+        self.waits = (run_order(projects, reverse=self.args[0] in REVERSED_COMMANDS) if ordered
+                      else {project.path: set() for project in projects})
+        self.runs = {project.path: ProjectRun(project) for project in projects}
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.time()
+        self._thread = threading.Thread(target=self._schedule, name="compose-batch", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stop scheduling and terminate the running projects"""
+        self._cancel.set()
+        for run in self.runs.values():
+            if run.runner is not None:
+                run.runner.cancel()
+
+    def done(self):
+        return self.finished is not None
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done()
+
+    def _run_project(self, run):
+        # Queued before Cancel; don't spawn a process only to kill it
+        if self._cancel.is_set():
+            run.status = "cancelled"
+            return
+        run.started = time.time()
+        run.status = "running"
+        project = run.project
+        command = self.compose_command + ["-f", project.path] + self.args
+        run.runner = StreamingCommand(command, timeout=self.timeout, cwd=project.directory)
+        if self._cancel.is_set():
+            run.runner.cancel()
+        try:
+            for name, line in run.runner.lines():
+                run.lines.append(line if name == "stdout" else f"[stderr] {line}")
+                run.line_count += 1
+            run.returncode = run.runner.returncode
+            if run.runner.timed_out:
+                run.status = "timeout"
+            elif run.runner.cancelled:
+                run.status = "cancelled"
+            else:
+                run.status = "ok" if run.returncode == 0 else "failed"
+        except Exception as e:
+            # docker-compose missing, bad working directory...
+            run.status = "error"
+            run.error = str(e)
+        finally:
+            run.finished = time.time()
+
+    def _ready(self):
+        """Pending runs whose dependencies succeeded; dependents of failures are skipped"""
+        ready = []
+        changed = True
+        while changed:
+            changed = False
+            for path, run in self.runs.items():
+                if run.status != "pending":
+                    continue
+                needs = [self.runs[need].status for need in self.waits[path]]
+                if any(status in FINISHED and status != "ok" for status in needs):
+                    run.status = "skipped"
+                    run.error = "a project it depends on did not succeed"
+                    changed = True
+                elif all(status == "ok" for status in needs) and run not in ready:
+                    ready.append(run)
+        return ready
+
+    def _schedule(self):
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="compose") as pool:
+                pending = {}
+                while True:
+                    if self._cancel.is_set():
+                        # Drop queued projects; the running ones are being terminated
+                        for future in [f for f in pending if f.cancel()]:
+                            pending.pop(future)
+                    else:
+                        for run in self._ready():
+                            run.status = "queued"
+                            pending[pool.submit(self._run_project, run)] = run
+                    if not pending:
+                        break
+                    finished, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        pending.pop(future)
+        finally:
+            for run in self.runs.values():
+                if run.status in ("pending", "queued"):
+                    run.status = "cancelled"
+            self.finished = time.time()
+
+    def summary(self):
+        """Wall time, summed project time and counts per status"""
+        counts = {}
+        for run in self.runs.values():
+            counts[run.status] = counts.get(run.status, 0) + 1
+        wall = ((self.finished or time.time()) - self.started) if self.started else 0.0
+        serial = sum(run.seconds or 0.0 for run in self.runs.values())
+        return {
+            "wall_seconds": wall,
+            "serial_seconds": serial,
+            "speedup": serial / wall if wall else 0.0,
+            "counts": counts,
+        }
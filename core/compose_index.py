@@ -0,0 +1,136 @@
+# Docker Compose project index
+#
+# Compose files are found by one walk over the configured roots that never
+# descends into excluded directories (.git, node_modules, ...). The list of
+# files is kept until it is rescanned or goes stale, so reruns don't walk the
+# tree again. Each file is parsed once per change: the parsed project is
+# cached against the file's (mtime, size), and a rerun only stats the files.
+import fnmatch
+import os
+import threading
+import time
+from collections import namedtuple
+
+import yaml
+
+from config.settings import COMPOSE_ROOTS, COMPOSE_EXCLUDE
+
+# In the order docker compose prefers them when a directory has several
+COMPOSE_FILENAMES = ("compose.yaml", "compose.yml", "docker-compose.yaml", "docker-compose.yml")
+RESCAN_INTERVAL = 600.0
+
+# depends_on lists project names from the file's top-level `x-depends-on` extension
+ComposeProject = namedtuple("ComposeProject", "name path directory services depends_on error")
+
+def parse_compose_file(path):
+    """Parse one compose file into a ComposeProject; YAML errors are kept, not raised"""
+    directory = os.path.dirname(path)
+    default_name = os.path.basename(directory).lower()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        if not isinstance(data, dict):
+            raise ValueError("top level is not a mapping")
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        return ComposeProject(default_name, path, directory, [], [], str(e))
+    name = str(data.get("name") or default_name)
+    services = data.get("services") or {}
+    services = list(services) if isinstance(services, dict) else []
+    depends_on = data.get("x-depends-on") or []
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    if not isinstance(depends_on, list) or not all(isinstance(d, str) for d in depends_on):
+        return ComposeProject(name, path, directory, services, [],
+                              "x-depends-on must be a project name or a list of project names")
+    return ComposeProject(name, path, directory, services, depends_on, None)
+
+class ComposeIndex:
+    """Compose files under a set of roots, with parsed results cached per file"""
+
+    def __init__(self, roots=COMPOSE_ROOTS, exclude=COMPOSE_EXCLUDE, rescan_interval=RESCAN_INTERVAL):
+        self.roots = [os.path.abspath(root) for root in roots if root]
+        self.exclude = [pattern for pattern in exclude if pattern]
+        self.rescan_interval = rescan_interval
+        self.paths = None
+        self.scanned_at = 0.0
+        self.scan_seconds = 0.0
+        self.directories_scanned = 0
+        self._parsed = {}
+        self._lock = threading.Lock()
+
+    def _excluded(self, entry):
+        return any(fnmatch.fnmatch(entry.name, pattern) or fnmatch.fnmatch(entry.path, pattern)
+                   for pattern in self.exclude)
+
+    def scan(self):
+        """Walk the roots once and record one compose file per directory"""
+        start = time.perf_counter()
+        found = {}
+        directories = 0
+        stack = list(dict.fromkeys(self.roots))
+        seen = set()
+        while stack:
+            directory = stack.pop()
+            if directory in seen:
+                continue
+            seen.add(directory)
+            directories += 1
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name in COMPOSE_FILENAMES and entry.is_file():
+                            current = found.get(directory)
+                            if current is None or (COMPOSE_FILENAMES.index(entry.name) <
+                                                   COMPOSE_FILENAMES.index(os.path.basename(current))):
+                                found[directory] = entry.path
+                        elif entry.is_dir(follow_symlinks=False) and not self._excluded(entry):
+                            stack.append(entry.path)
+            except OSError:
+                # Unreadable or vanished directory; skip it like `find` would
+                continue
+
+        with self._lock:
+            self.paths = sorted(found.values())
+            self.scanned_at = time.time()
+            self.scan_seconds = time.perf_counter() - start
+            self.directories_scanned = directories
+            # Forget parses of files that are no longer found
+            self._parsed = {path: self._parsed[path] for path in self.paths if path in self._parsed}
+        return self.paths
+
+    def stale(self):
+        return self.paths is None or time.time() - self.scanned_at > self.rescan_interval
+
+    def load(self, path):
+        """The parsed project for one file, re-parsed only when its mtime or size changed"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._parsed.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        project = parse_compose_file(path)
+        with self._lock:
+            self._parsed[path] = (signature, project)
+        return project
+
+    def projects(self, rescan=False):
+        """All compose projects, scanning only on first use, on request or when stale"""
+        if rescan or self.stale():
+            self.scan()
+        return [project for project in map(self.load, self.paths) if project is not None]
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_compose_index(roots=COMPOSE_ROOTS, exclude=COMPOSE_EXCLUDE):
+    """Return the shared index for a set of roots and exclusion globs"""
+    key = (tuple(roots), tuple(exclude))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ComposeIndex(roots, exclude)
+            _indexes[key] = index
+        return index
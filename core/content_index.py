@@ -0,0 +1,284 @@
+# Persistent full-text index for the file manager's search
+#
+# Text files under a root are stored in an SQLite FTS5 table with the trigram
+# tokenizer, which lets substring and GLOB queries use the index instead of
+# reading every file. Files are re-read only when their size or mtime changed,
+# reading happens in a process pool, and binaries and oversized files are
+# skipped. One database per root lives under data/search_index/.
+import codecs
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+
+from config.settings import DATA_PATH
+from core.utils import process_pool_context
+
+DEFAULT_INDEX_DIR = os.path.join(DATA_PATH, "search_index")
+DEFAULT_MAX_FILE_BYTES = 2 * 1024 * 1024
+SNIFF_BYTES = 8192
+# Below this many changed files a process pool costs more than it saves
+POOL_THRESHOLD = 64
+COMMIT_EVERY = 500
+# Files per pool task, and tasks in flight per worker; bounds how many bodies
+# can wait in the parent while the single SQLite writer catches up
+READ_BATCH = 32
+BATCHES_PER_WORKER = 2
+
+# Leading bytes of common binary formats
+BINARY_MAGIC = (
+    b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"%PDF", b"PK\x03\x04", b"\x7fELF", b"\x1f\x8b",
+    b"BZh", b"\xfd7zXZ", b"7z\xbc\xaf", b"MZ", b"RIFF", b"ID3", b"OggS", b"fLaC",
+    b"SQLite format 3", b"\xca\xfe\xba\xbe", b"\x00asm", b"\x00\x00\x01\x00",
+)
+
+MATCH_TYPES = ("substring", "glob", "regex")
+SCOPES = ("names", "contents")
+
+def read_text(path, max_bytes=DEFAULT_MAX_FILE_BYTES):
+    """Return a file's text, or None for binaries, oversized or unreadable files"""
+    try:
+        if os.path.getsize(path) > max_bytes:
+            return None
+        with open(path, "rb") as f:
+            data = f.read(max_bytes + 1)
+    except OSError:
+        return None
+    head = data[:SNIFF_BYTES]
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return data.decode("utf-16", errors="replace")
+    if head.startswith(BINARY_MAGIC) or b"\x00" in head:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+def read_texts(paths, max_bytes=DEFAULT_MAX_FILE_BYTES):
+    """read_text for a batch of paths, so one pool task covers several small files"""
+    return [read_text(path, max_bytes) for path in paths]
+
+def _read_in_pool(pool, paths, max_bytes, window):
+    """Yield read_text results in order with at most `window` batches in flight"""
+    remaining = iter(paths)
+    pending = deque()
+    while True:
+        batch = list(islice(remaining, READ_BATCH))
+        if not batch:
+            break
+        pending.append(pool.submit(read_texts, batch, max_bytes))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+@lru_cache(maxsize=32)
+def _compile(pattern, flags=0):
+    return re.compile(pattern, flags)
+
+def _regexp(pattern, value):
+    if value is None:
+        return False
+    try:
+        # MULTILINE so ^ and $ anchor to lines, as in the match shown to the user
+        return _compile(pattern, re.MULTILINE).search(value) is not None
+    except re.error:
+        return False
+
+def _line_pattern(match_type, query):
+    """Regex that finds the matching line inside a file's text"""
+    if match_type == "regex":
+        return _compile(query, re.MULTILINE)
+    if match_type == "glob":
+        # A content glob like *foo*bar* matches lines containing foo...bar
+        core = "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in query.strip("*"))
+        return _compile(core)
+    return _compile(re.escape(query), re.IGNORECASE)
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class ContentIndex:
+    """On-disk inverted index of file names and contents under one root"""
+
+    def __init__(self, root, index_dir=DEFAULT_INDEX_DIR, max_file_bytes=DEFAULT_MAX_FILE_BYTES):
+        self.root = os.path.abspath(root)
+        self.max_file_bytes = max_file_bytes
+        os.makedirs(index_dir, exist_ok=True)
+        digest = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(index_dir, f"{digest}.db")
+        self._build_lock = threading.Lock()
+        self.trigram = True
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+                         "size INTEGER NOT NULL, mtime REAL NOT NULL, indexed INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            try:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS content USING fts5(body, tokenize='trigram')")
+            except sqlite3.OperationalError:
+                # SQLite older than 3.34 has no trigram tokenizer; substring search falls back to LIKE
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS content USING fts5(body)")
+                self.trigram = False
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.create_function("regexp", 2, _regexp, deterministic=True)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- Building ----------
+
+    def update(self, entries, workers=None, progress=None):
+        """Bring the index in line with DirectoryIndex entries
+
+        Only files whose size or mtime changed are read. progress, if given, is
+        called as progress(done, total). Returns a dict of counts.
+        """
+        files = {e.path: e for e in entries if not e.is_dir}
+        with self._build_lock:
+            start = time.perf_counter()
+            with self._connect() as conn:
+                known = {path: (file_id, size, mtime) for file_id, path, size, mtime
+                         in conn.execute("SELECT id, path, size, mtime FROM files")}
+
+                removed = [known[path][0] for path in known if path not in files]
+                for i in range(0, len(removed), COMMIT_EVERY):
+                    chunk = [(file_id,) for file_id in removed[i:i + COMMIT_EVERY]]
+                    conn.executemany("DELETE FROM content WHERE rowid = ?", chunk)
+                    conn.executemany("DELETE FROM files WHERE id = ?", chunk)
+
+            changed = [e for path, e in files.items()
+                       if path not in known or known[path][1:] != (e.size, e.mtime)]
+            paths = [os.path.join(self.root, e.path) for e in changed]
+            indexed = skipped = 0
+
+            if len(changed) >= POOL_THRESHOLD:
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context())
+                bodies = _read_in_pool(pool, paths, self.max_file_bytes,
+                                       (workers or os.cpu_count() or 1) * BATCHES_PER_WORKER)
+            else:
+                pool = None
+                bodies = (read_text(path, self.max_file_bytes) for path in paths)
+
+            try:
+                with self._connect() as conn:
+                    for done, (entry, body) in enumerate(zip(changed, bodies), 1):
+                        previous = known.get(entry.path)
+                        if previous:
+                            file_id = previous[0]
+                            conn.execute("UPDATE files SET size = ?, mtime = ?, indexed = ? WHERE id = ?",
+                                         (entry.size, entry.mtime, body is not None, file_id))
+                            conn.execute("DELETE FROM content WHERE rowid = ?", (file_id,))
+                        else:
+                            file_id = conn.execute("INSERT INTO files (path, size, mtime, indexed) VALUES (?, ?, ?, ?)",
+                                                   (entry.path, entry.size, entry.mtime, body is not None)).lastrowid
+                        if body is None:
+                            skipped += 1
+                        else:
+                            conn.execute("INSERT INTO content (rowid, body) VALUES (?, ?)", (file_id, body))
+                            indexed += 1
+                        if done % COMMIT_EVERY == 0:
+                            conn.commit()
+                            if progress:
+                                progress(done, len(changed))
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('updated_at', ?)",
+                                 (str(time.time()),))
+            finally:
+                if pool:
+                    pool.shutdown(cancel_futures=True)
+
+            if progress:
+                progress(len(changed), len(changed))
+            return {
+                "files": len(files),
+                "indexed": indexed,
+                "skipped": skipped,
+                "removed": len(removed),
+                "unchanged": len(files) - len(changed),
+                "seconds": time.perf_counter() - start,
+            }
+
+    def stats(self):
+        with self._connect() as conn:
+            files, indexed = conn.execute("SELECT COUNT(*), COALESCE(SUM(indexed), 0) FROM files").fetchone()
+            row = conn.execute("SELECT value FROM meta WHERE key = 'updated_at'").fetchone()
+        return {"files": files, "indexed": indexed, "updated_at": float(row[0]) if row else None}
+
+    def clear(self):
+        with self._build_lock, self._connect() as conn:
+            conn.execute("DELETE FROM content")
+            conn.execute("DELETE FROM files")
+            conn.execute("DELETE FROM meta")
+
+    # ---------- Querying ----------
+
+    def search(self, query, match_type="substring", scope="contents", limit=200):
+        """Return [(path, line_number, line)] for files matching the query
+
+        Name matches have no line (line_number is None).
+        """
+        if not query:
+            return []
+        if match_type == "regex":
+            _compile(query, re.MULTILINE)  # Raise re.error for the caller instead of matching nothing
+
+        if scope == "names":
+            if match_type == "substring":
+                where, params = "path LIKE ? ESCAPE '\\'", (f"%{_escape_like(query)}%",)
+            elif match_type == "glob":
+                # A pattern like *.py should match in any folder, not only at the root
+                where, params = "path GLOB ? OR path GLOB ?", (query, f"*/{query}")
+            else:
+                where, params = "path REGEXP ?", (query,)
+            with self._connect() as conn:
+                rows = conn.execute(f"SELECT path FROM files WHERE {where} ORDER BY path LIMIT ?",
+                                    params + (limit,)).fetchall()
+            return [(path, None, "") for path, in rows]
+
+        if match_type == "substring" and self.trigram and len(query) >= 3:
+            # Quoted phrase: the trigram tokenizer turns it into an index lookup
+            where, param = "content MATCH ?", '"' + query.replace('"', '""') + '"'
+        elif match_type == "substring":
+            where, param = "content.body LIKE ? ESCAPE '\\'", f"%{_escape_like(query)}%"
+        elif match_type == "glob":
+            where, param = "content.body GLOB ?", f"*{query.strip('*')}*"
+        else:
+            where, param = "content.body REGEXP ?", query
+
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT files.path, content.body FROM content JOIN files ON files.id = content.rowid "
+                                f"WHERE {where} ORDER BY files.path LIMIT ?", (param, limit)).fetchall()
+
+        pattern = _line_pattern(match_type, query)
+        results = []
+        for path, body in rows:
+            match = pattern.search(body)
+            if match:
+                line_number = body.count("\n", 0, match.start()) + 1
+                line_start = body.rfind("\n", 0, match.start()) + 1
+                line_end = body.find("\n", match.start())
+                line = body[line_start:line_end if line_end != -1 else len(body)]
+                results.append((path, line_number, line.strip()[:200]))
+            else:
+                results.append((path, None, ""))
+        return results
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_content_index(root):
+    """Return the content index for a root, shared by every session"""
+    root = os.path.abspath(root)
+    with _indexes_lock:
+        if root not in _indexes:
+            _indexes[root] = ContentIndex(root)
+        return _indexes[root]
@@ -0,0 +1,237 @@
+# Cached directory index for the file manager
+#
+# The tree is scanned once with os.scandir, keeping size, mtime and type per
+# entry. A refresh only stats each known directory: a directory's mtime
+# changes when entries are added, removed or renamed in it, so only those
+# directories are rescanned. Sizes of files edited in place are picked up when
+# their directory changes or is invalidated. Entries of rescanned directories
+# are merged into the sorted lists with binary searches, so a refresh costs
+# about as much as what changed rather than a sort of the whole tree.
+import bisect
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+FileEntry = namedtuple("FileEntry", "path is_dir size mtime")
+
+# Reruns closer together than this reuse the index without touching the disk
+DEFAULT_MIN_REFRESH_INTERVAL = 2.0
+MAX_CACHED_ROOTS = 8
+
+SORT_KEYS = {
+    "path": lambda e: e.path,
+    "size": lambda e: e.size,
+    "mtime": lambda e: e.mtime,
+}
+# Above this share of the index changing at once, re-sorting is cheaper than merging
+FULL_REBUILD_RATIO = 0.5
+
+def _order_key(sort_by, descending):
+    """Total order for a cached size or mtime ordering; ties stay in path order"""
+    value = SORT_KEYS[sort_by]
+    if descending:
+        return lambda e: (-value(e), e.path)
+    return lambda e: (value(e), e.path)
+
+def _remove_sorted(keys, items, key):
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+        if items is not None:
+            del items[i]
+
+def _insert_sorted(keys, items, key, item):
+    i = bisect.bisect_left(keys, key)
+    keys.insert(i, key)
+    if items is not None:
+        items.insert(i, item)
+
+class _DirNode:
+    __slots__ = ("mtime_ns", "entries", "subdirs")
+
+    def __init__(self, mtime_ns, entries, subdirs):
+        self.mtime_ns = mtime_ns
+        self.entries = entries
+        self.subdirs = subdirs
+
+class DirectoryIndex:
+    """Index of every file and folder under a root, refreshed incrementally"""
+
+    def __init__(self, root, min_refresh_interval=DEFAULT_MIN_REFRESH_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.min_refresh_interval = min_refresh_interval
+        self._nodes = {}
+        self._files = []
+        self._folders = []
+        # (entries sorted by path, their paths, cached orderings), swapped as one reference;
+        # orderings map (sort_by, descending) to (sort keys, entries) in that order
+        self._view = ([], [], {})
+        self._rebuild_all = True
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        self.last_refresh_seconds = None
+        self.rescanned_dirs = 0
+
+    def _scan_dir(self, rel_dir, mtime_ns):
+        entries = []
+        subdirs = []
+        try:
+            with os.scandir(os.path.join(self.root, rel_dir)) as it:
+                for entry in it:
+                    rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append(FileEntry(rel_path, is_dir, 0 if is_dir else stat.st_size, stat.st_mtime))
+                    # Like os.walk, list symlinked folders but don't descend into them
+                    if is_dir and not entry.is_symlink():
+                        subdirs.append(rel_path)
+        except OSError:
+            pass
+        return _DirNode(mtime_ns, entries, subdirs)
+
+    def refresh(self, force=False):
+        """Rescan directories whose mtime changed; returns True if anything changed"""
+        with self._lock:
+            if not force and time.monotonic() - self._last_refresh < self.min_refresh_interval:
+                return False
+            start = time.perf_counter()
+            removed = []
+            added = []
+            rescanned = 0
+            seen = set()
+            stack = [""]
+            while stack:
+                rel_dir = stack.pop()
+                try:
+                    mtime_ns = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+                except OSError:
+                    continue
+                node = self._nodes.get(rel_dir)
+                if node is None or node.mtime_ns != mtime_ns:
+                    if node is not None:
+                        removed.extend(node.entries)
+                    node = self._scan_dir(rel_dir, mtime_ns)
+                    self._nodes[rel_dir] = node
+                    added.extend(node.entries)
+                    rescanned += 1
+                seen.add(rel_dir)
+                stack.extend(node.subdirs)
+
+            # Directories that disappeared since the last refresh
+            for rel_dir in [d for d in self._nodes if d not in seen]:
+                removed.extend(self._nodes.pop(rel_dir).entries)
+
+            # A rescanned directory lists its unchanged entries again; only real differences matter
+            old, new = set(removed), set(added)
+            removed, added = old - new, new - old
+            changed = self._rebuild_all or bool(removed or added)
+            if self._rebuild_all or len(removed) + len(added) > len(self._view[1]) * FULL_REBUILD_RATIO:
+                self._rebuild()
+            elif changed:
+                self._merge(removed, added)
+            self._last_refresh = time.monotonic()
+            self.last_refresh_seconds = time.perf_counter() - start
+            self.rescanned_dirs = rescanned
+            return changed
+
+    def _rebuild(self):
+        entries = [entry for node in self._nodes.values() for entry in node.entries]
+        entries.sort(key=lambda e: e.path)
+        self._view = (entries, [e.path for e in entries], {})
+        self._files = [e.path for e in entries if not e.is_dir]
+        self._folders = [e.path for e in entries if e.is_dir]
+        self._rebuild_all = False
+
+    def _merge(self, removed, added):
+        """Apply changed entries to copies of the sorted lists; readers keep the old view meanwhile"""
+        entries, paths, orderings = self._view
+        entries, paths = list(entries), list(paths)
+        files, folders = list(self._files), list(self._folders)
+        kept = {}
+        for (sort_by, descending), (keys, ordered) in orderings.items():
+            # Reversed path order is a cheap slice; sorted orderings are merged like the main list
+            if sort_by != "path":
+                kept[(sort_by, descending)] = (list(keys), list(ordered))
+
+        for entry in removed:
+            _remove_sorted(paths, entries, entry.path)
+            _remove_sorted(folders if entry.is_dir else files, None, entry.path)
+            for (sort_by, descending), (keys, ordered) in kept.items():
+                _remove_sorted(keys, ordered, _order_key(sort_by, descending)(entry))
+        for entry in added:
+            _insert_sorted(paths, entries, entry.path, entry)
+            _insert_sorted(folders if entry.is_dir else files, None, entry.path, None)
+            for (sort_by, descending), (keys, ordered) in kept.items():
+                _insert_sorted(keys, ordered, _order_key(sort_by, descending)(entry), entry)
+
+        self._view = (entries, paths, kept)
+        self._files = files
+        self._folders = folders
+
+    def invalidate(self, rel_dir=None):
+        """Force the next refresh to rescan one directory, or everything"""
+        with self._lock:
+            if rel_dir is None:
+                self._nodes.clear()
+                self._rebuild_all = True
+            else:
+                node = self._nodes.get(rel_dir.strip(os.sep))
+                if node is not None:
+                    # Keep its entries so the rescan can be merged as a change
+                    node.mtime_ns = None
+            self._last_refresh = 0.0
+
+    def files(self):
+        """Relative paths of all files, sorted"""
+        return self._files
+
+    def folders(self):
+        """Relative paths of all folders, sorted"""
+        return self._folders
+
+    def entries(self, prefix="", sort_by="path", descending=False):
+        """FileEntry records, optionally limited to paths starting with prefix
+
+        Entries are kept sorted by path, so a prefix is two binary searches.
+        Whole-tree orderings by size or mtime are cached until the next change.
+        """
+        entries, paths, orderings = self._view
+        if prefix:
+            lo = bisect.bisect_left(paths, prefix)
+            hi = bisect.bisect_left(paths, prefix + "\U0010ffff", lo)
+            entries = entries[lo:hi]
+        if sort_by == "path" and not descending:
+            return entries
+        if prefix:
+            return sorted(entries, key=SORT_KEYS[sort_by], reverse=descending)
+        key = (sort_by, descending)
+        if key not in orderings:
+            if sort_by == "path":
+                orderings[key] = (None, entries[::-1])
+            else:
+                order = _order_key(sort_by, descending)
+                ordered = sorted(entries, key=order)
+                orderings[key] = ([order(e) for e in ordered], ordered)
+        return orderings[key][1]
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_directory_index(root):
+    """Return the refreshed index for a root, shared by every session"""
+    root = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = DirectoryIndex(root)
+            _indexes[root] = index
+            if len(_indexes) > MAX_CACHED_ROOTS:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(root)
+    index.refresh()
+    return index
@@ -0,0 +1,271 @@
+# In-process disk usage analyzer
+#
+# Directories are scanned with os.scandir on a thread pool; each scan keeps
+# the directory's own bytes, its largest files, and extension and age
+# histograms. Results are cached per directory with its mtime, so a rescan
+# only re-reads directories whose entries changed, and any subdirectory's
+# totals come from the cached tree without touching the disk. Files that grow
+# in place don't change their directory's mtime; scan(full=True) picks them up.
+#
+# Each finished scan publishes an immutable snapshot that readers use, so
+# sessions browsing a tree never see another session's rescan half done.
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+TOP_FILES = 100
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+MAX_CACHED_ROOTS = 4
+
+# (label, maximum age in seconds) for the age histogram; ages are taken at scan time
+AGE_BUCKETS = (
+    ("< 1 day", 86400),
+    ("< 1 week", 7 * 86400),
+    ("< 1 month", 30 * 86400),
+    ("< 6 months", 182 * 86400),
+    ("< 1 year", 365 * 86400),
+    ("> 1 year", float("inf")),
+)
+
+LargeFile = namedtuple("LargeFile", "size path mtime")
+Summary = namedtuple("Summary", "path total_bytes file_count dir_count largest extensions ages")
+
+class _DirScan:
+    __slots__ = ("mtime_ns", "own_bytes", "file_count", "largest", "extensions", "ages", "subdirs")
+
+    def __init__(self, mtime_ns):
+        self.mtime_ns = mtime_ns
+        self.own_bytes = 0
+        self.file_count = 0
+        self.largest = []
+        self.extensions = {}
+        self.ages = [[0, 0] for _ in AGE_BUCKETS]
+        self.subdirs = []
+
+def _age_bucket(age):
+    for i, (_, limit) in enumerate(AGE_BUCKETS):
+        if age < limit:
+            return i
+    return len(AGE_BUCKETS) - 1
+
+def _scan_dir(path, mtime_ns, now, top_n):
+    """Scan one directory level; subdirectories are returned as (path, mtime_ns)"""
+    scan = _DirScan(mtime_ns)
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append((entry.path, stat.st_mtime_ns))
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                except OSError:
+                    continue
+                # Allocated blocks, like du, so sparse files aren't overcounted
+                size = min(stat.st_size, stat.st_blocks * 512) if hasattr(stat, "st_blocks") else stat.st_size
+                scan.own_bytes += size
+                scan.file_count += 1
+                ext = os.path.splitext(entry.name)[1].lower() or "(none)"
+                counts = scan.extensions.get(ext)
+                if counts is None:
+                    scan.extensions[ext] = [1, size]
+                else:
+                    counts[0] += 1
+                    counts[1] += size
+                bucket = scan.ages[_age_bucket(now - stat.st_mtime)]
+                bucket[0] += 1
+                bucket[1] += size
+                item = LargeFile(size, entry.path, stat.st_mtime)
+                if len(scan.largest) < top_n:
+                    heapq.heappush(scan.largest, item)
+                elif size > scan.largest[0].size:
+                    heapq.heapreplace(scan.largest, item)
+    except OSError:
+        pass
+    scan.subdirs = [p for p, _ in subdirs]
+    return scan, subdirs
+
+class DiskUsageTree:
+    """Cached size tree for one root"""
+
+    def __init__(self, root, top_n=TOP_FILES):
+        self.root = os.path.abspath(root)
+        self.top_n = top_n
+        self._scans = {}
+        # (scans, totals, summaries) from the last finished scan; replaced, never mutated
+        self._snapshot = ({}, {}, {})
+        self._lock = threading.Lock()
+        self.scanned_at = None
+        self.last_scan_seconds = None
+        self.rescanned_dirs = 0
+
+    def scan(self, workers=DEFAULT_WORKERS, progress=None, full=False):
+        """Scan the tree, re-reading only directories whose mtime changed
+
+        progress, if given, is called as progress(directories_done, files_seen).
+        """
+        with self._lock:
+            start = time.perf_counter()
+            now = time.time()
+            if full:
+                self._scans.clear()
+            seen = set()
+            rescanned = 0
+            files_seen = 0
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = {}
+                unchanged = []
+
+                def visit(path, mtime_ns):
+                    nonlocal rescanned
+                    cached = self._scans.get(path)
+                    if cached is not None and cached.mtime_ns == mtime_ns:
+                        unchanged.append(path)
+                    else:
+                        pending[pool.submit(_scan_dir, path, mtime_ns, now, self.top_n)] = path
+                        rescanned += 1
+
+                try:
+                    visit(self.root, os.stat(self.root).st_mtime_ns)
+                except OSError:
+                    pass
+
+                while pending or unchanged:
+                    # Reuse unchanged directories, but their children may still have changed
+                    while unchanged:
+                        path = unchanged.pop()
+                        seen.add(path)
+                        files_seen += self._scans[path].file_count
+                        for child in self._scans[path].subdirs:
+                            try:
+                                visit(child, os.stat(child).st_mtime_ns)
+                            except OSError:
+                                continue
+                    if not pending:
+                        continue
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = pending.pop(future)
+                        scan, subdirs = future.result()
+                        self._scans[path] = scan
+                        seen.add(path)
+                        files_seen += scan.file_count
+                        for child, mtime_ns in subdirs:
+                            visit(child, mtime_ns)
+                    if progress:
+                        progress(len(seen), files_seen)
+
+            for path in [p for p in self._scans if p not in seen]:
+                del self._scans[path]
+            self._snapshot = (dict(self._scans), self._aggregate(), {})
+            self.scanned_at = now
+            self.last_scan_seconds = time.perf_counter() - start
+            self.rescanned_dirs = rescanned
+
+    def _aggregate(self):
+        """Roll own sizes up into per-directory totals, deepest first"""
+        totals = {path: [scan.own_bytes, scan.file_count, 0] for path, scan in self._scans.items()}
+        for path in sorted(totals, key=lambda p: p.count(os.sep), reverse=True):
+            parent = os.path.dirname(path)
+            if path != self.root and parent in totals:
+                parent_totals = totals[parent]
+                parent_totals[0] += totals[path][0]
+                parent_totals[1] += totals[path][1]
+                parent_totals[2] += totals[path][2] + 1
+        return totals
+
+    def contains(self, path):
+        return os.path.abspath(path) in self._snapshot[1]
+
+    def total(self, path):
+        """(bytes, files, folders) under a directory"""
+        return tuple(self._snapshot[1].get(os.path.abspath(path), (0, 0, 0)))
+
+    def children(self, path):
+        """[(child_path, bytes, files)] for a directory's subfolders, largest first"""
+        scans, totals, _ = self._snapshot
+        scan = scans.get(os.path.abspath(path))
+        if scan is None:
+            return []
+        rows = [(child, *totals[child][:2]) for child in scan.subdirs if child in totals]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows
+
+    def summary(self, path=None):
+        """Totals, largest files and histograms for a directory and everything below it"""
+        path = os.path.abspath(path or self.root)
+        snapshot_scans, totals, summaries = self._snapshot
+        if path in summaries:
+            return summaries[path]
+        prefix = path.rstrip(os.sep) + os.sep
+        scans = [scan for p, scan in snapshot_scans.items() if p == path or p.startswith(prefix)]
+
+        largest = heapq.nlargest(self.top_n, (f for scan in scans for f in scan.largest))
+        extensions = {}
+        ages = [[0, 0] for _ in AGE_BUCKETS]
+        for scan in scans:
+            for ext, (count, size) in scan.extensions.items():
+                counts = extensions.setdefault(ext, [0, 0])
+                counts[0] += count
+                counts[1] += size
+            for bucket, (count, size) in zip(ages, scan.ages):
+                bucket[0] += count
+                bucket[1] += size
+
+        total_bytes, file_count, dir_count = totals.get(path, (0, 0, 0))
+        summary = Summary(path, total_bytes, file_count, dir_count, largest, extensions,
+                          [(label, count, size) for (label, _), (count, size) in zip(AGE_BUCKETS, ages)])
+        summaries[path] = summary
+        return summary
+
+    def treemap(self, path=None, depth=3, max_children=25):
+        """(ids, labels, parents, values) for a treemap of the largest folders below path"""
+        path = os.path.abspath(path or self.root)
+        ids, labels, parents, values = [path], [os.path.basename(path) or path], [""], [self.total(path)[0]]
+        frontier = [(path, 0)]
+        while frontier:
+            current, level = frontier.pop()
+            if level >= depth:
+                continue
+            children = self.children(current)
+            shown = children[:max_children]
+            for child, size, _ in shown:
+                ids.append(child)
+                labels.append(os.path.basename(child))
+                parents.append(current)
+                values.append(size)
+                frontier.append((child, level + 1))
+            # Files directly in the folder plus folders that didn't make the cut
+            rest = self.total(current)[0] - sum(size for _, size, _ in shown)
+            if rest > 0 and shown:
+                ids.append(current + os.sep + "(other)")
+                labels.append("(files and smaller folders)")
+                parents.append(current)
+                values.append(rest)
+        return ids, labels, parents, values
+
+_trees = OrderedDict()
+_trees_lock = threading.Lock()
+
+def get_disk_usage_tree(path):
+    """Return the cached tree covering path, reusing a scanned parent root when possible"""
+    path = os.path.abspath(path)
+    with _trees_lock:
+        for root, tree in _trees.items():
+            if tree.scanned_at and tree.contains(path):
+                _trees.move_to_end(root)
+                return tree
+        tree = _trees.get(path)
+        if tree is None:
+            tree = DiskUsageTree(path)
+            _trees[path] = tree
+            if len(_trees) > MAX_CACHED_ROOTS:
+                _trees.popitem(last=False)
+        return tree
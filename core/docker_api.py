@@ -0,0 +1,427 @@
+# Docker Engine API client
+#
+# Talks HTTP to the daemon's Unix socket directly instead of forking the
+# docker CLI per action. For remote hosts the socket is reached through
+# `docker system dial-stdio` on a channel of the shared SSH pool, the same
+# mechanism the CLI uses for ssh:// hosts. Connections are kept alive and
+# reused, so listing 300 containers is one request on an open socket.
+import http.client
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode
+
+from config.settings import DOCKER_SOCKET
+from core.ssh_pool import ssh_pool
+
+DEFAULT_TIMEOUT = 30
+MAX_IDLE_CONNECTIONS = 8
+# Each idle SSH connection holds a channel slot in the shared SSH pool
+MAX_IDLE_SSH_CONNECTIONS = 2
+IDLE_CONNECTION_TIMEOUT = 60
+# Safe to resend when a kept-alive socket drops after the request went out
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+# Concurrent requests for bulk inspects
+INSPECT_WORKERS = 8
+INSPECT_TTL = 10.0
+
+class DockerAPIError(Exception):
+    """The daemon answered with an error status"""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+class _SocketHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over any socket-like object returned by open_socket(timeout)"""
+
+    def __init__(self, open_socket, timeout):
+        super().__init__("docker", timeout=timeout)
+        self._open_socket = open_socket
+
+    def connect(self):
+        self.sock = self._open_socket(self.timeout)
+
+class _ChannelSocket:
+    """Adapts a paramiko channel to what http.client expects of a socket"""
+
+    def __init__(self, channel, pooled):
+        self._channel = channel
+        self._pooled = pooled
+
+    def sendall(self, data):
+        self._channel.sendall(data)
+
+    def makefile(self, mode):
+        return self._channel.makefile(mode)
+
+    def settimeout(self, timeout):
+        self._channel.settimeout(timeout)
+
+    def close(self):
+        if self._pooled is not None:
+            self._channel.close()
+            ssh_pool.release(self._pooled)
+            self._pooled = None
+
+def _unix_socket(path):
+    def open_socket(timeout):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    return open_socket
+
+def _ssh_socket(connection):
+    def open_socket(timeout):
+        pooled = ssh_pool.acquire(connection['host'], connection['port'], connection['username'],
+                                  connection.get('password'))
+        try:
+            channel = pooled.client.get_transport().open_session(timeout=timeout)
+            channel.settimeout(timeout)
+            channel.exec_command("docker system dial-stdio")
+        except Exception:
+            ssh_pool.release(pooled)
+            raise
+        return _ChannelSocket(channel, pooled)
+    return open_socket
+
+class DockerClient:
+    """Minimal Engine API client with a small pool of keep-alive connections"""
+
+    def __init__(self, socket_path=DOCKER_SOCKET, connection=None, timeout=DEFAULT_TIMEOUT, max_idle=None):
+        self.connection = connection
+        self.target = f"ssh://{connection['username']}@{connection['host']}" if connection else socket_path
+        self._open_socket = _ssh_socket(connection) if connection else _unix_socket(socket_path)
+        self.timeout = timeout
+        if max_idle is None:
+            max_idle = MAX_IDLE_SSH_CONNECTIONS if connection else MAX_IDLE_CONNECTIONS
+        self.max_idle = max_idle
+        # (connection, idle since)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._prefix = None
+        self._version_lock = threading.Lock()
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        # Bumped on every invalidate so a fetch that overlapped a change isn't stored
+        self._cache_generation = 0
+
+    # ---------- Transport ----------
+
+    def _checkout(self, fresh=False):
+        with self._lock:
+            if self._idle and not fresh:
+                return self._idle.pop()[0]
+        return _SocketHTTPConnection(self._open_socket, self.timeout)
+
+    def _checkin(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close_idle(self, max_age=IDLE_CONNECTION_TIMEOUT):
+        """Close kept-alive connections unused for max_age seconds"""
+        cutoff = time.monotonic() - max_age
+        with self._lock:
+            expired = [conn for conn, since in self._idle if since < cutoff]
+            self._idle = [(conn, since) for conn, since in self._idle if since >= cutoff]
+        for conn in expired:
+            conn.close()
+
+    def _path(self, path, params):
+        if self._prefix is None:
+            # Pin the API version the daemon reports so responses keep one shape;
+            # concurrent first callers wait here instead of sending unversioned paths
+            with self._version_lock:
+                if self._prefix is None:
+                    version = self._request("GET", "/version", None)
+                    self._prefix = f"/v{version['ApiVersion']}"
+        query = {k: v for k, v in (params or {}).items() if v is not None}
+        return self._prefix + path + ("?" + urlencode(query) if query else "")
+
+    def _write(self, conn, method, url, body):
+        headers = {"Host": "docker"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        conn.request(method, url, body=payload, headers=headers)
+
+    def _send(self, conn, method, url, body):
+        self._write(conn, method, url, body)
+        return conn.getresponse()
+
+    def request(self, method, path, params=None, body=None):
+        """Send one request and return the decoded JSON body (None when empty)"""
+        return self._request(method, self._path(path, params), body)
+
+    def _request(self, method, url, body):
+        conn = self._checkout()
+        try:
+            sent = False
+            try:
+                self._write(conn, method, url, body)
+                sent = True
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # A kept-alive socket the daemon closed; retry once on a fresh one, unless
+                # the request already went out and the daemon may have acted on it
+                if sent and method not in IDEMPOTENT_METHODS:
+                    raise
+                conn.close()
+                conn = self._checkout(fresh=True)
+                response = self._send(conn, method, url, body)
+            data = response.read()
+        except Exception:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+
+        decoded = json.loads(data) if data and "json" in (response.getheader("Content-Type") or "") else None
+        if response.status >= 400:
+            message = decoded.get("message") if isinstance(decoded, dict) else data.decode("utf-8", "replace")
+            raise DockerAPIError(response.status, (message or response.reason).strip())
+        return decoded if decoded is not None else (data.decode("utf-8", "replace") or None)
+
+    def stream(self, path, params=None, timeout=None):
+        """Yield JSON objects from a streaming endpoint on its own connection
+
+        Close the generator to end the stream; the connection is not reused.
+        """
+        url = self._path(path, params)
+        conn = _SocketHTTPConnection(self._open_socket, timeout or self.timeout)
+        try:
+            response = self._send(conn, "GET", url, None)
+            if response.status >= 400:
+                data = response.read()
+                try:
+                    message = json.loads(data).get("message", "")
+                except ValueError:
+                    message = data.decode("utf-8", "replace")
+                raise DockerAPIError(response.status, message.strip() or response.reason)
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    # ---------- Cached bulk reads ----------
+
+    def _cached(self, key, ttl, fetch):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            generation = self._cache_generation
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        value = fetch()
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._cache[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop cached inspect results after a change"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    def inspect_networks(self, ttl=INSPECT_TTL):
+        """Full inspect documents for every network
+
+        The list endpoint omits attached containers, so networks are inspected
+        concurrently on a bounded pool of kept-alive connections.
+        """
+        def fetch():
+            networks = self.networks()
+            # No more workers than idle connections, so every request reuses a socket
+            with ThreadPoolExecutor(max_workers=min(INSPECT_WORKERS, self.max_idle)) as pool:
+                return list(pool.map(lambda n: self.request("GET", f"/networks/{n['Id']}"), networks))
+        return self._cached("networks", ttl, fetch)
+
+    def inspect_volumes(self, ttl=INSPECT_TTL):
+        """Full inspect documents for every volume; the list endpoint already returns them"""
+        return self._cached("volumes", ttl, self.volumes)
+
+    # ---------- Endpoints ----------
+
+    def version(self):
+        return self.request("GET", "/version")
+
+    def containers(self, all=True):
+        return self.request("GET", "/containers/json", {"all": int(all)})
+
+    def images(self):
+        return self.request("GET", "/images/json")
+
+    def networks(self):
+        return self.request("GET", "/networks")
+
+    def volumes(self):
+        return self.request("GET", "/volumes")["Volumes"] or []
+
+    def container_action(self, container, action):
+        """start, stop, restart, pause, unpause or kill"""
+        return self.request("POST", f"/containers/{quote(container, safe='')}/{action}")
+
+    def remove_container(self, container, force=False):
+        return self.request("DELETE", f"/containers/{quote(container, safe='')}", {"force": int(force)})
+
+    def prune_images(self, all=False):
+        # Without the dangling filter the daemon removes every unused image, like `prune -a`
+        filters = None if all else json.dumps({"dangling": ["true"]})
+        return self.request("POST", "/images/prune", {"filters": filters})
+
+    # Invalidated after the change (even a failed one), so a concurrent
+    # inspect can't refill the cache with the state from before it
+
+    def create_network(self, name, driver="bridge"):
+        try:
+            return self.request("POST", "/networks/create", body={"Name": name, "Driver": driver,
+                                                                  "CheckDuplicate": True})
+        finally:
+            self.invalidate("networks")
+
+    def remove_network(self, name):
+        try:
+            return self.request("DELETE", f"/networks/{quote(name, safe='')}")
+        finally:
+            self.invalidate("networks")
+
+    def create_volume(self, name):
+        try:
+            return self.request("POST", "/volumes/create", body={"Name": name})
+        finally:
+            self.invalidate("volumes")
+
+    def remove_volume(self, name, force=False):
+        try:
+            return self.request("DELETE", f"/volumes/{quote(name, safe='')}", {"force": int(force)})
+        finally:
+            self.invalidate("volumes")
+
+# ---------- Table rows ----------
+
+def _short_id(value):
+    return (value or "").split(":")[-1][:12]
+
+def container_rows(containers):
+    rows = []
+    for c in containers:
+        ports = ", ".join(
+            f"{p['IP']}:{p['PublicPort']}->{p['PrivatePort']}/{p['Type']}" if p.get("PublicPort")
+            else f"{p['PrivatePort']}/{p['Type']}"
+            for p in c.get("Ports") or [])
+        rows.append({
+            "ID": _short_id(c["Id"]),
+            "Name": ", ".join(n.lstrip("/") for n in c.get("Names") or []),
+            "Image": c.get("Image", ""),
+            "State": c.get("State", ""),
+            "Status": c.get("Status", ""),
+            "Ports": ports,
+            "Created": c.get("Created"),
+        })
+    return rows
+
+def image_rows(images):
+    rows = []
+    for image in images:
+        for tag in image.get("RepoTags") or ["<none>:<none>"]:
+            repository, _, version = tag.rpartition(":")
+            rows.append({
+                "Repository": repository,
+                "Tag": version,
+                "ID": _short_id(image["Id"]),
+                "Size": image.get("Size", 0),
+                "Created": image.get("Created"),
+            })
+    return rows
+
+def network_rows(networks):
+    return [{
+        "ID": _short_id(n["Id"]),
+        "Name": n["Name"],
+        "Driver": n.get("Driver", ""),
+        "Scope": n.get("Scope", ""),
+        "Subnets": ", ".join(c.get("Subnet", "") for c in (n.get("IPAM") or {}).get("Config") or []),
+    } for n in networks]
+
+def volume_rows(volumes):
+    return [{
+        "Name": v["Name"],
+        "Driver": v.get("Driver", ""),
+        "Mountpoint": v.get("Mountpoint", ""),
+        "Created": v.get("CreatedAt", ""),
+    } for v in volumes]
+
+def _labels(item):
+    return ", ".join(f"{k}={v}" for k, v in (item.get("Labels") or {}).items())
+
+def network_inspect_rows(networks):
+    rows = network_rows(networks)
+    for row, n in zip(rows, networks):
+        attached = n.get("Containers") or {}
+        row.update({
+            "Containers": len(attached),
+            "Attached": ", ".join(sorted(c.get("Name", "") for c in attached.values())),
+            "Internal": bool(n.get("Internal")),
+            "Labels": _labels(n),
+        })
+    return rows
+
+def volume_inspect_rows(volumes):
+    rows = volume_rows(volumes)
+    for row, v in zip(rows, volumes):
+        row.update({"Scope": v.get("Scope", ""), "Labels": _labels(v)})
+    return rows
+
+_clients = {}
+_clients_lock = threading.Lock()
+_reaper = None
+
+def _reap_idle_connections():
+    while True:
+        time.sleep(IDLE_CONNECTION_TIMEOUT / 2)
+        with _clients_lock:
+            clients = list(_clients.values())
+        for client in clients:
+            client.close_idle()
+
+def get_docker_client(connection=None):
+    """Return the shared client for the local socket or an SSH connection dict"""
+    key = (connection['host'], int(connection['port']), connection['username']) if connection else None
+    global _reaper
+    with _clients_lock:
+        # Idle SSH channels would otherwise stay checked out of the pool forever
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_idle_connections, name="docker-api-reaper", daemon=True)
+            _reaper.start()
+        client = _clients.get(key)
+        # Reconnecting with different credentials must not reuse the old client
+        if client is None or client.connection != connection:
+            if client is not None:
+                client.close()
+            client = DockerClient(connection=connection)
+            _clients[key] = client
+        return client
@@ -0,0 +1,258 @@
+# Live per-container Docker stats
+#
+# Every running container gets a reader thread subscribed to the daemon's
+# stats stream (one JSON sample per second). Each sample is reduced to CPU%,
+# memory and network/block I/O rates and appended to that container's ring
+# buffer. A supervisor thread picks up started and stopped containers, and
+# everything shuts down once no page has looked at the monitor for a while,
+# so idle servers hold no streams open.
+#
+# Over SSH every stream would be its own channel and remote dial-stdio
+# process, so remote hosts are polled instead: a one-shot sample per
+# container, with CPU% taken between consecutive polls. A pass starts every
+# POLL_INTERVAL on one keep-alive connection per container, up to
+# POLL_MAX_WORKERS. When a pass takes longer than the interval, samples come
+# that much less often; the monitor records the rate it actually achieves.
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from core.docker_api import DockerClient, get_docker_client
+from core.ssh_pool import DEFAULT_MAX_CHANNELS
+
+DEFAULT_HISTORY = 300
+DISCOVER_INTERVAL = 5.0
+IDLE_TIMEOUT = 120.0
+POLL_INTERVAL = 2.0
+# Each poll worker holds one SSH channel; leave the rest of a pooled transport to other pages
+POLL_MAX_WORKERS = max(1, DEFAULT_MAX_CHANNELS // 2)
+
+StatsSample = namedtuple("StatsSample", "timestamp cpu_percent memory memory_limit "
+                                        "net_rx_bps net_tx_bps block_read_bps block_write_bps")
+
+def _io_totals(stats):
+    """(rx, tx, block read, block write) byte counters from one stats document"""
+    networks = stats.get("networks") or {}
+    rx = sum(n.get("rx_bytes", 0) for n in networks.values())
+    tx = sum(n.get("tx_bytes", 0) for n in networks.values())
+    read = write = 0
+    for entry in (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+        op = entry.get("op", "").lower()
+        if op == "read":
+            read += entry.get("value", 0)
+        elif op == "write":
+            write += entry.get("value", 0)
+    return rx, tx, read, write
+
+def cpu_percent(stats):
+    """CPU% as `docker stats` computes it: container delta over host delta, times CPUs"""
+    cpu, precpu = stats.get("cpu_stats") or {}, stats.get("precpu_stats") or {}
+    cpu_delta = (cpu.get("cpu_usage") or {}).get("total_usage", 0) - (precpu.get("cpu_usage") or {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    cpus = cpu.get("online_cpus") or len((cpu.get("cpu_usage") or {}).get("percpu_usage") or []) or 1
+    if cpu_delta <= 0 or system_delta <= 0:
+        return 0.0
+    return cpu_delta / system_delta * cpus * 100.0
+
+def memory_usage(stats):
+    """(used, limit) excluding page cache, matching `docker stats`"""
+    memory = stats.get("memory_stats") or {}
+    details = memory.get("stats") or {}
+    # cgroup v2 reports inactive_file, v1 reports total_inactive_file or cache
+    cache = details.get("inactive_file", details.get("total_inactive_file", details.get("cache", 0)))
+    usage = memory.get("usage", 0)
+    return usage - cache if cache < usage else usage, memory.get("limit", 0)
+
+class _ContainerStream:
+    """Reader thread and ring buffer for one container"""
+
+    def __init__(self, container_id, name, history):
+        self.container_id = container_id
+        self.name = name
+        self.samples = deque(maxlen=history)
+        self.latest = None
+        self.error = None
+        self._previous = None
+        self._previous_cpu = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, stats, now=None):
+        """Record one stats document; returns None until CPU% can be computed"""
+        now = now or time.time()
+        if not (stats.get("precpu_stats") or {}).get("system_cpu_usage"):
+            # The first streamed document and one-shot polls carry no previous
+            # CPU reading; use the one from our own last sample
+            previous_cpu, self._previous_cpu = self._previous_cpu, stats.get("cpu_stats")
+            if previous_cpu is None:
+                return None
+            stats = dict(stats, precpu_stats=previous_cpu)
+        else:
+            self._previous_cpu = stats.get("cpu_stats")
+        totals = _io_totals(stats)
+        rates = (0.0, 0.0, 0.0, 0.0)
+        if self._previous:
+            elapsed = max(now - self._previous[0], 1e-6)
+            rates = tuple(max(0, cur - prev) / elapsed for cur, prev in zip(totals, self._previous[1]))
+        self._previous = (now, totals)
+        memory, limit = memory_usage(stats)
+        sample = StatsSample(now, cpu_percent(stats), memory, limit, *rates)
+        self.samples.append(sample)
+        self.latest = sample
+        return sample
+
+    def start(self, client):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(client,), name=f"docker-stats-{self.name}",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, client):
+        stream = client.stream(f"/containers/{self.container_id}/stats", {"stream": 1}, timeout=60)
+        try:
+            for stats in stream:
+                if self._stop.is_set():
+                    break
+                self.add(stats)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            stream.close()
+
+class ContainerStatsMonitor:
+    """Streams stats for every running container on one Docker host"""
+
+    def __init__(self, client, history=DEFAULT_HISTORY, discover_interval=DISCOVER_INTERVAL,
+                 idle_timeout=IDLE_TIMEOUT):
+        self.client = client
+        self.history = history
+        self.discover_interval = discover_interval
+        self.idle_timeout = idle_timeout
+        # Remote hosts are polled rather than streamed; see the module comment
+        self.polled = client.connection is not None
+        # Own keep-alive connections, one per poll worker, so a pass doesn't reopen dial-stdio
+        self.poll_client = DockerClient(connection=client.connection, max_idle=POLL_MAX_WORKERS) if self.polled else None
+        self.poll_workers = 0
+        self.poll_seconds = 0.0
+        self.streams = {}
+        self.error = None
+        self.last_viewed = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start watching (or keep watching) and mark the monitor as viewed"""
+        self.last_viewed = time.monotonic()
+        with self._lock:
+            if self.running():
+                return
+            self._stop.clear()
+            self.discover()
+            self._thread = threading.Thread(target=self._supervise, name="docker-stats-supervisor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            for stream in self.streams.values():
+                stream.stop()
+        if self.poll_client is not None:
+            self.poll_client.close()
+
+    def discover(self):
+        """Start streams for new running containers and drop ones that stopped"""
+        try:
+            containers = self.client.containers(all=False)
+            self.error = None
+        except Exception as e:
+            self.error = str(e)
+            return
+        running = {c["Id"]: (c.get("Names") or [c["Id"][:12]])[0].lstrip("/") for c in containers}
+        for container_id in [cid for cid in self.streams if cid not in running]:
+            self.streams.pop(container_id).stop()
+        for container_id, name in running.items():
+            stream = self.streams.get(container_id)
+            if stream is None:
+                stream = _ContainerStream(container_id, name, self.history)
+                self.streams[container_id] = stream
+            if not self.polled and not stream.alive():
+                # New container, or its stream dropped (daemon restart, timeout)
+                stream.start(self.client)
+
+    def _poll_one(self, stream):
+        try:
+            stream.add(self.poll_client.request("GET", f"/containers/{stream.container_id}/stats",
+                                                {"stream": 0, "one-shot": 1}))
+            stream.error = None
+        except Exception as e:
+            stream.error = str(e)
+
+    def poll(self):
+        """Take one sample of every known container, one worker per container up to POLL_MAX_WORKERS"""
+        with self._lock:
+            streams = list(self.streams.values())
+        start = time.monotonic()
+        self.poll_workers = max(1, min(len(streams), POLL_MAX_WORKERS))
+        with ThreadPoolExecutor(max_workers=self.poll_workers, thread_name_prefix="docker-stats-poll") as pool:
+            list(pool.map(self._poll_one, streams))
+        self.poll_seconds = time.monotonic() - start
+
+    def sample_interval(self):
+        """Seconds between samples of one container: the poll interval, or a whole pass when that is longer"""
+        if not self.polled:
+            return 1.0
+        return max(POLL_INTERVAL, self.poll_seconds)
+
+    def _supervise(self):
+        interval = POLL_INTERVAL if self.polled else self.discover_interval
+        last_discover = time.monotonic()
+        while True:
+            if self.polled:
+                self.poll()
+            # A pass counts towards the interval, so passes start every POLL_INTERVAL when they keep up
+            if self._stop.wait(max(0.0, interval - self.poll_seconds) if self.polled else interval):
+                return
+            if time.monotonic() - self.last_viewed > self.idle_timeout:
+                self.stop()
+                return
+            if time.monotonic() - last_discover >= self.discover_interval:
+                last_discover = time.monotonic()
+                with self._lock:
+                    self.discover()
+
+    def snapshot(self):
+        """[(name, container_id, latest StatsSample)] for containers with at least one sample"""
+        with self._lock:
+            streams = list(self.streams.values())
+        return [(s.name, s.container_id, s.latest) for s in streams if s.latest is not None]
+
+    def series(self, container_id):
+        """Buffered samples for one container, oldest first"""
+        stream = self.streams.get(container_id)
+        return list(stream.samples) if stream else []
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+def get_stats_monitor(connection=None):
+    """Return the shared stats monitor for the local host or an SSH connection dict"""
+    client = get_docker_client(connection)
+    with _monitors_lock:
+        monitor = _monitors.get(client.target)
+        if monitor is None or monitor.client is not client:
+            if monitor is not None:
+                monitor.stop()
+            monitor = ContainerStatsMonitor(client)
+            _monitors[client.target] = monitor
+        return monitor
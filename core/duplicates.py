@@ -0,0 +1,231 @@
+# Duplicate file finder
+#
+# Files are narrowed down in stages so that most of them are never read:
+# group by size, then hash only the first and last 64 KiB of same-size files,
+# then fully hash the files that still collide. Hashing runs on a thread pool
+# (hashlib releases the GIL on large buffers) with memory-mapped reads.
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from core.utils import format_bytes
+
+EDGE_BYTES = 64 * 1024
+HASH_CHUNK = 8 * 1024 * 1024
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# Hashes in flight per worker; keeps the pool busy without a future per candidate
+WINDOW_PER_WORKER = 4
+
+DuplicateGroup = namedtuple("DuplicateGroup", "digest size paths reclaimable")
+
+def iter_files(root):
+    """Yield (path, size) for every regular file under root without following symlinks"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry.path, entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+def _partial_hash(path, size):
+    """Hash the first and last EDGE_BYTES; also return the inode to spot hard links"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        fd = f.fileno()
+        digest.update(os.pread(fd, EDGE_BYTES, 0))
+        if size > EDGE_BYTES:
+            digest.update(os.pread(fd, EDGE_BYTES, max(EDGE_BYTES, size - EDGE_BYTES)))
+    return digest.hexdigest(), (stat.st_dev, stat.st_ino)
+
+def _full_hash(path, size):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            for offset in range(0, len(view), HASH_CHUNK):
+                digest.update(view[offset:offset + HASH_CHUNK])
+    return digest.hexdigest()
+
+def _hash_all(pool, func, items, stage, progress, weigh, window):
+    """Run func(path, size) over items on the pool; yield (item, result) as they finish
+
+    At most window items are submitted at a time.
+    """
+    total_bytes = sum(weigh(size) for _, size in items)
+    done = done_bytes = 0
+    pending = {}
+    queue = iter(items)
+    while True:
+        for item in queue:
+            pending[pool.submit(func, *item)] = item
+            if len(pending) >= window:
+                break
+        if not pending:
+            break
+        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            item = pending.pop(future)
+            done += 1
+            done_bytes += weigh(item[1])
+            try:
+                yield item, future.result()
+            except OSError:
+                pass
+            if progress:
+                progress(stage, done, len(items), done_bytes, total_bytes)
+
+def find_duplicates(files, min_size=1, workers=DEFAULT_WORKERS, progress=None):
+    """Find groups of identical files among (path, size) pairs
+
+    progress, if given, is called as progress(stage, done, total, bytes_done,
+    bytes_total) with stage 'partial' or 'full'. Groups are returned largest
+    reclaimable space first; hard links to the same inode are not counted as
+    reclaimable.
+    """
+    by_size = defaultdict(list)
+    for path, size in files:
+        if size >= min_size:
+            by_size[size].append(path)
+    candidates = [(path, size) for size, paths in by_size.items() if len(paths) > 1 for path in paths]
+
+    window = max(1, workers) * WINDOW_PER_WORKER
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Stage 2: head and tail only; small files are fully covered by it
+        by_partial = defaultdict(list)
+        for (path, size), (digest, inode) in _hash_all(pool, _partial_hash, candidates, "partial",
+                                                        progress, lambda size: min(size, 2 * EDGE_BYTES), window):
+            by_partial[(size, digest)].append((path, inode))
+
+        final = defaultdict(list)
+        needs_full = []
+        for (size, digest), members in by_partial.items():
+            if len(members) < 2:
+                continue
+            if size <= 2 * EDGE_BYTES:
+                final[(size, digest)].extend(members)
+            else:
+                needs_full.extend((path, size, inode) for path, inode in members)
+
+        # Stage 3: full content hash of what still collides
+        inodes = {path: inode for path, _, inode in needs_full}
+        for (path, size), digest in _hash_all(pool, _full_hash, [(path, size) for path, size, _ in needs_full],
+                                              "full", progress, lambda size: size, window):
+            final[(size, digest)].append((path, inodes[path]))
+
+    groups = []
+    for (size, digest), members in final.items():
+        if len(members) < 2:
+            continue
+        distinct = len({inode for _, inode in members})
+        if distinct < 2:
+            continue
+        paths = sorted(path for path, _ in members)
+        groups.append(DuplicateGroup(digest, size, paths, size * (distinct - 1)))
+    groups.sort(key=lambda g: g.reclaimable, reverse=True)
+    return groups
+
+def report_rows(groups):
+    for number, group in enumerate(groups, 1):
+        for path in group.paths:
+            yield {
+                "group": number,
+                "digest": group.digest,
+                "size_bytes": group.size,
+                "copies": len(group.paths),
+                "reclaimable_bytes": group.reclaimable,
+                "path": path,
+            }
+
+def to_csv(groups):
+    """CSV report with one row per file"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=["group", "digest", "size_bytes", "copies", "reclaimable_bytes", "path"])
+    writer.writeheader()
+    writer.writerows(report_rows(groups))
+    return output.getvalue()
+
+def to_json(groups):
+    """JSON report with one object per group"""
+    return json.dumps({
+        "reclaimable_bytes": sum(g.reclaimable for g in groups),
+        "groups": [g._asdict() for g in groups],
+    }, indent=2)
+
+def show_duplicate_finder(root, files=None, key="duplicates"):
+    """Scan for duplicates under root and show the groups with report downloads
+
+    files may be an iterable of (path, size) to reuse an existing listing;
+    otherwise root is walked with os.scandir.
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        min_kb = st.number_input("Ignore files smaller than (KB):", min_value=0, value=1, key=f"{key}_min_kb")
+    with col2:
+        workers = st.number_input("Hashing threads:", min_value=1, max_value=64, value=DEFAULT_WORKERS,
+                                  key=f"{key}_workers")
+
+    if st.button("🧬 Find Duplicates", key=f"{key}_btn"):
+        status = st.empty()
+        progress_bar = st.progress(0.0)
+        stage_names = {"partial": "Comparing file edges", "full": "Hashing full contents"}
+
+        def report_progress(stage, done, total, bytes_done, bytes_total):
+            # Redrawing on every file would flood the browser on large trees
+            if done == total or done % 200 == 0:
+                progress_bar.progress(done / total)
+                status.info(f"⏳ {stage_names[stage]}: {done}/{total} files, "
+                            f"{format_bytes(bytes_done)} of {format_bytes(bytes_total)}")
+
+        started = time.time()
+        status.info("⏳ Listing files...")
+        listing = files if files is not None else iter_files(root)
+        groups = find_duplicates(listing, min_size=max(1, min_kb * 1024), workers=int(workers),
+                                 progress=report_progress)
+        st.session_state[f"{key}_groups"] = groups
+        progress_bar.empty()
+        status.success(f"✅ Scan finished in {time.time() - started:.1f}s")
+
+    groups = st.session_state.get(f"{key}_groups")
+    if groups is None:
+        return
+    if not groups:
+        st.info("No duplicate files found")
+        return
+
+    total = sum(g.reclaimable for g in groups)
+    st.metric("Reclaimable space", format_bytes(total), f"{len(groups)} duplicate groups")
+    st.dataframe([{
+        "Size": format_bytes(g.size),
+        "Copies": len(g.paths),
+        "Reclaimable": format_bytes(g.reclaimable),
+        "Files": "\n".join(g.paths),
+    } for g in groups[:500]], use_container_width=True, hide_index=True)
+    if len(groups) > 500:
+        st.caption(f"Showing the 500 largest of {len(groups)} groups; the reports include all of them")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("📥 Download CSV Report", to_csv(groups), file_name="duplicates.csv",
+                           mime="text/csv", key=f"{key}_csv_btn")
+    with col2:
+        st.download_button("📥 Download JSON Report", to_json(groups), file_name="duplicates.json",
+                           mime="application/json", key=f"{key}_json_btn")
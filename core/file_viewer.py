@@ -0,0 +1,194 @@
+# Paged viewer for large text files
+#
+# The file is memory-mapped and a sparse index records where a line starts
+# roughly every BLOCK_BYTES, with its line number. Showing a page is a binary
+# search plus a short newline scan inside one block, so any page of a
+# multi-GB log opens as fast as the first. Indexes are cached per path and
+# mtime; a file that only grew (a log being written) is indexed from where
+# the previous scan stopped.
+import bisect
+import codecs
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+BLOCK_BYTES = 1024 * 1024
+SNIFF_BYTES = 64 * 1024
+MAX_LINE_BYTES = 16 * 1024
+MAX_CACHED_FILES = 16
+# Bytes before the indexed end that must be unchanged for a grown file to be extended
+GROWTH_CHECK_BYTES = 4096
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+def sniff_encoding(head):
+    """Return (encoding, bom_length, is_binary) from a file's first block"""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom), False
+    if b"\x00" in head:
+        # UTF-16 without a BOM: ASCII text leaves every other byte zero
+        even, odd = head[0::2], head[1::2]
+        if odd and odd.count(0) > 0.4 * len(odd) and even.count(0) < 0.05 * len(even):
+            return "utf-16-le", 0, False
+        if even and even.count(0) > 0.4 * len(even) and odd.count(0) < 0.05 * len(odd):
+            return "utf-16-be", 0, False
+        return None, 0, True
+    try:
+        # Incremental decode so a character cut at the end of the block is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8", 0, False
+    except UnicodeDecodeError:
+        pass
+    try:
+        head.decode("cp1252")
+        return "cp1252", 0, False
+    except UnicodeDecodeError:
+        return "latin-1", 0, False
+
+def _tail_digest(mapped, end):
+    return hashlib.blake2b(mapped[max(0, end - GROWTH_CHECK_BYTES):end], digest_size=16).digest()
+
+class LineIndex:
+    """Sparse newline index of one file"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.size = 0
+        self.mtime_ns = None
+        self.encoding = None
+        self.is_binary = False
+        self.newline = b"\n"
+        self.carriage_return = b"\r"
+        self.newline_count = 0
+        # offsets[k] is the start of line first_lines[k]
+        self.offsets = []
+        self.first_lines = []
+        self._scanned_to = 0
+        self._tail = b""
+        self._ends_with_newline = True
+        self._lock = threading.Lock()
+
+    @property
+    def line_count(self):
+        if self.size <= (self.offsets[0] if self.offsets else 0):
+            return 0
+        # A last line without a trailing newline still counts
+        return self.newline_count + (0 if self._ends_with_newline else 1)
+
+    def refresh(self):
+        """Build or extend the index if the file changed; returns self"""
+        with self._lock:
+            stat = os.stat(self.path)
+            if stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size:
+                return self
+            with open(self.path, "rb") as f:
+                if stat.st_size == 0:
+                    self._reset()
+                    self.encoding = "utf-8"
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        grew = (self.mtime_ns is not None and stat.st_size > self._scanned_to > 0
+                                and _tail_digest(mapped, self._scanned_to) == self._tail)
+                        if not grew:
+                            self._reset()
+                            self.encoding, bom, self.is_binary = sniff_encoding(mapped[:SNIFF_BYTES])
+                            if self.encoding and self.encoding.startswith(("utf-16", "utf-32")):
+                                # Wide encodings: newlines are searched as their encoded form
+                                self.newline = "\n".encode(self.encoding)
+                                self.carriage_return = "\r".encode(self.encoding)
+                            self.offsets, self.first_lines = [bom], [0]
+                            self._scanned_to = bom
+                        self._scan(mapped, len(mapped))
+            self.size = stat.st_size
+            self.mtime_ns = stat.st_mtime_ns
+            return self
+
+    def _reset(self):
+        self.newline = b"\n"
+        self.carriage_return = b"\r"
+        self.newline_count = 0
+        self.offsets, self.first_lines = [], []
+        self._scanned_to = 0
+        self._tail = b""
+        self.is_binary = False
+        self._ends_with_newline = True
+
+    def _scan(self, mapped, size):
+        """Count newlines from _scanned_to, adding a checkpoint about every BLOCK_BYTES"""
+        newline = self.newline
+        pos = self._scanned_to
+        next_block = self.offsets[-1] + BLOCK_BYTES
+        while next_block < size:
+            found = mapped.find(newline, max(next_block, pos), size)
+            if found == -1:
+                break
+            line_start = found + len(newline)
+            self.newline_count += mapped[pos:line_start].count(newline)
+            pos = line_start
+            if line_start < size:
+                self.offsets.append(line_start)
+                self.first_lines.append(self.newline_count)
+            next_block = line_start + BLOCK_BYTES
+        self.newline_count += mapped[pos:size].count(newline)
+        self._scanned_to = size
+        self._ends_with_newline = mapped[size - len(newline):size] == newline
+        self._tail = _tail_digest(mapped, size)
+
+    def _decode(self, data):
+        if data.endswith(self.carriage_return):
+            data = data[:-len(self.carriage_return)]
+        text = data[:MAX_LINE_BYTES].decode(self.encoding, errors="replace")
+        return text + " …" if len(data) > MAX_LINE_BYTES else text
+
+    def lines(self, start, count):
+        """Decoded lines start..start+count-1 (0-based)"""
+        if self.is_binary or count <= 0 or start >= self.line_count:
+            return []
+        start = max(0, start)
+        k = bisect.bisect_right(self.first_lines, start) - 1
+        newline = self.newline
+        result = []
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = min(len(mapped), self.size)
+            pos = self.offsets[k]
+            # Skip to the first wanted line inside this block
+            for _ in range(start - self.first_lines[k]):
+                pos = mapped.find(newline, pos, size) + len(newline)
+            while len(result) < count and pos < size:
+                end = mapped.find(newline, pos, size)
+                if end == -1:
+                    end = size
+                result.append(self._decode(mapped[pos:min(end, pos + MAX_LINE_BYTES + 1)]))
+                pos = end + len(newline)
+        return result
+
+    def tail(self, count):
+        """(first_line_number, lines) for the last count lines"""
+        first = max(0, self.line_count - count)
+        return first, self.lines(first, count)
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_line_index(path):
+    """Return the refreshed line index for a file, shared by every session"""
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = LineIndex(path)
+            _indexes[path] = index
+            if len(_indexes) > MAX_CACHED_FILES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(path)
+    return index.refresh()
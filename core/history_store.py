@@ -0,0 +1,212 @@
+# Append-only activity history backed by SQLite
+#
+# Each action is one INSERT instead of rewriting a JSON file, so concurrent
+# sessions never lose each other's writes. Actions are queued and a writer
+# thread commits whatever has piled up in a single transaction, so a burst of
+# actions costs one fsync. WAL mode lets pages read while the writer commits.
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config.settings import DATA_PATH
+
+DEFAULT_DB_PATH = os.path.join(DATA_PATH, "user_history.db")
+LEGACY_JSON_PATH = os.path.join(DATA_PATH, "user_history.json")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_RETENTION_DAYS = 365
+# How long the writer waits for more actions before committing a batch
+DEFAULT_BATCH_DELAY = 0.25
+# Retention is enforced every this many committed batches
+PRUNE_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    category TEXT NOT NULL,
+    action TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_category_timestamp ON history (category, timestamp);
+"""
+
+class HistoryStore:
+    """Activity log with batched appends and indexed, paged queries"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 retention_days=DEFAULT_RETENTION_DAYS, batch_delay=DEFAULT_BATCH_DELAY):
+        self.path = path
+        self.max_entries = max_entries
+        self.retention_days = retention_days
+        self.batch_delay = batch_delay
+        self._pending = queue.Queue()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._batches = 0
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(path)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        if is_new and path == DEFAULT_DB_PATH:
+            self.import_json(LEGACY_JSON_PATH)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- Writing ----------
+
+    def record(self, category, action, timestamp=None):
+        """Queue one action; it is committed with the next batch"""
+        self._pending.put((timestamp if timestamp is not None else time.time(), category, action))
+        self._wakeup.set()
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Give a burst of actions a moment to arrive so they share one commit;
+            # they stay queued meanwhile so readers that flush still see them
+            time.sleep(self.batch_delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass
+
+    def _drain(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self._pending.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def _write(self, rows):
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.executemany("INSERT INTO history (timestamp, category, action) VALUES (?, ?, ?)", rows)
+            self._batches += 1
+            if self._batches % PRUNE_EVERY == 1:
+                self._prune(conn)
+
+    def flush(self):
+        """Commit queued actions now instead of waiting for the writer"""
+        with self._write_lock:
+            self._write(self._drain())
+
+    def _prune(self, conn):
+        if self.retention_days:
+            conn.execute("DELETE FROM history WHERE timestamp < ?",
+                         (time.time() - self.retention_days * 86400,))
+        if self.max_entries:
+            conn.execute("DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?",
+                         (self.max_entries,))
+
+    def import_json(self, json_path):
+        """Import entries from the old user_history.json format"""
+        try:
+            with open(json_path, 'r') as f:
+                entries = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return 0
+        rows = []
+        for entry in entries:
+            try:
+                timestamp = datetime.strptime(entry["timestamp"], TIMESTAMP_FORMAT).timestamp()
+                rows.append((timestamp, entry["category"], entry["action"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+        with self._write_lock:
+            self._write(rows)
+        return len(rows)
+
+    def clear(self):
+        with self._write_lock:
+            self._drain()
+            with self._connect() as conn:
+                conn.execute("DELETE FROM history")
+
+    # ---------- Reading ----------
+
+    @staticmethod
+    def _where(category, start, end):
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, category=None, start=None, end=None, limit=50, offset=0):
+        """Return entries newest first as dicts with a formatted timestamp"""
+        self.flush()
+        where, params = self._where(category, start, end)
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT timestamp, category, action FROM history{where} "
+                                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                                params + [limit, offset]).fetchall()
+        return [{
+            "timestamp": datetime.fromtimestamp(row["timestamp"]).strftime(TIMESTAMP_FORMAT),
+            "category": row["category"],
+            "action": row["action"],
+        } for row in rows]
+
+    def count(self, category=None, start=None, end=None):
+        self.flush()
+        where, params = self._where(category, start, end)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+
+    def categories(self):
+        self.flush()
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT category FROM history ORDER BY category")]
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_history_store():
+    """Return the process-wide history store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore()
+                atexit.register(_store.flush)
+    return _store
@@ -0,0 +1,115 @@
+# Batch image resizing on a process pool
+#
+# Each worker opens one file from disk, lets the JPEG decoder downscale
+# while decoding (Image.draft), resizes and encodes it, and sends back only
+# the encoded bytes. The parent keeps a bounded window of images in flight
+# and writes results into one zip as they finish, so memory holds a few
+# images at a time however large the batch is.
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PIL import Image
+
+from core.utils import process_pool_context
+
+DEFAULT_WORKERS = os.cpu_count() or 4
+# Images in flight per worker; enough to keep every core busy between results
+WINDOW_PER_WORKER = 2
+
+RESAMPLING_FILTERS = {
+    "Lanczos": Image.LANCZOS,
+    "Bicubic": Image.BICUBIC,
+    "Bilinear": Image.BILINEAR,
+    "Nearest": Image.NEAREST,
+}
+
+OUTPUT_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+def resize_image(path, size, keep_aspect=True, output_format="JPEG", quality=85,
+                 resample=Image.LANCZOS):
+    """Resize one image file and return (encoded bytes, (width, height))"""
+    with Image.open(path) as image:
+        # JPEG only: decode at 1/2, 1/4 or 1/8 scale when that is still at least the target size
+        image.draft("RGB", size)
+        if keep_aspect:
+            image.thumbnail(size, resample)
+        else:
+            image = image.resize(size, resample)
+        if output_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        options = {"quality": quality} if output_format in ("JPEG", "WEBP") else {"optimize": True}
+        image.save(output, format=output_format, **options)
+        return output.getvalue(), image.size
+
+def _unique_name(name, used):
+    base, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{base}_{n}{ext}"
+    used.add(candidate)
+    return candidate
+
+def resize_to_zip(items, zip_path, size, keep_aspect=True, output_format="JPEG", quality=85,
+                  resample=Image.LANCZOS, workers=DEFAULT_WORKERS, progress=None):
+    """Resize (name, path) pairs on a process pool and write the results into one zip
+
+    progress, if given, is called as progress(done, total, images_per_second).
+    Returns a dict with counts, errors, byte totals and throughput.
+    """
+    items = list(items)
+    ext = OUTPUT_FORMATS[output_format]
+    window = max(1, workers * WINDOW_PER_WORKER)
+    used_names = set()
+    errors = []
+    done = input_bytes = output_bytes = 0
+    start = time.perf_counter()
+
+    partial_path = zip_path + ".part"
+    try:
+        # Encoded images are already compressed; deflating them again only costs time
+        with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as pool, \
+                zipfile.ZipFile(partial_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            pending = {}
+            queue = iter(items)
+            while True:
+                for name, path in queue:
+                    future = pool.submit(resize_image, path, size, keep_aspect, output_format, quality, resample)
+                    pending[future] = (name, path)
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, path = pending.pop(future)
+                    done += 1
+                    try:
+                        data, _ = future.result()
+                    except Exception as e:
+                        errors.append((name, str(e)))
+                        continue
+                    input_bytes += os.path.getsize(path)
+                    output_bytes += len(data)
+                    archive.writestr(_unique_name(f"{os.path.splitext(name)[0]}.{ext}", used_names), data)
+                if progress:
+                    progress(done, len(items), done / max(time.perf_counter() - start, 1e-9))
+        os.replace(partial_path, zip_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+    seconds = time.perf_counter() - start
+    return {
+        "images": done - len(errors),
+        "errors": errors,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "seconds": seconds,
+        "images_per_second": done / seconds if seconds else 0.0,
+    }
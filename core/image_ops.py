@@ -0,0 +1,211 @@
+# Cached image operations for the image tools
+#
+# An upload is decoded once into a NumPy array keyed by a hash of its bytes.
+# Edits are described as a pipeline of (operation, parameters) steps and
+# evaluated with OpenCV/NumPy; every intermediate result is memoized in a
+# process-wide LRU bounded by bytes, so changing the last step reuses the
+# steps before it. Previews run on a copy scaled to screen size and the full
+# resolution result is only computed for downloads.
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image
+
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+PREVIEW_MAX_SIDE = 1200
+FULL = None
+
+def _resize(array, width, height, scale):
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    # INTER_AREA averages pixels when shrinking; cubic looks better when enlarging
+    shrinking = size[0] * size[1] < array.shape[0] * array.shape[1]
+    return cv2.resize(array, size, interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_CUBIC)
+
+def _rotate(array, angle, scale):
+    # Counter-clockwise about the centre, keeping the canvas size, like PIL's Image.rotate
+    height, width = array.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(array, matrix, (width, height))
+
+def _grayscale(array, scale):
+    return array if array.ndim == 2 else cv2.cvtColor(array, cv2.COLOR_RGB2GRAY)
+
+def _sketch(array, blur, scale):
+    gray = _grayscale(array, scale)
+    # Keep the blur proportional to the image so previews match the full result
+    ksize = max(3, round(blur * scale)) | 1
+    blurred = cv2.GaussianBlur(255 - gray, (ksize, ksize), 0)
+    return cv2.divide(gray, 255 - blurred, scale=256)
+
+OPERATIONS = {
+    "resize": _resize,
+    "rotate": _rotate,
+    "grayscale": _grayscale,
+    "sketch": _sketch,
+}
+
+class ImageCache:
+    """Thread-safe LRU of arrays and encoded images, bounded by total bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = value.nbytes if isinstance(value, np.ndarray) else len(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.nbytes if isinstance(previous, np.ndarray) else len(previous)
+            self._items[key] = value
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.bytes -= evicted.nbytes if isinstance(evicted, np.ndarray) else len(evicted)
+        return value
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_image_cache():
+    """Return the process-wide image cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ImageCache()
+    return _cache
+
+class ImagePipeline:
+    """A decoded image plus a chain of operations, evaluated lazily"""
+
+    def __init__(self, digest, steps=()):
+        self.digest = digest
+        self.steps = tuple(steps)
+
+    def then(self, operation, *params):
+        """Return a new pipeline with one more step"""
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown image operation: {operation}")
+        return ImagePipeline(self.digest, self.steps + ((operation, params),))
+
+    def resize(self, width, height):
+        return self.then("resize", width, height)
+
+    def rotate(self, angle):
+        return self.then("rotate", angle) if angle % 360 else self
+
+    def grayscale(self):
+        return self.then("grayscale")
+
+    def sketch(self, blur=21):
+        return self.then("sketch", blur)
+
+    def output_size(self, source):
+        """(width, height) of the full-resolution result for a source array"""
+        height, width = source.shape[:2]
+        for operation, params in self.steps:
+            if operation == "resize":
+                width, height = params[:2]
+        return width, height
+
+    def render(self, max_side=FULL):
+        """Evaluate the pipeline, reusing the longest cached prefix
+
+        With max_side the work is scaled so the result fits it: the source is
+        scaled first and size-dependent parameters are scaled to match. A
+        result that is already small after a resize is rendered at full size.
+        """
+        cache = get_image_cache()
+        source = cache.get((self.digest, FULL, ()))
+        if source is None:
+            raise KeyError("Image is no longer cached; decode the upload again")
+        scale = 1.0
+        output_side = max(self.output_size(source))
+        if max_side and output_side > max_side:
+            scale = max_side / output_side
+
+        # Start from the longest prefix already computed at this resolution.
+        # The scale depends on the steps, so it, not max_side, keys the level
+        level = round(scale, 6) if scale != 1.0 else FULL
+        done = len(self.steps)
+        result = cache.get((self.digest, level, self.steps))
+        while result is None and done > 0:
+            done -= 1
+            result = cache.get((self.digest, level, self.steps[:done]))
+        if result is None:
+            result = cache.put((self.digest, level, ()),
+                               _resize(source, source.shape[1], source.shape[0], scale))
+
+        for i in range(done, len(self.steps)):
+            operation, params = self.steps[i]
+            result = OPERATIONS[operation](result, *params, scale)
+            cache.put((self.digest, level, self.steps[:i + 1]), result)
+        return result
+
+    def encode(self, image_format="PNG"):
+        """Full-resolution result encoded for download; cached like any other step"""
+        cache = get_image_cache()
+        key = (self.digest, image_format, self.steps)
+        data = cache.get(key)
+        if data is None:
+            output = io.BytesIO()
+            Image.fromarray(self.render()).save(output, format=image_format)
+            data = cache.put(key, output.getvalue())
+        return data
+
+MAX_KNOWN_UPLOADS = 256
+
+_digests = OrderedDict()
+_infos = OrderedDict()
+_digests_lock = threading.Lock()
+
+def _remember(table, key, value):
+    with _digests_lock:
+        table[key] = value
+        table.move_to_end(key)
+        if len(table) > MAX_KNOWN_UPLOADS:
+            table.popitem(last=False)
+
+def load_upload(uploaded_file):
+    """Decode an upload once and return (ImagePipeline, info dict)
+
+    The decoded array is keyed by a hash of the file's bytes, so the same image
+    uploaded again, or in another session, is not decoded twice.
+    """
+    file_id = getattr(uploaded_file, "file_id", None)
+    digest = _digests.get(file_id) if file_id else None
+    if digest is None:
+        digest = hashlib.blake2b(uploaded_file.getvalue(), digest_size=20).hexdigest()
+        if file_id:
+            _remember(_digests, file_id, digest)
+
+    info = _infos.get(digest)
+    if info is None or get_image_cache().get((digest, FULL, ())) is None:
+        uploaded_file.seek(0)
+        with Image.open(uploaded_file) as image:
+            info = {"size": image.size, "mode": image.mode, "format": image.format}
+            array = np.asarray(image.convert("RGB"))
+        get_image_cache().put((digest, FULL, ()), array)
+        _remember(_infos, digest, info)
+    return ImagePipeline(digest), info
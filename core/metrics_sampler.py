@@ -0,0 +1,129 @@
+# Background system metrics sampler
+#
+# One daemon thread per server process reads psutil at a fixed interval into a
+# ring buffer. Page reruns only read the buffer, so rendering the header costs
+# no syscalls no matter how many sessions are connected.
+import os
+import threading
+import time
+from collections import deque
+
+import psutil
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_HISTORY = 300
+
+class MetricsSampler:
+    """Sample CPU, RAM, disk I/O and network into a fixed-size ring buffer"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, history=DEFAULT_HISTORY):
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self.latest = None
+        self.static_info = {}
+        self._previous = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read_static_info(self):
+        freq = psutil.cpu_freq()
+        memory = psutil.virtual_memory()
+        try:
+            disk_total = psutil.disk_usage(os.path.abspath(os.sep)).total
+        except OSError:
+            disk_total = 0
+        speeds = [s.speed for s in psutil.net_if_stats().values() if s.isup and s.speed]
+        return {
+            "cpu_cores": psutil.cpu_count(logical=True) or 0,
+            "cpu_physical_cores": psutil.cpu_count(logical=False) or 0,
+            "cpu_freq_mhz": (freq.max or freq.current) if freq else 0,
+            "memory_total": memory.total,
+            "disk_total": disk_total,
+            "net_speed_mbps": max(speeds) if speeds else 0,
+            "boot_time": psutil.boot_time(),
+        }
+
+    def sample(self):
+        """Take one sample and append it to the buffer"""
+        now = time.time()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        counters = (
+            now,
+            disk.read_bytes if disk else 0,
+            disk.write_bytes if disk else 0,
+            net.bytes_sent if net else 0,
+            net.bytes_recv if net else 0,
+        )
+
+        rates = (0.0, 0.0, 0.0, 0.0)
+        if self._previous:
+            elapsed = max(now - self._previous[0], 1e-6)
+            rates = tuple(max(0, cur - prev) / elapsed for cur, prev in zip(counters[1:], self._previous[1:]))
+        self._previous = counters
+
+        try:
+            load_avg = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            load_avg = None
+
+        sample = {
+            "timestamp": now,
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "load_avg": load_avg,
+            "memory_used": memory.total - memory.available,
+            "memory_total": memory.total,
+            "memory_percent": memory.percent,
+            "disk_read_bps": rates[0],
+            "disk_write_bps": rates[1],
+            "net_sent_bps": rates[2],
+            "net_recv_bps": rates[3],
+            "uptime_seconds": now - self.static_info.get("boot_time", now),
+        }
+        self.samples.append(sample)
+        # Single reference swap, so readers never see a half-written sample
+        self.latest = sample
+        return sample
+
+    def start(self):
+        """Take a first sample synchronously and start the background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self.static_info = self._read_static_info()
+        psutil.cpu_percent(interval=None)  # Prime the CPU counter
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                # Keep sampling even if one read fails (e.g. a disk disappeared)
+                continue
+
+    def history(self, field, limit=None):
+        """Return the buffered values of one field, oldest first"""
+        samples = list(self.samples)
+        if limit:
+            samples = samples[-limit:]
+        return [s[field] for s in samples]
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_sampler(interval=DEFAULT_INTERVAL, history=DEFAULT_HISTORY):
+    """Return the process-wide sampler, starting it on first call"""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                sampler = MetricsSampler(interval, history)
+                sampler.start()
+                _sampler = sampler
+    return _sampler
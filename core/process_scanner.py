@@ -0,0 +1,145 @@
+# Incremental process scanner
+#
+# psutil.Process objects are kept between scans so cpu_percent() measures the
+# time since the previous scan, and RSS / I/O growth can be reported per
+# process. Top-N selection uses a heap instead of sorting every process.
+import heapq
+import threading
+import time
+from collections import namedtuple
+
+import psutil
+
+ProcessSample = namedtuple(
+    "ProcessSample",
+    "pid name username rss cpu_percent io_bytes num_fds rss_delta io_delta growth_streak",
+)
+
+# Metric -> extra per-process reads it needs
+METRICS = {
+    "rss": (),
+    "cpu": (),
+    "io": ("io",),
+    "fds": ("fds",),
+}
+SORT_FIELDS = {"rss": "rss", "cpu": "cpu_percent", "io": "io_bytes", "fds": "num_fds"}
+
+# Consecutive scans with growing RSS before a process is flagged
+LEAK_STREAK = 3
+
+class _Tracked:
+    __slots__ = ("process", "name", "username", "rss", "io_bytes", "growth_streak")
+
+    def __init__(self, process):
+        self.process = process
+        self.name = ""
+        self.username = ""
+        self.rss = None
+        self.io_bytes = None
+        self.growth_streak = 0
+
+class ProcessScanner:
+    """Scan processes incrementally and pick the top N by a metric"""
+
+    def __init__(self):
+        self._tracked = {}
+        self._lock = threading.Lock()
+        self.last_scan_at = None
+        self.last_scan_seconds = None
+
+    def scan(self, metrics=("rss", "cpu")):
+        """Refresh every process and return a list of ProcessSample"""
+        extras = {extra for metric in metrics for extra in METRICS[metric]}
+        with self._lock:
+            start = time.perf_counter()
+            pids = set(psutil.pids())
+
+            # Forget processes that exited
+            for pid in list(self._tracked):
+                if pid not in pids:
+                    del self._tracked[pid]
+
+            samples = []
+            for pid in pids:
+                tracked = self._tracked.get(pid)
+                if tracked is None:
+                    try:
+                        tracked = _Tracked(psutil.Process(pid))
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+                    self._tracked[pid] = tracked
+                sample = self._sample(pid, tracked, extras)
+                if sample is not None:
+                    samples.append(sample)
+
+            self.last_scan_at = time.time()
+            self.last_scan_seconds = time.perf_counter() - start
+            return samples
+
+    def _sample(self, pid, tracked, extras):
+        process = tracked.process
+        try:
+            with process.oneshot():
+                if not tracked.name:
+                    # Name and owner don't change, read them once
+                    tracked.name = process.name()
+                    try:
+                        tracked.username = process.username()
+                    except (psutil.AccessDenied, KeyError):
+                        tracked.username = ""
+                rss = process.memory_info().rss
+                cpu = process.cpu_percent(interval=None)
+                io_bytes = None
+                num_fds = None
+                if "io" in extras:
+                    try:
+                        io = process.io_counters()
+                        io_bytes = io.read_bytes + io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        pass
+                if "fds" in extras:
+                    try:
+                        num_fds = process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+                    except psutil.AccessDenied:
+                        pass
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            self._tracked.pop(pid, None)
+            return None
+        except psutil.AccessDenied:
+            return None
+
+        rss_delta = rss - tracked.rss if tracked.rss is not None else 0
+        io_delta = io_bytes - tracked.io_bytes if io_bytes is not None and tracked.io_bytes is not None else 0
+        tracked.growth_streak = tracked.growth_streak + 1 if rss_delta > 0 else 0
+        tracked.rss = rss
+        if io_bytes is not None:
+            tracked.io_bytes = io_bytes
+
+        return ProcessSample(pid, tracked.name, tracked.username, rss, cpu, io_bytes, num_fds,
+                             rss_delta, io_delta, tracked.growth_streak)
+
+    def top(self, n=5, by="rss", samples=None):
+        """Return the n largest processes by 'rss', 'cpu', 'io' or 'fds'"""
+        if samples is None:
+            samples = self.scan(metrics=("rss", "cpu", by))
+        field = SORT_FIELDS[by]
+        return heapq.nlargest(n, (s for s in samples if getattr(s, field) is not None),
+                              key=lambda s: getattr(s, field))
+
+    def growing(self, n=10, samples=None, streak=LEAK_STREAK):
+        """Processes whose RSS grew on each of the last `streak` scans, biggest growth first"""
+        if samples is None:
+            samples = self.scan()
+        return heapq.nlargest(n, (s for s in samples if s.growth_streak >= streak), key=lambda s: s.rss_delta)
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+def get_process_scanner():
+    """Return the process-wide scanner"""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = ProcessScanner()
+    return _scanner
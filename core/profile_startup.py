@@ -0,0 +1,195 @@
+# Import-time and first-render profiler for the app
+#
+# Usage: python -m core.profile_startup [--output data/startup_profile.json]
+#
+# Each module under modules/ is imported in a fresh interpreter so the numbers
+# are not skewed by whatever an earlier module already pulled in. The first
+# render of main.py is timed the same way, through Streamlit's AppTest.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES_DIR = os.path.join(PROJECT_ROOT, "modules")
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, "data", "startup_profile.json")
+MAIN_SCRIPT = os.path.join(PROJECT_ROOT, "main.py")
+
+# Already loaded by every Streamlit worker, so it is imported before timing
+BASELINE_MODULES = ["streamlit"]
+
+# Third-party packages known to dominate import time
+HEAVY_PACKAGES = {
+    "cv2", "mediapipe", "librosa", "sklearn", "scipy", "plotly", "boto3", "botocore",
+    "pygame", "pyttsx3", "instagrapi", "google", "matplotlib", "seaborn", "pandas",
+    "numpy", "paramiko", "twilio", "streamlit_webrtc", "av", "PyPDF2", "openai",
+    "psutil", "PIL", "numba", "tensorflow", "torch",
+}
+
+RESULT_MARKER = "__PROFILE_RESULT__"
+
+# Runs inside the child interpreter: argv[1] is the module, argv[2:] the baseline
+_CHILD_CODE = r"""
+import importlib, json, sys, time
+
+# (bytes, kind): current RSS, or the peak so far when psutil is missing
+def rss():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss, "current"
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, "peak"
+
+for name in sys.argv[2:]:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+
+before = set(sys.modules)
+rss_before, rss_kind = rss()
+start = time.perf_counter()
+error = None
+try:
+    importlib.import_module(sys.argv[1])
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+elapsed = time.perf_counter() - start
+rss_after, _ = rss()
+
+new_modules = set(sys.modules) - before
+stdlib = getattr(sys, "stdlib_module_names", set())
+top_level = sorted({m.split(".")[0] for m in new_modules} - set(stdlib) - {"modules", "core", "config"})
+print(%r + json.dumps({
+    "seconds": elapsed,
+    # A peak can't be turned into growth, so the fallback reports it as is
+    "rss_growth": rss_after - rss_before if rss_kind == "current" else None,
+    "peak_rss": rss_after if rss_kind == "peak" else None,
+    "new_modules": len(new_modules),
+    "packages": top_level,
+    "error": error,
+}))
+""" % RESULT_MARKER
+
+# Runs inside the child interpreter: argv[1] is the script, argv[2] the timeout
+_RENDER_CODE = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+app = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+start = time.perf_counter()
+error = None
+try:
+    app.run()
+    if app.exception:
+        error = app.exception[0].message
+except Exception as e:
+    error = f"{type(e).__name__}: {e}"
+print(%r + json.dumps({"seconds": time.perf_counter() - start, "error": error}))
+""" % RESULT_MARKER
+
+def discover_modules(modules_dir=MODULES_DIR):
+    """Find every feature module under modules/ as a dotted import path"""
+    found = []
+    for root, dirs, files in os.walk(modules_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(("_", ".")))
+        for filename in sorted(files):
+            if filename.endswith(".py") and filename != "__init__.py":
+                rel_path = os.path.relpath(os.path.join(root, filename), PROJECT_ROOT)
+                found.append(rel_path[:-3].replace(os.sep, "."))
+    return found
+
+def _run_child(args, timeout):
+    """Run child code in a fresh interpreter and return its result dict"""
+    try:
+        result = subprocess.run([sys.executable, "-c"] + args, capture_output=True, text=True,
+                                timeout=timeout, cwd=PROJECT_ROOT)
+    except subprocess.TimeoutExpired:
+        return {"error": f"Timed out after {timeout}s"}
+
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "No result"}
+
+def profile_module(module_path, baseline=BASELINE_MODULES, timeout=300):
+    """Import one module in a fresh interpreter and measure its cost"""
+    record = {"module": module_path, "seconds": None, "rss_growth": None, "peak_rss": None,
+              "new_modules": 0, "packages": [], "heavy": [], "error": None}
+    record.update(_run_child([_CHILD_CODE, module_path] + list(baseline), timeout))
+    record["heavy"] = [p for p in record["packages"] if p in HEAVY_PACKAGES]
+    return record
+
+def profile_first_render(script=MAIN_SCRIPT, timeout=300):
+    """Time the first full run of the app script, as a new browser session would trigger it"""
+    record = {"script": os.path.relpath(script, PROJECT_ROOT), "seconds": None, "error": None}
+    record.update(_run_child([_RENDER_CODE, script, str(timeout)], timeout + 30))
+    return record
+
+def profile_all(modules=None, baseline=BASELINE_MODULES, timeout=300):
+    """Profile every module and return records sorted by import time"""
+    records = [profile_module(m, baseline, timeout) for m in (modules or discover_modules())]
+    return sorted(records, key=lambda r: r["seconds"] if r["seconds"] is not None else -1, reverse=True)
+
+def write_report(records, output_path=DEFAULT_OUTPUT, first_render=None):
+    """Write profile records, and the first-render timing if given, as JSON"""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    report = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "baseline": BASELINE_MODULES,
+        "modules": records,
+        "first_render": first_render,
+    }
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def load_report(path=DEFAULT_OUTPUT):
+    """Load a previously written report, or None if there isn't one"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+
+def _megabytes(value):
+    return f"{value / (1024 ** 2):.1f}" if value is not None else "-"
+
+def format_table(records):
+    """Format records as a plain-text table sorted by import time"""
+    lines = [f"{'Module':<42} {'Time (s)':>9} {'RSS +MB':>8} {'Peak MB':>8}  Heavy dependencies"]
+    lines.append("-" * 100)
+    for r in records:
+        seconds = f"{r['seconds']:.3f}" if r["seconds"] is not None else "-"
+        heavy = ", ".join(r["heavy"]) or "-"
+        if r["error"]:
+            heavy = f"{heavy}  [{r['error']}]"
+        lines.append(f"{r['module']:<42} {seconds:>9} {_megabytes(r['rss_growth']):>8} "
+                     f"{_megabytes(r.get('peak_rss')):>8}  {heavy}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Profile import time of every tool module and the first render")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON report")
+    parser.add_argument("--module", action="append", dest="modules", help="Only profile this module (repeatable)")
+    parser.add_argument("--timeout", type=int, default=300, help="Seconds allowed per module")
+    parser.add_argument("--no-render", action="store_true", help="Skip timing the first render of main.py")
+    args = parser.parse_args(argv)
+
+    records = profile_all(args.modules, timeout=args.timeout)
+    first_render = None if args.no_render else profile_first_render(timeout=args.timeout)
+    write_report(records, args.output, first_render)
+    print(format_table(records))
+    if first_render:
+        render = f"{first_render['seconds']:.3f}s" if first_render["seconds"] is not None else "-"
+        print(f"\nFirst render of {first_render['script']}: {render}"
+              + (f"  [{first_render['error']}]" if first_render["error"] else ""))
+    print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
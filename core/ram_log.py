@@ -0,0 +1,216 @@
+# Continuous RAM sampler with an append-only binary log
+#
+# Samples go into an in-memory ring buffer and are flushed in batches to
+# fixed-width binary segments that rotate by size. Because every record has
+# the same width and timestamps only grow, a time window is found with a
+# binary search over a memory-mapped segment: reading the last hour of a
+# month-long log touches a few pages instead of parsing the whole history.
+import atexit
+import glob
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import psutil
+
+from config.settings import DATA_PATH
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("total", "<u8"),
+    ("available", "<u8"),
+    ("used", "<u8"),
+    ("percent", "<f4"),
+])
+
+DEFAULT_LOG_DIR = os.path.join(DATA_PATH, "ram_log")
+DEFAULT_SEGMENT_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_SEGMENTS = 12
+
+class BinaryRamLog:
+    """Append-only log of RAM samples split into size-rotated segments"""
+
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, segment_bytes=DEFAULT_SEGMENT_BYTES,
+                 max_segments=DEFAULT_MAX_SEGMENTS):
+        self.log_dir = log_dir
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.active_path = os.path.join(log_dir, "active.bin")
+        self._lock = threading.Lock()
+        os.makedirs(log_dir, exist_ok=True)
+
+    def segments(self):
+        """Segment paths, oldest first; rotated names sort chronologically"""
+        rotated = sorted(glob.glob(os.path.join(self.log_dir, "segment-*.bin")))
+        if os.path.exists(self.active_path):
+            rotated.append(self.active_path)
+        return rotated
+
+    def append(self, records):
+        """Append a batch of records with one write and one fsync"""
+        if len(records) == 0:
+            return
+        data = np.asarray(records, dtype=RECORD_DTYPE).tobytes()
+        with self._lock:
+            with open(self.active_path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.getsize(self.active_path) >= self.segment_bytes:
+                self._rotate()
+
+    def _rotate(self):
+        first = self._open(self.active_path)
+        start = int(first["timestamp"][0]) if len(first) else int(time.time())
+        del first
+        os.replace(self.active_path, os.path.join(self.log_dir, f"segment-{start:012d}.bin"))
+        rotated = sorted(glob.glob(os.path.join(self.log_dir, "segment-*.bin")))
+        for path in rotated[:-self.max_segments] if self.max_segments else []:
+            os.remove(path)
+
+    @staticmethod
+    def _open(path):
+        """Memory-map a segment; a torn trailing record is ignored"""
+        try:
+            count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+        except FileNotFoundError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+    def read_last(self, n):
+        """Return the newest n records"""
+        parts = []
+        remaining = n
+        for path in reversed(self.segments()):
+            data = self._open(path)
+            take = data[-remaining:] if remaining < len(data) else data
+            parts.append(np.array(take))
+            remaining -= len(take)
+            if remaining <= 0:
+                break
+        parts.reverse()
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD_DTYPE)
+
+    def read_range(self, start, end=None, max_points=None):
+        """Return records with start <= timestamp < end, thinned to max_points"""
+        end = end if end is not None else float("inf")
+        slices = []
+        for path in self.segments():
+            data = self._open(path)
+            if len(data) == 0 or data["timestamp"][-1] < start or data["timestamp"][0] >= end:
+                continue
+            timestamps = data["timestamp"]
+            lo = np.searchsorted(timestamps, start, side="left")
+            hi = np.searchsorted(timestamps, end, side="left")
+            if hi > lo:
+                slices.append(data[lo:hi])
+
+        total = sum(len(s) for s in slices)
+        if total == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        step = max(1, -(-total // max_points)) if max_points else 1
+        # Strided views only fault in the pages they touch
+        return np.concatenate([np.array(s[::step]) for s in slices])
+
+    def size_bytes(self):
+        return sum(os.path.getsize(p) for p in self.segments())
+
+class RamSampler:
+    """Sample RAM at a fixed rate into a ring buffer and flush it in batches"""
+
+    def __init__(self, log=None, interval=1.0, flush_interval=30.0, buffer_size=3600):
+        self.log = log or BinaryRamLog()
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.buffer = deque(maxlen=buffer_size)
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        ram = psutil.virtual_memory()
+        record = (time.time(), ram.total, ram.available, ram.used, ram.percent)
+        self.buffer.append(record)
+        with self._pending_lock:
+            self._pending.append(record)
+        return record
+
+    def flush(self):
+        """Write pending samples to the log"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        self.log.append(pending)
+        self._last_flush = time.monotonic()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ram-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+        self.flush()
+
+    def _run(self):
+        while True:
+            try:
+                self.sample()
+                if time.monotonic() - self._last_flush >= self.flush_interval:
+                    self.flush()
+            except Exception:
+                pass
+            # Re-read the interval every tick so the UI can change the rate live
+            if self._stop.wait(self.interval):
+                break
+
+    def recent(self, n=None):
+        """Newest samples from the ring buffer as a structured array"""
+        records = list(self.buffer)
+        if n:
+            records = records[-n:]
+        return np.array(records, dtype=RECORD_DTYPE)
+
+    def read_window(self, start, max_points=None):
+        """Records since start: newest from the ring buffer, older ones from what is already on disk
+
+        Nothing is flushed, so a page showing a long window never writes or fsyncs.
+        """
+        buffered = self.recent()
+        if len(buffered) and buffered["timestamp"][0] <= start:
+            older = np.empty(0, dtype=RECORD_DTYPE)
+        else:
+            # Samples still pending a flush are in the buffer, so the log only needs to reach its first one
+            end = buffered["timestamp"][0] if len(buffered) else None
+            older = self.log.read_range(start, end, max_points=max_points)
+        newer = buffered[buffered["timestamp"] >= start]
+        if max_points and len(newer) > max_points:
+            newer = newer[::-(-len(newer) // max_points)]
+        return np.concatenate([older, newer])
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_ram_sampler():
+    """Return the process-wide RAM sampler, started on first call"""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = RamSampler()
+                _sampler.start()
+                # Don't lose the last batch when the server shuts down
+                atexit.register(_sampler.flush)
+    return _sampler
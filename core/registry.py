@@ -0,0 +1,89 @@
+# Lazy tool registry
+import importlib
+import sys
+import threading
+import time
+
+# Category -> {menu function name: module path}
+# Modules are only imported the first time their category is opened, so a
+# cold start on the dashboard never pulls in cv2, mediapipe, librosa, boto3...
+TOOL_REGISTRY = {
+    "linux": {
+        "linux_commands_menu": "modules.linux.commands",
+    },
+    "python": {
+        "communication_menu": "modules.python.communication",
+        "file_tools_menu": "modules.python.file_tools",
+        "web_tools_menu": "modules.python.web_tools",
+        "advanced_python_tools_menu": "modules.python.advanced_tools",
+    },
+    "ml": {
+        "machine_learning_menu": "modules.machine_learning.calculators",
+    },
+    "devops": {
+        "docker_tools_menu": "modules.devops.docker_tools",
+        "aws_tools_menu": "modules.devops.aws_tools",
+    },
+    "projects": {
+        "utility_projects_menu": "modules.projects.utility_tools",
+        "hand_gesture_projects_menu": "modules.projects.hand_gesture_tools",
+    },
+    "javascript": {
+        "javascript_demos_menu": "modules.javascript.demos",
+    },
+    "user": {
+        "user_page": "user",
+    },
+}
+
+# Module path -> import record, filled in as categories are opened
+_import_times = {}
+_import_lock = threading.Lock()
+
+def _import_module(module_path, category):
+    """Import a module once and record how long the first import took"""
+    if module_path in _import_times:
+        return sys.modules[module_path]
+
+    with _import_lock:
+        if module_path in _import_times:
+            return sys.modules[module_path]
+
+        already_loaded = module_path in sys.modules
+        start = time.perf_counter()
+        module = importlib.import_module(module_path)
+        elapsed = time.perf_counter() - start
+
+        _import_times[module_path] = {
+            "module": module_path,
+            "category": category,
+            "seconds": elapsed,
+            "preloaded": already_loaded,
+            "loaded_at": time.time(),
+        }
+        return module
+
+def get_tool(category, name):
+    """Return a menu function, importing its module on first use"""
+    try:
+        module_path = TOOL_REGISTRY[category][name]
+    except KeyError:
+        raise KeyError(f"Unknown tool '{name}' in category '{category}'")
+    module = _import_module(module_path, category)
+    return getattr(module, name)
+
+def load_category(category):
+    """Import every module of a category and return {name: function}"""
+    return {name: get_tool(category, name) for name in TOOL_REGISTRY.get(category, {})}
+
+def is_loaded(category):
+    """Check whether all modules of a category have been imported"""
+    return all(path in _import_times for path in TOOL_REGISTRY.get(category, {}).values())
+
+def get_import_times():
+    """Return import cost per module, most expensive first
+
+    The first module to import a heavy shared dependency (cv2, mediapipe...)
+    is charged for it, later modules reuse it from sys.modules.
+    """
+    return sorted(_import_times.values(), key=lambda r: r["seconds"], reverse=True)
@@ -0,0 +1,83 @@
+# Run one command across many SSH hosts at once
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.ssh_pool import ssh_pool
+
+DEFAULT_MAX_WORKERS = 16
+
+def parse_inventory(text, default_username="", default_port=22):
+    """Parse an inventory with one 'host', 'user@host' or 'user@host:port' per line
+
+    Blank lines and lines starting with '#' are ignored, duplicates are dropped.
+    """
+    hosts = []
+    seen = set()
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+
+        username, _, address = line.rpartition('@')
+        host, port = address, default_port
+        if address.count(':') == 1:
+            host, port_text = address.split(':')
+            port = int(port_text) if port_text.isdigit() else default_port
+
+        entry = {'host': host, 'port': int(port), 'username': username or default_username}
+        key = (entry['host'], entry['port'], entry['username'])
+        if key not in seen:
+            seen.add(key)
+            hosts.append(entry)
+    return hosts
+
+def run_on_host(host, command, password, timeout=30):
+    """Run a command on one host through the shared pool and time it"""
+    result = {
+        'host': host['host'],
+        'port': host['port'],
+        'username': host['username'],
+        'status': 'ok',
+        'exit_code': None,
+        'latency_ms': None,
+        'output': '',
+        'error': '',
+    }
+    start = time.perf_counter()
+    try:
+        with ssh_pool.session(host['host'], host['port'], host['username'], password) as client:
+            stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
+            try:
+                result['output'] = stdout.read().decode('utf-8', errors='replace')
+                result['error'] = stderr.read().decode('utf-8', errors='replace')
+                result['exit_code'] = stdout.channel.recv_exit_status()
+            finally:
+                # Don't leave the channel open on the pooled transport after a timeout
+                stdout.channel.close()
+            if result['exit_code'] != 0:
+                result['status'] = 'failed'
+    except socket.timeout:
+        result['status'] = 'timeout'
+        result['error'] = f"Timed out after {timeout}s"
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    result['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+def run_on_hosts(hosts, command, password, max_workers=DEFAULT_MAX_WORKERS, timeout=30):
+    """Run a command on every host concurrently, yielding results as they finish"""
+    if not hosts:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(hosts)), thread_name_prefix="ssh-fleet") as executor:
+        futures = [executor.submit(run_on_host, host, command, password, timeout) for host in hosts]
+        for future in as_completed(futures):
+            yield future.result()
+
+def summarize(results):
+    """Count results per status"""
+    summary = {'ok': 0, 'failed': 0, 'timeout': 0, 'error': 0}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return summary
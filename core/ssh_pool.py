@@ -0,0 +1,212 @@
+# Process-wide pool of SSH connections
+#
+# One paramiko transport per (host, port, username) is shared by every rerun,
+# session and page, and many exec_command channels are multiplexed over it.
+# Only callers presenting the same password share a transport.
+import hashlib
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+
+import paramiko
+
+DEFAULT_MAX_CHANNELS = 8
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_KEEPALIVE = 30
+DEFAULT_CONNECT_TIMEOUT = 10
+
+def _digest(password):
+    """Hash a password so the pool never compares or keeps it in plain text"""
+    return hashlib.sha256((password or "").encode("utf-8")).digest()
+
+class PooledConnection:
+    """One SSH transport plus bookkeeping for the pool"""
+
+    def __init__(self, key, client, password_digest):
+        self.key = key
+        self.client = client
+        self.password_digest = password_digest
+        self.active_channels = 0
+        self.commands_run = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def is_alive(self):
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+class SSHConnectionPool:
+    """Share SSH transports across reruns and users, keyed by host, port and user"""
+
+    def __init__(self, max_channels=DEFAULT_MAX_CHANNELS, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 keepalive=DEFAULT_KEEPALIVE, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+        self._connections = {}
+        # key -> Event set when an in-progress handshake for that key finishes
+        self._connecting = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._stop = threading.Event()
+
+    def _connect(self, host, port, username, password):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(host, port=port, username=username, password=password, timeout=self.connect_timeout)
+        client.get_transport().set_keepalive(self.keepalive)
+        return client
+
+    def _start_reaper(self):
+        """Start the idle-eviction thread on first use"""
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, name="ssh-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1, min(self.idle_timeout, 60) / 2)
+        while not self._stop.wait(interval):
+            self.evict_idle()
+
+    def acquire(self, host, port, username, password):
+        """Reserve a channel slot on a pooled connection, connecting if needed"""
+        key = (host, int(port), username)
+        digest = _digest(password)
+
+        while True:
+            with self._lock:
+                self._start_reaper()
+                conns = self._connections.setdefault(key, [])
+                for conn in list(conns):
+                    if not conn.is_alive() and conn.active_channels == 0:
+                        conns.remove(conn)
+                        conn.close()
+                        continue
+                    if (conn.active_channels < self.max_channels and conn.is_alive()
+                            and hmac.compare_digest(conn.password_digest, digest)):
+                        conn.active_channels += 1
+                        conn.last_used = time.monotonic()
+                        return conn
+                connecting = self._connecting.get(key)
+                if connecting is None:
+                    connecting = self._connecting[key] = threading.Event()
+                    break
+            # Another caller is opening a transport to this host; share it once it is up
+            connecting.wait()
+
+        # Handshake outside the lock so other hosts are not blocked by a slow one
+        try:
+            conn = PooledConnection(key, self._connect(host, int(port), username, password), digest)
+            conn.active_channels = 1
+            with self._lock:
+                self._connections.setdefault(key, []).append(conn)
+            return conn
+        finally:
+            with self._lock:
+                self._connecting.pop(key, None)
+            connecting.set()
+
+    def release(self, conn):
+        """Give a channel slot back to the pool"""
+        with self._lock:
+            conn.active_channels = max(0, conn.active_channels - 1)
+            conn.last_used = time.monotonic()
+
+    @contextmanager
+    def session(self, host, port, username, password):
+        """Context manager yielding a connected paramiko.SSHClient"""
+        conn = self.acquire(host, port, username, password)
+        try:
+            yield conn.client
+            conn.commands_run += 1
+        finally:
+            self.release(conn)
+
+    def exec_command(self, host, port, username, password, command, timeout=30):
+        """Run a command over a pooled transport and return (output, error)"""
+        with self.session(host, port, username, password) as client:
+            stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
+            try:
+                output = stdout.read().decode('utf-8')
+                error = stderr.read().decode('utf-8')
+                return output, error
+            finally:
+                # A timed-out or failed read would otherwise leave the channel open on the shared transport
+                stdout.channel.close()
+
+    def close(self, host, port, username, only_idle=True):
+        """Close pooled connections for one host; busy ones are kept unless only_idle is False"""
+        key = (host, int(port), username)
+        with self._lock:
+            conns = self._connections.get(key, [])
+            for conn in list(conns):
+                if not only_idle or conn.active_channels == 0:
+                    conns.remove(conn)
+                    conn.close()
+            if not conns:
+                self._connections.pop(key, None)
+
+    def evict_idle(self):
+        """Close connections that are dead or idle for longer than idle_timeout"""
+        now = time.monotonic()
+        with self._lock:
+            for key, conns in list(self._connections.items()):
+                for conn in list(conns):
+                    idle = conn.active_channels == 0 and now - conn.last_used > self.idle_timeout
+                    dead = conn.active_channels == 0 and not conn.is_alive()
+                    if idle or dead:
+                        conns.remove(conn)
+                        conn.close()
+                if not conns:
+                    del self._connections[key]
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for conns in self._connections.values():
+                for conn in conns:
+                    conn.close()
+            self._connections.clear()
+
+    def stats(self):
+        """Return a summary row per pooled connection"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "host": key[0],
+                    "port": key[1],
+                    "username": key[2],
+                    "alive": conn.is_alive(),
+                    "active_channels": conn.active_channels,
+                    "commands_run": conn.commands_run,
+                    "idle_seconds": round(now - conn.last_used, 1),
+                    "age_seconds": round(now - conn.created_at, 1),
+                }
+                for key, conns in self._connections.items()
+                for conn in conns
+            ]
+
+# Shared by every Streamlit session in this server process
+ssh_pool = SSHConnectionPool()
+
+def run_remote_command(connection, command, timeout=30):
+    """Execute a command for a session's connection dict and return (output, error)"""
+    if not connection:
+        return None, "Not connected to remote server"
+
+    try:
+        return ssh_pool.exec_command(
+            connection['host'], connection['port'], connection['username'],
+            connection.get('password'), command, timeout=timeout
+        )
+    except Exception as e:
+        return None, str(e)
@@ -0,0 +1,228 @@
+# Streaming command execution, locally or over the shared SSH pool
+import codecs
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from core.ssh_pool import ssh_pool
+
+READ_CHUNK = 32 * 1024
+# Lines waiting to be consumed; readers block when full so a fast producer
+# cannot grow memory without bound
+QUEUE_SIZE = 1000
+
+class _LineSplitter:
+    """Turn a byte stream into text lines, treating \\r as a line break for progress output"""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending = ""
+
+    def feed(self, data):
+        text = self._pending + self._decoder.decode(data)
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        *lines, self._pending = text.split('\n')
+        return lines
+
+    def flush(self):
+        rest = self._pending + self._decoder.decode(b'', final=True)
+        self._pending = ""
+        return [rest] if rest else []
+
+class StreamingCommand:
+    """Run a command and yield ('stdout' | 'stderr', line) pairs as they arrive
+
+    With a connection dict ({'host', 'port', 'username', 'password'}) the
+    command runs over the shared SSH pool, otherwise it runs locally.
+    """
+
+    def __init__(self, command, connection=None, timeout=None, cwd=None):
+        self.command = command
+        self.connection = connection
+        self.timeout = timeout
+        self.cwd = cwd
+        self.returncode = None
+        self.timed_out = False
+        self.cancelled = False
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stop the command; lines() finishes on its next iteration"""
+        self._cancel.set()
+        self.cancelled = True
+
+    def _deadline_passed(self, start):
+        return self.timeout is not None and time.monotonic() - start > self.timeout
+
+    def lines(self, idle_interval=None):
+        """Yield (stream, line) pairs; with idle_interval, also (None, None) after that
+        many seconds without output, so callers regain control while a command is silent
+        """
+        if self.connection:
+            return self._remote_lines(idle_interval)
+        return self._local_lines(idle_interval)
+
+    def _idle_tick(self, idle_interval, last_yield):
+        return idle_interval is not None and time.monotonic() - last_yield >= idle_interval
+
+    def _local_lines(self, idle_interval=None):
+        shell = isinstance(self.command, str)
+        kwargs = {'start_new_session': True} if os.name == 'posix' else {}
+        process = subprocess.Popen(self.command, shell=shell, cwd=self.cwd,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+        lines = queue.Queue(maxsize=QUEUE_SIZE)
+
+        def reader(pipe, name):
+            splitter = _LineSplitter()
+            for data in iter(lambda: pipe.read1(READ_CHUNK), b''):
+                for line in splitter.feed(data):
+                    lines.put((name, line))
+            for line in splitter.flush():
+                lines.put((name, line))
+            lines.put((name, None))
+
+        readers = [threading.Thread(target=reader, args=(process.stdout, 'stdout'), daemon=True),
+                   threading.Thread(target=reader, args=(process.stderr, 'stderr'), daemon=True)]
+        for thread in readers:
+            thread.start()
+
+        start = last_yield = time.monotonic()
+        open_streams = 2
+        try:
+            while open_streams:
+                if self._cancel.is_set():
+                    break
+                if self._deadline_passed(start):
+                    self.timed_out = True
+                    break
+                try:
+                    name, line = lines.get(timeout=0.1)
+                except queue.Empty:
+                    if self._idle_tick(idle_interval, last_yield):
+                        last_yield = time.monotonic()
+                        yield None, None
+                    continue
+                if line is None:
+                    open_streams -= 1
+                else:
+                    last_yield = time.monotonic()
+                    yield name, line
+        finally:
+            # Runs on cancel, timeout and when Streamlit stops the script mid-stream
+            if process.poll() is None:
+                _terminate(process)
+            # Unblock readers stuck on a full queue
+            while any(t.is_alive() for t in readers):
+                try:
+                    lines.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            self.returncode = process.wait()
+
+    def _remote_lines(self, idle_interval=None):
+        command = self.command if isinstance(self.command, str) else shlex.join(self.command)
+        conn = self.connection
+        with ssh_pool.session(conn['host'], conn['port'], conn['username'], conn.get('password')) as client:
+            channel = client.get_transport().open_session()
+            try:
+                channel.exec_command(command)
+                splitters = {'stdout': _LineSplitter(), 'stderr': _LineSplitter()}
+                start = last_yield = time.monotonic()
+                while True:
+                    if self._cancel.is_set():
+                        break
+                    if self._deadline_passed(start):
+                        self.timed_out = True
+                        break
+                    got_data = False
+                    if channel.recv_ready():
+                        got_data = True
+                        for line in splitters['stdout'].feed(channel.recv(READ_CHUNK)):
+                            last_yield = time.monotonic()
+                            yield 'stdout', line
+                    if channel.recv_stderr_ready():
+                        got_data = True
+                        for line in splitters['stderr'].feed(channel.recv_stderr(READ_CHUNK)):
+                            last_yield = time.monotonic()
+                            yield 'stderr', line
+                    if not got_data:
+                        if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                            break
+                        if self._idle_tick(idle_interval, last_yield):
+                            last_yield = time.monotonic()
+                            yield None, None
+                        time.sleep(0.05)
+                for name, splitter in splitters.items():
+                    for line in splitter.flush():
+                        yield name, line
+                if channel.exit_status_ready():
+                    self.returncode = channel.recv_exit_status()
+                else:
+                    self.returncode = -1
+            finally:
+                channel.close()
+
+def _terminate(process):
+    """Terminate a process and its children, escalating to kill"""
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait(timeout=3)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            if os.name == 'posix':
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+def stream_command(command, connection=None, timeout=None, cwd=None, key="stream",
+                   max_lines=200, refresh_interval=0.2):
+    """Run a command and show its output live in the page
+
+    Only the last max_lines lines are kept on screen and in memory. Clicking
+    Cancel reruns the script, which stops this loop and terminates the
+    command. Returns (returncode, last lines as text, StreamingCommand).
+    """
+    runner = StreamingCommand(command, connection=connection, timeout=timeout, cwd=cwd)
+    st.button("⏹️ Cancel", key=f"{key}_cancel_btn")
+    status = st.empty()
+    output = st.empty()
+    tail = deque(maxlen=max_lines)
+    total = 0
+    last_render = 0.0
+
+    status.info("⏳ Running...")
+    started = time.monotonic()
+    # Idle ticks hand control back to Streamlit, so Cancel works while the command prints nothing
+    for name, line in runner.lines(idle_interval=max(refresh_interval, 0.5)):
+        if name is None:
+            status.info(f"⏳ Running... {time.monotonic() - started:.0f}s, no new output")
+            continue
+        tail.append(line if name == 'stdout' else f"[stderr] {line}")
+        total += 1
+        now = time.monotonic()
+        if now - last_render >= refresh_interval:
+            output.code('\n'.join(tail), language='bash')
+            last_render = now
+
+    output.code('\n'.join(tail), language='bash')
+    if runner.timed_out:
+        status.warning(f"⏱️ Timed out after {timeout}s ({total} lines)")
+    elif runner.returncode == 0:
+        status.success(f"✅ Finished ({total} lines)")
+    else:
+        status.error(f"❌ Exited with code {runner.returncode} ({total} lines)")
+    if total > max_lines:
+        st.caption(f"Showing the last {max_lines} of {total} lines")
+    return runner.returncode, '\n'.join(tail), runner
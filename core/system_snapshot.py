@@ -0,0 +1,237 @@
+# Structured system snapshots (processes, filesystems, interfaces, sockets)
+#
+# Local snapshots come from psutil, remote ones from a single compact shell
+# command over the shared SSH pool. Both return the same record types, parsed
+# once per refresh, so pages can render them as dataframes.
+import socket
+import time
+from collections import namedtuple
+
+import pandas as pd
+import psutil
+
+from core.ssh_pool import run_remote_command
+
+ProcessInfo = namedtuple("ProcessInfo", "pid user name cpu_percent memory_percent rss status command")
+FilesystemInfo = namedtuple("FilesystemInfo", "device mountpoint fstype total used free percent")
+InterfaceInfo = namedtuple("InterfaceInfo", "name family address netmask is_up speed_mbps")
+SocketInfo = namedtuple("SocketInfo", "proto status local_address remote_address pid process")
+
+RECORD_TYPES = {
+    "processes": ProcessInfo,
+    "filesystems": FilesystemInfo,
+    "interfaces": InterfaceInfo,
+    "sockets": SocketInfo,
+}
+
+SECTIONS = tuple(RECORD_TYPES)
+
+# One shell command per section; the remote collector joins the requested ones
+_REMOTE_COMMANDS = {
+    "processes": "ps -eo pid=,user=,pcpu=,pmem=,rss=,stat=,args=",
+    "filesystems": "df -PkT",
+    "interfaces": "ip -o addr show 2>/dev/null; echo '@@LINK'; ip -o link show 2>/dev/null",
+    "sockets": "ss -tunapH 2>/dev/null || ss -tunaH",
+}
+_MARKER = "@@SECTION "
+
+_FAMILIES = {socket.AF_INET: "inet", socket.AF_INET6: "inet6", getattr(psutil, "AF_LINK", -1): "link"}
+
+# ---------- Local collectors ----------
+
+def _local_processes():
+    records = []
+    for p in psutil.process_iter(['pid', 'username', 'name', 'cpu_percent', 'memory_percent',
+                                  'memory_info', 'status', 'cmdline']):
+        info = p.info
+        memory_info = info['memory_info']
+        records.append(ProcessInfo(
+            info['pid'], info['username'] or "", info['name'] or "",
+            info['cpu_percent'] or 0.0, round(info['memory_percent'] or 0.0, 2),
+            memory_info.rss if memory_info else 0, info['status'] or "",
+            " ".join(info['cmdline'] or []) or info['name'] or "",
+        ))
+    return records
+
+def _local_filesystems():
+    records = []
+    for part in psutil.disk_partitions(all=False):
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+        except (PermissionError, OSError):
+            continue
+        records.append(FilesystemInfo(part.device, part.mountpoint, part.fstype,
+                                      usage.total, usage.used, usage.free, usage.percent))
+    return records
+
+def _local_interfaces():
+    stats = psutil.net_if_stats()
+    records = []
+    for name, addrs in psutil.net_if_addrs().items():
+        stat = stats.get(name)
+        for addr in addrs:
+            records.append(InterfaceInfo(
+                name, _FAMILIES.get(addr.family, str(addr.family)), addr.address, addr.netmask or "",
+                bool(stat and stat.isup), stat.speed if stat else 0,
+            ))
+    return records
+
+def _local_sockets():
+    names = {}
+    records = []
+    for conn in psutil.net_connections(kind='inet'):
+        proto = "tcp" if conn.type == socket.SOCK_STREAM else "udp"
+        if conn.family == socket.AF_INET6:
+            proto += "6"
+        if conn.pid and conn.pid not in names:
+            try:
+                names[conn.pid] = psutil.Process(conn.pid).name()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                names[conn.pid] = ""
+        records.append(SocketInfo(
+            proto, conn.status if conn.status != psutil.CONN_NONE else "",
+            f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else "",
+            f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else "",
+            conn.pid, names.get(conn.pid, ""),
+        ))
+    return records
+
+_LOCAL_COLLECTORS = {
+    "processes": _local_processes,
+    "filesystems": _local_filesystems,
+    "interfaces": _local_interfaces,
+    "sockets": _local_sockets,
+}
+
+# ---------- Remote parsers ----------
+
+def parse_ps(text):
+    """Parse `ps -eo pid=,user=,pcpu=,pmem=,rss=,stat=,args=` output"""
+    records = []
+    for line in text.splitlines():
+        parts = line.split(None, 6)
+        if len(parts) < 7 or not parts[0].isdigit():
+            continue
+        pid, user, cpu, mem, rss, stat, command = parts
+        # comm can contain spaces, so the name is derived from args instead
+        if command.startswith('['):
+            name = command.strip('[]')
+        else:
+            name = command.split()[0].rsplit('/', 1)[-1]
+        records.append(ProcessInfo(int(pid), user, name, float(cpu), float(mem),
+                                   int(rss) * 1024, stat, command))
+    return records
+
+def parse_df(text):
+    """Parse `df -PkT` output"""
+    records = []
+    for line in text.splitlines()[1:]:
+        parts = line.split(None, 6)
+        if len(parts) < 7 or not parts[2].isdigit():
+            continue
+        device, fstype, total, used, free, percent, mountpoint = parts
+        records.append(FilesystemInfo(device, mountpoint, fstype, int(total) * 1024, int(used) * 1024,
+                                      int(free) * 1024, float(percent.rstrip('%') or 0)))
+    return records
+
+def parse_ip_addr(text):
+    """Parse `ip -o addr show` followed by '@@LINK' and `ip -o link show`"""
+    addr_text, _, link_text = text.partition('@@LINK')
+    up = {}
+    for line in link_text.splitlines():
+        parts = line.split()
+        if len(parts) >= 3:
+            name = parts[1].rstrip(':').split('@')[0]
+            up[name] = "UP" in parts[2].strip('<>').split(',')
+
+    records = []
+    for line in addr_text.splitlines():
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        name, family, cidr = parts[1], parts[2], parts[3]
+        address, _, prefix = cidr.partition('/')
+        records.append(InterfaceInfo(name, family, address, prefix and f"/{prefix}",
+                                     up.get(name, False), 0))
+    return records
+
+def parse_ss(text):
+    """Parse `ss -tunapH` output"""
+    records = []
+    for line in text.splitlines():
+        parts = line.split(None, 6)
+        if len(parts) < 6:
+            continue
+        proto, status, _, _, local, remote = parts[:6]
+        pid, process = None, ""
+        if len(parts) == 7 and 'pid=' in parts[6]:
+            users = parts[6]
+            process = users.split('"')[1] if '"' in users else ""
+            pid_text = users.split('pid=', 1)[1].split(',', 1)[0]
+            pid = int(pid_text) if pid_text.isdigit() else None
+        records.append(SocketInfo(proto, "" if status == "UNCONN" else status, local,
+                                  "" if remote in ("*:*", "0.0.0.0:*", "[::]:*") else remote, pid, process))
+    return records
+
+_REMOTE_PARSERS = {
+    "processes": parse_ps,
+    "filesystems": parse_df,
+    "interfaces": parse_ip_addr,
+    "sockets": parse_ss,
+}
+
+def split_sections(text):
+    """Split combined remote output into {section: text}"""
+    sections = {}
+    current = None
+    buffer = []
+    for line in text.splitlines():
+        if line.startswith(_MARKER):
+            if current:
+                sections[current] = "\n".join(buffer)
+            current = line[len(_MARKER):].strip()
+            buffer = []
+        else:
+            buffer.append(line)
+    if current:
+        sections[current] = "\n".join(buffer)
+    return sections
+
+# ---------- Public API ----------
+
+def collect_snapshot(connection=None, sections=SECTIONS, timeout=30):
+    """Collect the requested sections locally or over SSH
+
+    Returns {'collected_at', 'source', 'errors', <section>: [records]}.
+    """
+    snapshot = {"collected_at": time.time(), "source": "local", "errors": {}}
+
+    if connection:
+        snapshot["source"] = f"{connection['username']}@{connection['host']}"
+        command = "; ".join(f"echo '{_MARKER}{name}'; {_REMOTE_COMMANDS[name]}" for name in sections)
+        output, error = run_remote_command(connection, command, timeout=timeout)
+        if output is None:
+            for name in sections:
+                snapshot[name] = []
+                snapshot["errors"][name] = error
+            return snapshot
+        raw = split_sections(output)
+        for name in sections:
+            try:
+                snapshot[name] = _REMOTE_PARSERS[name](raw.get(name, ""))
+            except Exception as e:
+                snapshot[name] = []
+                snapshot["errors"][name] = str(e)
+        return snapshot
+
+    for name in sections:
+        try:
+            snapshot[name] = _LOCAL_COLLECTORS[name]()
+        except (psutil.AccessDenied, PermissionError, OSError) as e:
+            snapshot[name] = []
+            snapshot["errors"][name] = str(e) or type(e).__name__
+    return snapshot
+
+def to_dataframe(snapshot, section):
+    """Build a dataframe for one section of a snapshot"""
+    return pd.DataFrame.from_records(snapshot.get(section, []), columns=RECORD_TYPES[section]._fields)
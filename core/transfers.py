@@ -0,0 +1,387 @@
+# Chunked file downloads and resumable uploads
+#
+# st.download_button needs the whole payload in memory. Files above
+# INLINE_LIMIT are instead registered under a random token with a small
+# threaded HTTP server that streams them from disk in chunks, with Range
+# support so interrupted downloads can resume. The same server accepts
+# resumable uploads: PUT with Content-Range appends at the current offset,
+# HEAD reports the offset, and the file is checksummed before it is renamed
+# into place. Every transfer uses a fixed-size buffer.
+import hashlib
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+import streamlit as st
+
+from config.settings import DOWNLOAD_BASE_URL, DOWNLOAD_SERVER_HOST, DOWNLOAD_SERVER_PORT
+from core.utils import format_bytes
+
+INLINE_LIMIT = 50 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+TOKEN_TTL = 3600
+UPLOAD_TTL = 24 * 3600
+# Spooled uploads and generated files; Streamlit has no hook for a session
+# ending, so anything left here is swept once it is older than SCRATCH_TTL
+SCRATCH_DIR = os.path.join(tempfile.gettempdir(), "task-machine-scratch")
+SCRATCH_TTL = 6 * 3600
+SWEEP_INTERVAL = 60
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_upload(uploaded_file, dest_path, expected_sha256=None):
+    """Copy a Streamlit upload to disk in chunks, verify it, and return its SHA-256
+
+    The data goes to a .part file first, so a failed or mismatching upload
+    never replaces an existing file. Raises ValueError on checksum mismatch.
+    """
+    digest = hashlib.sha256()
+    part_path = dest_path + ".part"
+    uploaded_file.seek(0)
+    try:
+        with open(part_path, "wb") as out:
+            for chunk in iter(lambda: uploaded_file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        if expected_sha256 and digest.hexdigest() != expected_sha256.strip().lower():
+            raise ValueError(f"Checksum mismatch: got {digest.hexdigest()}")
+        os.replace(part_path, dest_path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return digest.hexdigest()
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+def sweep_scratch(ttl=SCRATCH_TTL):
+    """Delete scratch files not touched within ttl; runs at most once per SWEEP_INTERVAL"""
+    global _last_sweep
+    now = time.time()
+    with _sweep_lock:
+        if now - _last_sweep < SWEEP_INTERVAL:
+            return
+        _last_sweep = now
+    try:
+        entries = list(os.scandir(SCRATCH_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file(follow_symlinks=False) and now - entry.stat().st_mtime > ttl:
+                os.remove(entry.path)
+        except OSError:
+            continue
+
+def scratch_path(prefix="tmp", suffix=""):
+    """Create an empty, uniquely named file in the scratch directory and return its path"""
+    sweep_scratch()
+    os.makedirs(SCRATCH_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=SCRATCH_DIR)
+    os.close(fd)
+    return path
+
+def spool_upload(uploaded_file, directory=None):
+    """Copy an upload to a temporary file in chunks and return its path
+
+    Without a directory the copy goes to the swept scratch directory.
+    """
+    suffix = os.path.splitext(uploaded_file.name)[1]
+    if directory is None:
+        sweep_scratch()
+        os.makedirs(SCRATCH_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory or SCRATCH_DIR)
+    uploaded_file.seek(0)
+    with os.fdopen(fd, "wb") as out:
+        for chunk in iter(lambda: uploaded_file.read(CHUNK_SIZE), b""):
+            out.write(chunk)
+    return path
+
+def spooled_paths(uploaded_files, key):
+    """Spool uploads to disk once and return their paths in order
+
+    Reruns reuse the spooled copies; files no longer in the uploader are
+    deleted, and copies left behind by ended sessions are swept after SCRATCH_TTL.
+    """
+    if not isinstance(uploaded_files, (list, tuple)):
+        uploaded_files = [uploaded_files] if uploaded_files else []
+    cache = st.session_state.setdefault(key, {})
+    current = {}
+    for uploaded_file in uploaded_files:
+        file_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+        path = cache.get(file_id)
+        try:
+            # Still in use; keep it out of the sweep
+            os.utime(path)
+        except (OSError, TypeError):
+            path = spool_upload(uploaded_file)
+        current[file_id] = path
+    for file_id, path in cache.items():
+        if file_id not in current and os.path.exists(path):
+            os.remove(path)
+    st.session_state[key] = current
+    return list(current.values())
+
+class _TransferHandler(BaseHTTPRequestHandler):
+    server_version = "TaskMachineTransfers/1.0"
+
+    def do_GET(self):
+        token = unquote(self.path.lstrip("/").split("/", 1)[0])
+        path = self.server.registry.lookup(token)
+        if not path or not os.path.isfile(path):
+            self.send_error(404, "Unknown or expired download link")
+            return
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            first, _, last = range_header[6:].split(",")[0].partition("-")
+            try:
+                if first:
+                    start = int(first)
+                    end = min(int(last), size - 1) if last else size - 1
+                else:
+                    start = max(0, size - int(last))
+            except ValueError:
+                start, end = 0, size - 1
+            if start > end:
+                self.send_error(416, "Requested range not satisfiable")
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Disposition",
+                         f"attachment; filename*=UTF-8''{quote(os.path.basename(path))}")
+        self.end_headers()
+
+        remaining = end - start + 1
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _upload_target(self):
+        parts = self.path.lstrip("/").split("/")
+        if len(parts) < 2 or parts[0] != "upload":
+            return None
+        return self.server.uploads.lookup(unquote(parts[1]))
+
+    def do_HEAD(self):
+        target = self._upload_target()
+        if target is None:
+            self.send_error(404, "Unknown or expired upload link")
+            return
+        self.send_response(200)
+        self.send_header("Upload-Offset", str(target.offset))
+        self.send_header("Upload-Complete", "1" if target.completed else "0")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_PUT(self):
+        target = self._upload_target()
+        if target is None:
+            self.send_error(404, "Unknown or expired upload link")
+            return
+        if "Content-Length" not in self.headers:
+            self.send_error(411, "Content-Length required")
+            return
+        length = int(self.headers["Content-Length"])
+        start, total = 0, length
+        content_range = self.headers.get("Content-Range")
+        if content_range:
+            match = _CONTENT_RANGE.fullmatch(content_range.strip())
+            if not match:
+                self.send_error(400, "Bad Content-Range")
+                return
+            start = int(match.group(1))
+            total = None if match.group(3) == "*" else int(match.group(3))
+        elif target.offset:
+            # A plain PUT restarts the upload from scratch
+            target.reset()
+
+        if start != target.offset:
+            self.send_response(409)
+            self.send_header("Upload-Offset", str(target.offset))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        try:
+            written = target.write(self.rfile, length)
+        except (ConnectionError, OSError):
+            written = -1
+        if written != length:
+            # Whatever arrived stays in the .part file; the client resumes from HEAD's offset
+            return
+        if total is not None and target.offset >= total:
+            target.finish()
+
+        body = (f"{target.error}\n" if target.error else
+                f"offset={target.offset} sha256={target.sha256 or ''}\n").encode()
+        self.send_response(422 if target.error else 200)
+        self.send_header("Upload-Offset", str(target.offset))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class UploadTarget:
+    """A resumable upload being written to dest_path + '.part'"""
+
+    def __init__(self, dest_path, expected_sha256=None):
+        self.dest_path = os.path.abspath(dest_path)
+        self.part_path = self.dest_path + ".part"
+        self.expected_sha256 = expected_sha256.strip().lower() if expected_sha256 else None
+        self.sha256 = None
+        self.error = None
+        self.completed = False
+        self.updated_at = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def offset(self):
+        if self.completed:
+            return os.path.getsize(self.dest_path) if os.path.exists(self.dest_path) else 0
+        return os.path.getsize(self.part_path) if os.path.exists(self.part_path) else 0
+
+    def reset(self):
+        with self._lock:
+            if os.path.exists(self.part_path):
+                os.remove(self.part_path)
+            self.completed = False
+            self.error = None
+            self.sha256 = None
+
+    def write(self, stream, length):
+        with self._lock:
+            with open(self.part_path, "ab") as out:
+                remaining = length
+                while remaining > 0:
+                    chunk = stream.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    remaining -= len(chunk)
+                    self.updated_at = time.time()
+            return length - remaining
+
+    def finish(self):
+        """Verify the checksum and move the file into place"""
+        with self._lock:
+            digest = file_sha256(self.part_path) if os.path.exists(self.part_path) else hashlib.sha256().hexdigest()
+            if self.expected_sha256 and digest != self.expected_sha256:
+                self.error = f"Checksum mismatch: got {digest}, expected {self.expected_sha256}"
+                os.remove(self.part_path)
+                return
+            if not os.path.exists(self.part_path):
+                open(self.part_path, "wb").close()
+            os.replace(self.part_path, self.dest_path)
+            self.sha256 = digest
+            self.error = None
+            self.completed = True
+
+class DownloadRegistry:
+    """Maps random tokens to file paths for a limited time"""
+
+    def __init__(self, ttl=TOKEN_TTL):
+        self.ttl = ttl
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def _add(self, value):
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            now = time.time()
+            self._tokens = {t: v for t, v in self._tokens.items() if v[1] > now}
+            self._tokens[token] = (value, now + self.ttl)
+        return token
+
+    def register(self, path):
+        return self._add(os.path.abspath(path))
+
+    def lookup(self, token):
+        with self._lock:
+            entry = self._tokens.get(token)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        return None
+
+class UploadRegistry(DownloadRegistry):
+    """Maps random tokens to UploadTarget objects"""
+
+    def __init__(self, ttl=UPLOAD_TTL):
+        super().__init__(ttl)
+
+    def create(self, dest_path, expected_sha256=None):
+        target = UploadTarget(dest_path, expected_sha256)
+        return self._add(target), target
+
+_server = None
+_server_lock = threading.Lock()
+
+def get_download_server():
+    """Start the transfer server on first use and return it"""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                server = ThreadingHTTPServer((DOWNLOAD_SERVER_HOST, DOWNLOAD_SERVER_PORT), _TransferHandler)
+                server.daemon_threads = True
+                server.registry = DownloadRegistry()
+                server.uploads = UploadRegistry()
+                threading.Thread(target=server.serve_forever, name="transfer-server", daemon=True).start()
+                _server = server
+    return _server
+
+def download_url(path):
+    """Register a file and return a URL that streams it"""
+    token = get_download_server().registry.register(path)
+    return f"{DOWNLOAD_BASE_URL.rstrip('/')}/{token}/{quote(os.path.basename(path))}"
+
+def create_upload(dest_path, expected_sha256=None):
+    """Register a resumable upload; returns (url, UploadTarget)"""
+    token, target = get_download_server().uploads.create(dest_path, expected_sha256)
+    return f"{DOWNLOAD_BASE_URL.rstrip('/')}/upload/{token}", target
+
+def offer_download(path, label="📥 Download", key=None):
+    """Show a download for a file on disk without loading large files into memory"""
+    size = os.path.getsize(path)
+    if size <= INLINE_LIMIT:
+        with open(path, "rb") as f:
+            st.download_button(label, data=f.read(), file_name=os.path.basename(path), key=key)
+        return
+    try:
+        url = download_url(path)
+    except OSError as e:
+        st.error(f"❌ Could not start the download server: {e}")
+        return
+    st.link_button(f"{label} ({format_bytes(size)})", url)
+    st.caption(f"Large files are streamed from disk; the link expires in {TOKEN_TTL // 60} minutes")
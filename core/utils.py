@@ -1,4 +1,5 @@
 # Utility functions for the application
+import multiprocessing
 import os
 import subprocess
 import streamlit as st
@@ -37,6 +38,13 @@ def get_file_info(filepath):
     except Exception as e:
         return f"Error: {e}"
 
+def process_pool_context():
+    """Multiprocessing context for process pools started from the server"""
+    # Forking the multithreaded Streamlit server can copy locks held by other
+    # threads into the children; start workers from a clean process instead
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
 def safe_execute(func, *args, **kwargs):
     """Safely execute a function with error handling"""
     try:
@@ -62,3 +70,29 @@ def validate_input(value, validation_type="text"):
     elif validation_type == "url":
         return value.startswith(("http://", "https://"))
     return True
+
+def format_duration(seconds):
+    """Format a duration in seconds as e.g. '5 days', '3 hours' or '12 min'"""
+    seconds = int(seconds)
+    if seconds >= 86400:
+        days = seconds // 86400
+        return f"{days} day{'s' if days != 1 else ''}"
+    if seconds >= 3600:
+        hours = seconds // 3600
+        return f"{hours} hour{'s' if hours != 1 else ''}"
+    return f"{seconds // 60} min"
+
+def sparkline_svg(values, width=120, height=28, color="#6a0dad"):
+    """Render a list of numbers as a tiny inline SVG line chart"""
+    values = [v for v in values if v is not None]
+    if len(values) < 2:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    step = width / (len(values) - 1)
+    points = " ".join(
+        f"{i * step:.1f},{height - 2 - (v - low) / span * (height - 4):.1f}"
+        for i, v in enumerate(values)
+    )
+    return (f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<polyline fill="none" stroke="{color}" stroke-width="1.5" points="{points}"/></svg>')
@@ -1,19 +1,10 @@
 # Main application entry point
 import streamlit as st
 from core.app import initialize_app
-from modules.linux.commands import linux_commands_menu, linux_network_tools
-from modules.linux.advanced_commands import advanced_linux_commands_menu
-from modules.python.communication import communication_menu
-from modules.python.file_tools import file_tools_menu
-from modules.python.web_tools import web_tools_menu
-from modules.python.advanced_tools import advanced_python_tools_menu
-from modules.machine_learning.calculators import machine_learning_menu
-from modules.projects.utility_tools import utility_projects_menu
-from modules.projects.hand_gesture_tools import hand_gesture_projects_menu
-from modules.devops.docker_tools import docker_tools_menu
-from modules.devops.aws_tools import aws_tools_menu
-from modules.javascript.demos import javascript_demos_menu
-import user
+from core.registry import get_tool, load_category, get_import_times
+from core import profile_startup
+from core.metrics_sampler import get_sampler
+from core.utils import format_bytes, format_duration
 
 def main():
     """Main application function"""
@@ -59,7 +50,7 @@ def main():
     elif category == "javascript":
         show_javascript_demos()
     elif category == "user":
-        user.user_page()
+        get_tool("user", "user_page")()
     else:
         # Default to dashboard
         show_dashboard()
@@ -194,85 +185,136 @@ def show_dashboard():
     """, unsafe_allow_html=True)
     
     # System stats footer
-    st.markdown("""
+    latest = get_sampler().latest
+    cpu_load = f"{latest['load_avg']:.2f}" if latest['load_avg'] is not None else f"{latest['cpu_percent']:.0f}%"
+    st.markdown(f"""
     <div style="background-color: #ffffff; padding: 20px; border-radius: 10px; margin-top: 30px; box-shadow: 0 4px 24px rgba(106, 13, 173, 0.2);">
         <h4 style="color: #6a0dad; margin-bottom: 15px; text-align: center; font-weight: 600;">System Stats</h4>
         <div style="display: flex; justify-content: space-around; flex-wrap: wrap;">
             <div style="text-align: center; padding: 10px;">
                 <p style="color: #000000; font-size: 0.9rem; margin-bottom: 5px;">Server Uptime</p>
-                <p style="color: #6a0dad; font-size: 1.2rem; font-weight: bold;">5 days</p>
+                <p style="color: #6a0dad; font-size: 1.2rem; font-weight: bold;">{format_duration(latest['uptime_seconds'])}</p>
             </div>
             <div style="text-align: center; padding: 10px;">
                 <p style="color: #000000; font-size: 0.9rem; margin-bottom: 5px;">CPU Load</p>
-                <p style="color: #6a0dad; font-size: 1.2rem; font-weight: bold;">0.67</p>
+                <p style="color: #6a0dad; font-size: 1.2rem; font-weight: bold;">{cpu_load}</p>
             </div>
             <div style="text-align: center; padding: 10px;">
                 <p style="color: #000000; font-size: 0.9rem; margin-bottom: 5px;">RAM Usage</p>
-                <p style="color: #6a0dad; font-size: 1.2rem; font-weight: bold;">3.2 GB / 8 GB</p>
+                <p style="color: #6a0dad; font-size: 1.2rem; font-weight: bold;">{format_bytes(latest['memory_used'])} / {format_bytes(latest['memory_total'])}</p>
             </div>
         </div>
     </div>
     """, unsafe_allow_html=True)
 
+    show_startup_profile()
+
+def show_startup_profile():
+    """Show import cost of each tool module to catch startup regressions"""
+    with st.expander("⏱️ Startup Profile"):
+        st.write("Import time and memory cost of every tool module, and the time of the first render of "
+                 "the app, each measured in a fresh interpreter.")
+
+        if st.button("🔄 Run Profiler", key="run_startup_profile_btn"):
+            with st.spinner("Importing every module in isolation and rendering the app once..."):
+                records = profile_startup.profile_all()
+                first_render = profile_startup.profile_first_render()
+                profile_startup.write_report(records, first_render=first_render)
+
+        report = profile_startup.load_report()
+        if report:
+            st.caption(f"Last run: {report['generated_at']} (Python {report['python']})")
+            first_render = report.get("first_render")
+            if first_render and first_render["seconds"] is not None:
+                st.metric("First Render of main.py", f"{first_render['seconds']:.2f} s")
+            if first_render and first_render["error"]:
+                st.warning(f"First render failed: {first_render['error']}")
+            st.dataframe([
+                {
+                    "Module": r["module"],
+                    "Import Time (s)": round(r["seconds"], 3) if r["seconds"] is not None else None,
+                    "RSS Growth (MB)": round(r["rss_growth"] / (1024 ** 2), 1) if r["rss_growth"] is not None else None,
+                    # Without psutil only the process's peak RSS is known
+                    "Peak RSS (MB)": round(r["peak_rss"] / (1024 ** 2), 1) if r.get("peak_rss") is not None else None,
+                    "Heavy Dependencies": ", ".join(r["heavy"]),
+                    "Error": r["error"] or "",
+                }
+                for r in report["modules"]
+            ], use_container_width=True)
+        else:
+            st.info("No profile yet. Click 'Run Profiler' or run `python -m core.profile_startup`.")
+
+        # Modules imported lazily by this worker so far
+        loaded = get_import_times()
+        if loaded:
+            st.subheader("📦 Loaded in this worker")
+            st.dataframe([
+                {"Module": r["module"], "Category": r["category"], "Import Time (s)": round(r["seconds"], 3)}
+                for r in loaded
+            ], use_container_width=True)
+
 def show_linux_tools():
     """Show Linux tools section"""
     st.title("🔧 Linux Tools")
     
     # All Linux tools are now integrated into linux_commands_menu()
-    linux_commands_menu()
+    get_tool("linux", "linux_commands_menu")()
 
 def show_python_utilities():
     """Show Python utilities section"""
     st.title("🐍 Python Utilities")
     
+    tools = load_category("python")
     python_tab1, python_tab2, python_tab3, python_tab4 = st.tabs(["Communication", "File Processing", "Web Tools", "Advanced Tools"])
     
     with python_tab1:
-        communication_menu()
+        tools["communication_menu"]()
     
     with python_tab2:
-        file_tools_menu()
+        tools["file_tools_menu"]()
     
     with python_tab3:
-        web_tools_menu()
+        tools["web_tools_menu"]()
     
     with python_tab4:
-        advanced_python_tools_menu()
+        tools["advanced_python_tools_menu"]()
 
 def show_machine_learning():
     """Show Machine Learning section"""
     st.title("🤖 Machine Learning Tools")
-    machine_learning_menu()
+    get_tool("ml", "machine_learning_menu")()
 
 def show_devops_tools():
     """Show DevOps tools section"""
     st.title("🐳 DevOps Tools")
     
+    tools = load_category("devops")
     devops_tab1, devops_tab2 = st.tabs(["🐳 Docker Tools", "☁️ AWS Tools"])
     
     with devops_tab1:
-        docker_tools_menu()
+        tools["docker_tools_menu"]()
     
     with devops_tab2:
-        aws_tools_menu()
+        tools["aws_tools_menu"]()
 
 def show_projects():
     """Show Projects section"""
     st.title("🚀 Projects")
     
+    tools = load_category("projects")
     project_tab1, project_tab2 = st.tabs(["🛠️ Utility Projects", "✋ Hand Gesture Projects"])
     
     with project_tab1:
-        utility_projects_menu()
+        tools["utility_projects_menu"]()
     
     with project_tab2:
-        hand_gesture_projects_menu()
+        tools["hand_gesture_projects_menu"]()
 
 def show_javascript_demos():
     """Show JavaScript demos section"""
     st.title("🟨 JavaScript Demos")
     
-    javascript_demos_menu()
+    get_tool("javascript", "javascript_demos_menu")()
 
 if __name__ == "__main__":
     main()
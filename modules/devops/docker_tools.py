@@ -4,7 +4,17 @@ import subprocess
 import os
 import json
 import tempfile
-import paramiko
+import time
+import pandas as pd
+from core.ssh_pool import ssh_pool
+from core.streaming import stream_command
+from core.docker_stats import get_stats_monitor
+from core.docker_api import (get_docker_client, container_rows, image_rows, network_rows, volume_rows,
+                             network_inspect_rows, volume_inspect_rows)
+from core.compose_index import get_compose_index
+from core.compose_batch import ComposeBatch, DEFAULT_MAX_WORKERS, FINISHED
+from config.settings import COMPOSE_ROOTS, COMPOSE_EXCLUDE
+from core.utils import format_bytes
 
 def ssh_configuration_docker():
     """SSH Configuration for remote Docker access"""
@@ -25,11 +35,10 @@ def ssh_configuration_docker():
         if st.button("🔍 Test Connection", key="docker_test_ssh_btn"):
             if ssh_host and ssh_username and ssh_password:
                 try:
-                    ssh = paramiko.SSHClient()
-                    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                    ssh.connect(ssh_host, port=ssh_port, username=ssh_username, password=ssh_password, timeout=10)
+                    # Leaves the transport in the pool so the first command skips the handshake
+                    with ssh_pool.session(ssh_host, ssh_port, ssh_username, ssh_password):
+                        pass
                     st.success("✅ SSH connection successful!")
-                    ssh.close()
                 except Exception as e:
                     st.error(f"❌ SSH connection failed: {str(e)}")
             else:
@@ -39,7 +48,6 @@ def ssh_configuration_docker():
         st.subheader("📊 Connection Status")
         if 'docker_ssh_connection' not in st.session_state:
             st.session_state.docker_ssh_connection = None
-            st.session_state.docker_ssh_client = None
         
         if st.session_state.docker_ssh_connection:
             st.success("🟢 Connected to remote Docker server")
@@ -47,25 +55,24 @@ def ssh_configuration_docker():
             st.write(f"**User:** {st.session_state.docker_ssh_connection['username']}")
             
             if st.button("❌ Disconnect", key="docker_disconnect_ssh_btn"):
-                if st.session_state.docker_ssh_client:
-                    st.session_state.docker_ssh_client.close()
+                conn = st.session_state.docker_ssh_connection
+                # Other sessions may still be using the same transport
+                ssh_pool.close(conn['host'], conn['port'], conn['username'], only_idle=True)
                 st.session_state.docker_ssh_connection = None
-                st.session_state.docker_ssh_client = None
                 st.rerun()
         else:
             st.info("🔴 Not connected to remote Docker server")
             if st.button("🔌 Connect", key="docker_connect_ssh_btn"):
                 if ssh_host and ssh_username and ssh_password:
                     try:
-                        ssh = paramiko.SSHClient()
-                        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                        ssh.connect(ssh_host, port=ssh_port, username=ssh_username, password=ssh_password, timeout=10)
+                        with ssh_pool.session(ssh_host, ssh_port, ssh_username, ssh_password):
+                            pass
                         
-                        st.session_state.docker_ssh_client = ssh
                         st.session_state.docker_ssh_connection = {
                             'host': ssh_host,
                             'port': ssh_port,
-                            'username': ssh_username
+                            'username': ssh_username,
+                            'password': ssh_password
                         }
                         st.success("✅ Connected to remote Docker server!")
                         st.rerun()
@@ -74,18 +81,175 @@ def ssh_configuration_docker():
                 else:
                     st.warning("Please fill in all connection details")
 
-def execute_remote_docker_command(command, timeout=30):
-    """Execute Docker command on remote server via SSH"""
-    if not st.session_state.docker_ssh_client:
-        return None, "Not connected to remote server"
+def show_docker_table(rows):
+    """Render Engine API rows as a table, with sizes and timestamps made readable"""
+    if not rows:
+        st.info("Nothing to show")
+        return
+    df = pd.DataFrame(rows)
+    if "Size" in df:
+        df["Size"] = df["Size"].map(format_bytes)
+    if "Created" in df and pd.api.types.is_numeric_dtype(df["Created"]):
+        df["Created"] = pd.to_datetime(df["Created"], unit="s").dt.strftime("%Y-%m-%d %H:%M")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.caption(f"{len(rows)} rows")
+
+def show_inspect_browser(kind, items, rows, key):
+    """Searchable table of inspect results with the full document for one selection"""
+    search = st.text_input(f"🔎 Filter {kind}:", key=f"{key}_search",
+                           help="Matches any column, case-insensitive")
+    if search:
+        needle = search.lower()
+        matches = [i for i, row in enumerate(rows)
+                   if any(needle in str(value).lower() for value in row.values())]
+    else:
+        matches = list(range(len(rows)))
+    
+    if not matches:
+        st.info(f"No {kind} match '{search}'")
+        return
+    st.dataframe(pd.DataFrame([rows[i] for i in matches]), use_container_width=True, hide_index=True,
+                 height=min(400, 38 + 35 * len(matches)))
+    st.caption(f"{len(matches)} of {len(rows)} {kind}")
     
+    names = {rows[i]["Name"]: items[i] for i in matches}
+    chosen = st.selectbox("Inspect:", list(names), key=f"{key}_select")
+    if chosen:
+        st.json(names[chosen], expanded=False)
+
+COMPOSE_STATUS_ICONS = {"pending": "⏸️", "queued": "🕒", "running": "⏳", "ok": "✅", "failed": "❌",
+                        "timeout": "⏱️", "error": "⚠️", "skipped": "⏭️", "cancelled": "⏹️"}
+
+def show_compose_batch(batch, refresh_interval=0.3):
+    """Start a ComposeBatch and show per-project status and logs until it finishes
+
+    Cancel reruns the script, which interrupts this loop and stops every project.
+    """
+    st.button("⏹️ Cancel", key="compose_bulk_cancel")
+    status = st.empty()
+    table = st.empty()
+    logs = {}
+    for path, run in batch.runs.items():
+        with st.expander(f"📁 {run.project.name}"):
+            logs[path] = st.empty()
+    
+    def render():
+        table.dataframe(pd.DataFrame([{
+            "": COMPOSE_STATUS_ICONS.get(run.status, ""),
+            "Project": run.project.name,
+            "Status": run.status,
+            "Seconds": round(run.seconds, 1) if run.seconds is not None else None,
+            "Exit Code": run.returncode,
+            "Lines": run.line_count,
+            "Error": run.error,
+        } for run in batch.runs.values()]), use_container_width=True, hide_index=True)
+        for path, run in batch.runs.items():
+            if run.lines:
+                logs[path].code("\n".join(run.lines), language="bash")
+    
+    batch.start()
     try:
-        stdin, stdout, stderr = st.session_state.docker_ssh_client.exec_command(command, timeout=timeout)
-        output = stdout.read().decode('utf-8')
-        error = stderr.read().decode('utf-8')
-        return output, error
-    except Exception as e:
-        return None, str(e)
+        while not batch.done():
+            summary = batch.summary()
+            finished = sum(count for name, count in summary["counts"].items() if name in FINISHED)
+            status.info(f"⏳ {summary['counts'].get('running', 0)} running · {finished}/{len(batch.runs)} finished · "
+                        f"{summary['wall_seconds']:.1f}s")
+            render()
+            time.sleep(refresh_interval)
+    finally:
+        # Also runs when Cancel (or leaving the page) stops the script mid-run
+        if not batch.done():
+            batch.cancel()
+    render()
+    
+    summary = batch.summary()
+    counts = ", ".join(f"{count} {name}" for name, count in summary["counts"].items())
+    message = (f"{batch.command}: {counts} in {summary['wall_seconds']:.1f}s "
+               f"({summary['serial_seconds']:.1f}s of project time, {summary['speedup']:.1f}x)")
+    if summary["counts"].get("ok", 0) == len(batch.runs):
+        status.success(f"✅ {message}")
+    else:
+        status.error(f"❌ {message}")
+
+STATS_REFRESH_SECONDS = 2
+
+def show_container_stats(connection):
+    """Live stats for every running container; only this block reruns on each refresh"""
+    monitor = get_stats_monitor(connection)
+    monitor.start()
+    
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        sort_by = st.selectbox("Sort by:", ["CPU %", "Memory", "Net RX/s", "Net TX/s", "Block R/s", "Block W/s"],
+                               key="docker_stats_sort")
+    
+    def render():
+        # Viewing keeps the streams open; they close after IDLE_TIMEOUT without a viewer
+        monitor.start()
+        if monitor.error:
+            st.error(f"Error: {monitor.error}")
+            return
+        snapshot = monitor.snapshot()
+        if not snapshot:
+            st.info(f"⏳ Waiting for samples from {len(monitor.streams)} running containers...")
+            return
+        
+        rows = [{
+            "Name": name,
+            "CPU %": round(sample.cpu_percent, 1),
+            "Memory": sample.memory,
+            "Mem %": round(100 * sample.memory / sample.memory_limit, 1) if sample.memory_limit else 0.0,
+            "Net RX/s": sample.net_rx_bps,
+            "Net TX/s": sample.net_tx_bps,
+            "Block R/s": sample.block_read_bps,
+            "Block W/s": sample.block_write_bps,
+            "id": container_id,
+        } for name, container_id, sample in snapshot]
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        
+        df = pd.DataFrame(rows)
+        table = df.drop(columns=["id"])
+        for column in ["Memory", "Net RX/s", "Net TX/s", "Block R/s", "Block W/s"]:
+            table[column] = table[column].map(format_bytes)
+        st.dataframe(table, use_container_width=True, hide_index=True, height=300)
+        st.caption(f"{len(rows)} containers · refreshed every {STATS_REFRESH_SECONDS}s · "
+                   f"{time.strftime('%H:%M:%S')}")
+        if monitor.polled:
+            st.caption(f"Remote host: each container is sampled every {monitor.sample_interval():.1f}s "
+                       f"(last pass {monitor.poll_seconds:.1f}s over {monitor.poll_workers} SSH connections) "
+                       f"instead of streamed")
+        
+        # Time series for the busiest few, straight from the ring buffers
+        ids = {row["Name"]: row["id"] for row in rows}
+        # Seeded once; a changing default would reset the widget on every refresh
+        if "docker_stats_chart_select" not in st.session_state:
+            st.session_state.docker_stats_chart_select = list(ids)[:5]
+        st.session_state.docker_stats_chart_select = [n for n in st.session_state.docker_stats_chart_select if n in ids]
+        chosen = st.multiselect("Chart containers:", list(ids), key="docker_stats_chart_select")
+        if chosen:
+            cpu, memory = {}, {}
+            for name in chosen:
+                series = monitor.series(ids[name])
+                index = pd.to_datetime([s.timestamp for s in series], unit="s")
+                cpu[name] = pd.Series([s.cpu_percent for s in series], index=index)
+                memory[name] = pd.Series([s.memory / (1024 ** 2) for s in series], index=index)
+            chart1, chart2 = st.columns(2)
+            with chart1:
+                st.write("**CPU %**")
+                st.line_chart(pd.DataFrame(cpu))
+            with chart2:
+                st.write("**Memory (MB)**")
+                st.line_chart(pd.DataFrame(memory))
+    
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    with col1:
+        st.write(f"**Host:** {monitor.client.target}")
+    if fragment:
+        fragment(run_every=STATS_REFRESH_SECONDS)(render)()
+    else:
+        # Streamlit without fragments: refresh on demand
+        st.button("🔄 Refresh Stats", key="docker_stats_refresh_btn")
+        render()
 
 def docker_project():
     """Docker Project Management Tool"""
@@ -104,20 +268,8 @@ def docker_project():
     else:
         st.info("💻 Docker commands will be executed locally")
 
-    def run_cmd(cmd):
-        """Run command and return result"""
-        if use_remote:
-            output, error = execute_remote_docker_command(cmd)
-            if output is not None:
-                return output, error, 0
-            else:
-                return "", error, -1
-        else:
-            try:
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-                return result.stdout, result.stderr, result.returncode
-            except Exception as e:
-                return "", str(e), -1
+    # Engine API over the Docker socket (or dial-stdio over SSH); one request per action, no fork
+    client = get_docker_client(st.session_state.docker_ssh_connection if use_remote else None)
 
     # Main interface
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -131,27 +283,21 @@ def docker_project():
         
         with col1:
             if st.button("📋 List Images"):
-                stdout, stderr, returncode = run_cmd("docker images")
-                if returncode == 0:
-                    st.code(stdout, language="bash")
-                else:
-                    st.error(f"Error: {stderr}")
+                try:
+                    show_docker_table(image_rows(client.images()))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
             
+            prune_all = st.checkbox("Remove all unused images, not just dangling ones")
             if st.button("🧹 Prune Images"):
-                if st.checkbox("Force remove all unused images"):
-                    stdout, stderr, returncode = run_cmd("docker image prune -a -f")
-                    if returncode == 0:
-                        st.success("Images pruned successfully!")
-                        st.code(stdout, language="bash")
-                    else:
-                        st.error(f"Error: {stderr}")
-                else:
-                    stdout, stderr, returncode = run_cmd("docker image prune")
-                    if returncode == 0:
-                        st.success("Images pruned successfully!")
-                        st.code(stdout, language="bash")
-                    else:
-                        st.error(f"Error: {stderr}")
+                try:
+                    result = client.prune_images(all=prune_all)
+                    st.success(f"Images pruned successfully! Reclaimed {format_bytes(result.get('SpaceReclaimed') or 0)}")
+                    deleted = result.get('ImagesDeleted') or []
+                    if deleted:
+                        st.code("\n".join(d.get('Deleted') or d.get('Untagged', '') for d in deleted), language="bash")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
         
         with col2:
             # Build image
@@ -161,13 +307,19 @@ def docker_project():
             
             if st.button("🔨 Build"):
                 if os.path.exists(dockerfile_path):
-                    cmd = f"docker build -t {image_name} -f {dockerfile_path} ."
-                    stdout, stderr, returncode = run_cmd(cmd)
-                    if returncode == 0:
-                        st.success("Image built successfully!")
-                        st.code(stdout, language="bash")
-                    else:
-                        st.error(f"Build failed: {stderr}")
+                    # Stream the build log instead of blocking until docker exits
+                    connection = st.session_state.docker_ssh_connection if use_remote else None
+                    try:
+                        returncode, _, _ = stream_command(
+                            ['docker', 'build', '-t', image_name, '-f', dockerfile_path, '.'],
+                            connection=connection, key="docker_build_stream"
+                        )
+                        if returncode == 0:
+                            st.success("Image built successfully!")
+                        else:
+                            st.error("Build failed, see the log above")
+                    except Exception as e:
+                        st.error(f"Build failed: {str(e)}")
                 else:
                     st.error("Dockerfile not found!")
 
@@ -178,18 +330,10 @@ def docker_project():
         
         with col1:
             if st.button("📋 List Containers"):
-                stdout, stderr, returncode = run_cmd("docker ps -a")
-                if returncode == 0:
-                    st.code(stdout, language="bash")
-                else:
-                    st.error(f"Error: {stderr}")
-            
-            if st.button("📊 Container Stats"):
-                stdout, stderr, returncode = run_cmd("docker stats --no-stream")
-                if returncode == 0:
-                    st.code(stdout, language="bash")
-                else:
-                    st.error(f"Error: {stderr}")
+                try:
+                    show_docker_table(container_rows(client.containers(all=True)))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
         
         with col2:
             # Container operations
@@ -202,40 +346,41 @@ def docker_project():
             with col_op1:
                 if st.button("▶️ Start"):
                     if container_id:
-                        stdout, stderr, returncode = run_cmd(f"docker start {container_id}")
-                        if returncode == 0:
+                        try:
+                            client.container_action(container_id, "start")
                             st.success(f"Container {container_id} started!")
-                        else:
-                            st.error(f"Error: {stderr}")
+                        except Exception as e:
+                            st.error(f"Error: {str(e)}")
                 
                 if st.button("⏸️ Pause"):
                     if container_id:
-                        stdout, stderr, returncode = run_cmd(f"docker pause {container_id}")
-                        if returncode == 0:
+                        try:
+                            client.container_action(container_id, "pause")
                             st.success(f"Container {container_id} paused!")
-                        else:
-                            st.error(f"Error: {stderr}")
+                        except Exception as e:
+                            st.error(f"Error: {str(e)}")
             
             with col_op2:
                 if st.button("⏹️ Stop"):
                     if container_id:
-                        stdout, stderr, returncode = run_cmd(f"docker stop {container_id}")
-                        if returncode == 0:
+                        try:
+                            client.container_action(container_id, "stop")
                             st.success(f"Container {container_id} stopped!")
-                        else:
-                            st.error(f"Error: {stderr}")
+                        except Exception as e:
+                            st.error(f"Error: {str(e)}")
                 
+                force_container = st.checkbox("Force remove", key="docker_force_rm_container")
                 if st.button("🗑️ Remove"):
                     if container_id:
-                        if st.checkbox("Force remove"):
-                            stdout, stderr, returncode = run_cmd(f"docker rm -f {container_id}")
-                        else:
-                            stdout, stderr, returncode = run_cmd(f"docker rm {container_id}")
-                        
-                        if returncode == 0:
+                        try:
+                            client.remove_container(container_id, force=force_container)
                             st.success(f"Container {container_id} removed!")
-                        else:
-                            st.error(f"Error: {stderr}")
+                        except Exception as e:
+                            st.error(f"Error: {str(e)}")
+
+        # Full width below the columns; the table and charts need the room
+        if st.toggle("📊 Live Container Stats", key="docker_live_stats_toggle"):
+            show_container_stats(st.session_state.docker_ssh_connection if use_remote else None)
 
     with tab3:
         st.subheader("🌐 Docker Networks")
@@ -244,23 +389,13 @@ def docker_project():
         
         with col1:
             if st.button("📋 List Networks"):
-                stdout, stderr, returncode = run_cmd("docker network ls")
-                if returncode == 0:
-                    st.code(stdout, language="bash")
-                else:
-                    st.error(f"Error: {stderr}")
+                try:
+                    show_docker_table(network_rows(client.networks()))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
             
             if st.button("🔍 Inspect Networks"):
-                stdout, stderr, returncode = run_cmd("docker network ls --format '{{.Name}}' | head -5")
-                if returncode == 0:
-                    networks = stdout.strip().split('\n')
-                    for network in networks:
-                        if network:
-                            inspect_cmd = f"docker network inspect {network}"
-                            inspect_stdout, inspect_stderr, inspect_returncode = run_cmd(inspect_cmd)
-                            if inspect_returncode == 0:
-                                st.write(f"**Network: {network}**")
-                                st.code(inspect_stdout, language="json")
+                st.session_state.docker_inspect_networks = True
         
         with col2:
             # Network operations
@@ -270,21 +405,33 @@ def docker_project():
             network_driver = st.selectbox("Driver:", ["bridge", "host", "overlay", "macvlan"])
             
             if st.button("➕ Create Network"):
-                cmd = f"docker network create --driver {network_driver} {network_name}"
-                stdout, stderr, returncode = run_cmd(cmd)
-                if returncode == 0:
+                try:
+                    result = client.create_network(network_name, network_driver)
                     st.success(f"Network {network_name} created!")
-                    st.code(stdout, language="bash")
-                else:
-                    st.error(f"Error: {stderr}")
+                    st.code(result.get('Id', ''), language="bash")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
             
             if st.button("🗑️ Remove Network"):
-                cmd = f"docker network rm {network_name}"
-                stdout, stderr, returncode = run_cmd(cmd)
-                if returncode == 0:
+                try:
+                    client.remove_network(network_name)
                     st.success(f"Network {network_name} removed!")
-                else:
-                    st.error(f"Error: {stderr}")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+
+        # Stays open across reruns so filtering doesn't need another click
+        if st.session_state.get("docker_inspect_networks"):
+            col_refresh, col_close = st.columns([1, 5])
+            if col_refresh.button("🔄 Refresh", key="docker_inspect_networks_refresh"):
+                client.invalidate("networks")
+            if col_close.button("✖️ Close", key="docker_inspect_networks_close"):
+                st.session_state.docker_inspect_networks = False
+                st.rerun()
+            try:
+                networks = client.inspect_networks()
+                show_inspect_browser("networks", networks, network_inspect_rows(networks), "docker_inspect_networks")
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
 
     with tab4:
         st.subheader("💾 Docker Volumes")
@@ -293,23 +440,13 @@ def docker_project():
         
         with col1:
             if st.button("📋 List Volumes"):
-                stdout, stderr, returncode = run_cmd("docker volume ls")
-                if returncode == 0:
-                    st.code(stdout, language="bash")
-                else:
-                    st.error(f"Error: {stderr}")
+                try:
+                    show_docker_table(volume_rows(client.volumes()))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
             
             if st.button("🔍 Volume Info"):
-                stdout, stderr, returncode = run_cmd("docker volume ls --format '{{.Name}}' | head -5")
-                if returncode == 0:
-                    volumes = stdout.strip().split('\n')
-                    for volume in volumes:
-                        if volume:
-                            inspect_cmd = f"docker volume inspect {volume}"
-                            inspect_stdout, inspect_stderr, inspect_returncode = run_cmd(inspect_cmd)
-                            if inspect_returncode == 0:
-                                st.write(f"**Volume: {volume}**")
-                                st.code(inspect_stdout, language="json")
+                st.session_state.docker_inspect_volumes = True
         
         with col2:
             # Volume operations
@@ -318,25 +455,33 @@ def docker_project():
             volume_name = st.text_input("Volume Name:", value="my-volume")
             
             if st.button("➕ Create Volume"):
-                cmd = f"docker volume create {volume_name}"
-                stdout, stderr, returncode = run_cmd(cmd)
-                if returncode == 0:
+                try:
+                    result = client.create_volume(volume_name)
                     st.success(f"Volume {volume_name} created!")
-                    st.code(stdout, language="bash")
-                else:
-                    st.error(f"Error: {stderr}")
+                    st.code(result.get('Mountpoint', ''), language="bash")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
             
+            force_volume = st.checkbox("Force remove", key="docker_force_rm_volume")
             if st.button("🗑️ Remove Volume"):
-                if st.checkbox("Force remove"):
-                    cmd = f"docker volume rm -f {volume_name}"
-                else:
-                    cmd = f"docker volume rm {volume_name}"
-                
-                stdout, stderr, returncode = run_cmd(cmd)
-                if returncode == 0:
+                try:
+                    client.remove_volume(volume_name, force=force_volume)
                     st.success(f"Volume {volume_name} removed!")
-                else:
-                    st.error(f"Error: {stderr}")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+
+        if st.session_state.get("docker_inspect_volumes"):
+            col_refresh, col_close = st.columns([1, 5])
+            if col_refresh.button("🔄 Refresh", key="docker_inspect_volumes_refresh"):
+                client.invalidate("volumes")
+            if col_close.button("✖️ Close", key="docker_inspect_volumes_close"):
+                st.session_state.docker_inspect_volumes = False
+                st.rerun()
+            try:
+                volumes = client.inspect_volumes()
+                show_inspect_browser("volumes", volumes, volume_inspect_rows(volumes), "docker_inspect_volumes")
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
 
 def docker_compose_manager():
     """Docker Compose Manager"""
@@ -352,78 +497,95 @@ def docker_compose_manager():
         except Exception as e:
             return "", str(e), -1
 
-    def get_compose_projects(base_path="."):
-        """Get list of docker-compose projects"""
-        projects = []
-        for root, dirs, files in os.walk(base_path):
-            for file in files:
-                if file in ['docker-compose.yml', 'docker-compose.yaml']:
-                    projects.append(os.path.join(root, file))
-        return projects
+    # Discovery settings; the index for each roots/excludes pair is shared and cached
+    with st.expander("⚙️ Project Discovery"):
+        roots_text = st.text_input("Search roots:", value=os.pathsep.join(COMPOSE_ROOTS),
+                                   key="compose_roots", help=f"Separate multiple roots with '{os.pathsep}'")
+        exclude_text = st.text_input("Skip directories matching:", value=",".join(COMPOSE_EXCLUDE),
+                                     key="compose_exclude", help="Comma-separated globs, e.g. .git,node_modules")
+    index = get_compose_index([r.strip() for r in roots_text.split(os.pathsep) if r.strip()],
+                              [g.strip() for g in exclude_text.split(",") if g.strip()])
 
     # Main interface
-    tab1, tab2, tab3 = st.tabs([
-        "📁 Projects", "⚡ Services", "🔧 Commands"
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "📁 Projects", "⚡ Services", "🔧 Commands", "🚀 Bulk Run"
     ])
 
     with tab1:
         st.subheader("📁 Compose Projects")
         
-        # Find compose files
-        compose_files = get_compose_projects()
+        rescan = st.button("🔄 Rescan", key="compose_rescan")
+        try:
+            projects = index.projects(rescan=rescan)
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+            projects = []
+        compose_files = [project.path for project in projects]
+        st.caption(f"Scanned {index.directories_scanned} directories in {index.scan_seconds:.2f}s at "
+                   f"{time.strftime('%H:%M:%S', time.localtime(index.scanned_at))}")
         
-        if compose_files:
-            st.write(f"Found {len(compose_files)} Docker Compose projects:")
+        if projects:
+            st.write(f"Found {len(projects)} Docker Compose projects:")
+            st.dataframe(pd.DataFrame([{
+                "Project": project.name,
+                "Services": len(project.services),
+                "Service Names": ", ".join(project.services),
+                "File": project.path,
+                "Error": project.error or "",
+            } for project in projects]), use_container_width=True, hide_index=True)
             
-            for compose_file in compose_files:
-                with st.expander(f"📁 {os.path.basename(os.path.dirname(compose_file))}"):
-                    st.write(f"**File:** {compose_file}")
-                    
-                    # Show compose file content
-                    try:
-                        with open(compose_file, 'r') as f:
-                            content = f.read()
-                            st.code(content, language="yaml")
-                    except:
-                        st.error("Could not read compose file")
-                    
-                    # Project actions
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        if st.button("▶️ Up", key=f"up_{compose_file}"):
-                            stdout, stderr, returncode = run_compose_command(compose_file, "up -d")
-                            if returncode == 0:
-                                st.success("Project started!")
-                                st.code(stdout, language="bash")
-                            else:
-                                st.error(f"Error: {stderr}")
-                    
-                    with col2:
-                        if st.button("⏹️ Down", key=f"down_{compose_file}"):
-                            stdout, stderr, returncode = run_compose_command(compose_file, "down")
-                            if returncode == 0:
-                                st.success("Project stopped!")
-                                st.code(stdout, language="bash")
-                            else:
-                                st.error(f"Error: {stderr}")
-                    
-                    with col3:
-                        if st.button("🔄 Restart", key=f"restart_{compose_file}"):
-                            stdout, stderr, returncode = run_compose_command(compose_file, "restart")
-                            if returncode == 0:
-                                st.success("Project restarted!")
-                                st.code(stdout, language="bash")
-                            else:
-                                st.error(f"Error: {stderr}")
+            by_path = {project.path: project for project in projects}
+            compose_file = st.selectbox("Project:", compose_files, key="compose_project_select",
+                                        format_func=lambda path: f"{by_path[path].name} — {path}")
+            project = by_path[compose_file]
+            if project.error:
+                st.error(f"Could not parse compose file: {project.error}")
+            
+            # The file is only read for display when asked for
+            if st.toggle("📄 Show compose file", key="compose_show_file"):
+                try:
+                    with open(compose_file, 'r') as f:
+                        st.code(f.read(), language="yaml")
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+            
+            # Project actions
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                if st.button("▶️ Up", key=f"up_{compose_file}"):
+                    stdout, stderr, returncode = run_compose_command(compose_file, "up -d")
+                    if returncode == 0:
+                        st.success("Project started!")
+                        st.code(stdout, language="bash")
+                    else:
+                        st.error(f"Error: {stderr}")
+            
+            with col2:
+                if st.button("⏹️ Down", key=f"down_{compose_file}"):
+                    stdout, stderr, returncode = run_compose_command(compose_file, "down")
+                    if returncode == 0:
+                        st.success("Project stopped!")
+                        st.code(stdout, language="bash")
+                    else:
+                        st.error(f"Error: {stderr}")
+            
+            with col3:
+                if st.button("🔄 Restart", key=f"restart_{compose_file}"):
+                    stdout, stderr, returncode = run_compose_command(compose_file, "restart")
+                    if returncode == 0:
+                        st.success("Project restarted!")
+                        st.code(stdout, language="bash")
+                    else:
+                        st.error(f"Error: {stderr}")
         else:
-            st.info("No Docker Compose projects found in current directory")
+            st.info("No Docker Compose projects found under the search roots")
 
     with tab2:
         st.subheader("⚡ Service Management")
         
         # Select compose file
-        compose_file = st.selectbox("Select Compose File:", compose_files if 'compose_files' in locals() else [])
+        compose_file = st.selectbox("Select Compose File:", compose_files)
         
         if compose_file:
             # Service operations
@@ -439,8 +601,10 @@ def docker_compose_manager():
                     else:
                         st.error(f"Error: {stderr}")
                 
+                services = next((p.services for p in projects if p.path == compose_file), [])
+                service_name = st.selectbox("Service (optional):", [""] + services, key="compose_logs_service",
+                                            format_func=lambda name: name or "All services")
                 if st.button("📊 Service Logs"):
-                    service_name = st.text_input("Service Name (optional):")
                     if service_name:
                         stdout, stderr, returncode = run_compose_command(compose_file, f"logs {service_name}")
                     else:
@@ -469,7 +633,7 @@ def docker_compose_manager():
     with tab3:
         st.subheader("🔧 Custom Commands")
         
-        compose_file = st.selectbox("Select Compose File:", compose_files if 'compose_files' in locals() else [], key="custom_cmd")
+        compose_file = st.selectbox("Select Compose File:", compose_files, key="custom_cmd")
         
         if compose_file:
             st.write(f"**Compose File:** {compose_file}")
@@ -488,6 +652,33 @@ def docker_compose_manager():
                 else:
                     st.warning("Please enter a command")
 
+    with tab4:
+        st.subheader("🚀 Run Across Projects")
+        st.write("Projects run in parallel; declare ordering with a top-level `x-depends-on: [project, ...]` "
+                 "in a compose file. `down` and `stop` run in reverse order.")
+        
+        by_path = {project.path: project for project in projects}
+        selected = st.multiselect("Projects:", compose_files, key="compose_bulk_projects",
+                                  format_func=lambda path: by_path[path].name)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            bulk_command = st.selectbox("Command:", ["up -d", "down", "pull", "restart", "stop", "build"],
+                                        key="compose_bulk_command")
+        with col2:
+            workers = st.slider("Parallel projects:", 1, 32, DEFAULT_MAX_WORKERS, key="compose_bulk_workers")
+        with col3:
+            ordered = st.checkbox("Respect x-depends-on", value=True, key="compose_bulk_ordered")
+        
+        if st.button("🚀 Run", key="compose_bulk_run"):
+            if selected:
+                try:
+                    show_compose_batch(ComposeBatch([by_path[path] for path in selected], bulk_command,
+                                                    max_workers=workers, ordered=ordered))
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+            else:
+                st.warning("Please select at least one project")
+
 def docker_tools_menu():
     """Main Docker tools menu"""
     st.title("🐳 Docker Tools")
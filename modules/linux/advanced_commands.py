@@ -2,6 +2,11 @@
 import streamlit as st
 import subprocess
 import os
+import time
+from core.streaming import stream_command
+from core.duplicates import show_duplicate_finder
+from core.disk_usage import get_disk_usage_tree
+from core.utils import format_bytes
 
 def linux_advanced_format_mount():
     """Advanced disk formatting and mounting"""
@@ -71,6 +76,92 @@ def linux_advanced_format_mount():
             else:
                 st.warning("Please enter mount point")
 
+def scan_disk_usage(directory, full=False):
+    """Scan a directory tree (incrementally if cached, unless full) and open it in the report"""
+    if not os.path.isdir(directory):
+        st.error(f"Error: {directory} is not a directory")
+        return
+    tree = get_disk_usage_tree(directory)
+    status = st.empty()
+    
+    def report_progress(dirs_done, files_seen):
+        if dirs_done % 500 == 0:
+            status.info(f"⏳ Scanned {dirs_done} folders, {files_seen} files...")
+    
+    # Only folders whose mtime changed since the last scan are read again
+    try:
+        tree.scan(progress=report_progress, full=full)
+    except Exception as e:
+        status.empty()
+        st.error(f"Error analyzing directory: {str(e)}")
+        return
+    status.empty()
+    st.session_state.disk_usage_path = os.path.abspath(directory)
+
+def show_disk_usage_report():
+    """Drill-down report for the directory last scanned"""
+    import plotly.graph_objects as go
+    
+    path = st.session_state.get('disk_usage_path')
+    if not path:
+        return
+    tree = get_disk_usage_tree(path)
+    if not tree.contains(path):
+        return
+    
+    summary = tree.summary(path)
+    st.subheader(f"📁 {path}")
+    st.caption(f"Scanned {time.strftime('%H:%M:%S', time.localtime(tree.scanned_at))} in "
+               f"{tree.last_scan_seconds:.1f}s ({tree.rescanned_dirs} folder(s) read from disk)")
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Size", format_bytes(summary.total_bytes))
+    col2.metric("Files", f"{summary.file_count:,}")
+    col3.metric("Folders", f"{summary.dir_count:,}")
+    
+    # Drill-down navigation reads the cached tree, so it never touches the disk
+    children = tree.children(path)
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        child = st.selectbox("📂 Subfolder:", [c[0] for c in children],
+                             format_func=lambda p: f"{os.path.basename(p)} ({format_bytes(tree.total(p)[0])})",
+                             key="disk_usage_child_select")
+    with col2:
+        st.write("")
+        if st.button("⬇️ Open", key="disk_usage_open_btn", disabled=not children):
+            st.session_state.disk_usage_path = child
+            st.rerun()
+    with col3:
+        st.write("")
+        if st.button("⬆️ Up", key="disk_usage_up_btn", disabled=not tree.contains(os.path.dirname(path))):
+            st.session_state.disk_usage_path = os.path.dirname(path)
+            st.rerun()
+    
+    ids, labels, parents, values = tree.treemap(path)
+    fig = go.Figure(go.Treemap(ids=ids, labels=labels, parents=parents, values=values, branchvalues="total",
+                               hovertemplate="%{label}<br>%{customdata}<extra></extra>",
+                               customdata=[format_bytes(v) for v in values]))
+    fig.update_layout(margin=dict(t=10, l=10, r=10, b=10), height=450)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    tab1, tab2, tab3 = st.tabs(["📄 Largest Files", "🏷️ By Extension", "🕒 By Age"])
+    with tab1:
+        threshold = st.session_state.get('large_file_threshold_mb', 100) * 1024 * 1024
+        large = [f for f in summary.largest if f.size >= threshold]
+        if large:
+            st.dataframe([{"Size": format_bytes(f.size), "Path": f.path,
+                           "Modified": time.strftime('%Y-%m-%d', time.localtime(f.mtime))} for f in large],
+                         use_container_width=True, hide_index=True)
+        else:
+            st.info("No large files found")
+    with tab2:
+        extensions = sorted(summary.extensions.items(), key=lambda item: item[1][1], reverse=True)[:30]
+        st.dataframe([{"Extension": ext, "Files": count, "Size": format_bytes(size)}
+                      for ext, (count, size) in extensions], use_container_width=True, hide_index=True)
+    with tab3:
+        st.dataframe([{"Last Modified": label, "Files": count, "Size": format_bytes(size)}
+                      for label, count, size in summary.ages], use_container_width=True, hide_index=True)
+
 def linux_disk_usage_analyzer():
     """Advanced disk usage analysis"""
     st.subheader("📊 Disk Usage Analyzer")
@@ -94,17 +185,13 @@ def linux_disk_usage_analyzer():
         
         # Directory usage
         directory = st.text_input("Directory to analyze:", placeholder="/home")
+        full_rescan = st.checkbox("Full rescan", key="disk_usage_full_rescan",
+                                  help="Re-read every folder. Incremental scans skip folders whose entries "
+                                       "didn't change, so files that grew in place (logs, databases) keep their old size.")
         
         if st.button("📁 Analyze Directory", key="analyze_directory_btn"):
             if directory:
-                try:
-                    result = subprocess.run(['du', '-sh', directory], capture_output=True, text=True)
-                    if result.returncode == 0:
-                        st.success(f"Directory size: {result.stdout.strip()}")
-                    else:
-                        st.error(f"Error: {result.stderr}")
-                except Exception as e:
-                    st.error(f"Error analyzing directory: {str(e)}")
+                scan_disk_usage(directory, full=full_rescan)
             else:
                 st.warning("Please enter directory path")
     
@@ -112,31 +199,26 @@ def linux_disk_usage_analyzer():
         st.subheader("🧹 Cleanup Suggestions")
         
         # Find large files
+        st.number_input("Large file threshold (MB):", min_value=1, value=100, key="large_file_threshold_mb")
         if st.button("🔍 Find Large Files"):
-            try:
-                st.info("Finding files larger than 100MB...")
-                result = subprocess.run(['find', '/home', '-type', 'f', '-size', '+100M'], 
-                                     capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    files = result.stdout.strip().split('\n')
-                    if files and files[0]:
-                        st.write("Large files found:")
-                        for file in files[:10]:  # Show first 10
-                            st.write(f"• {file}")
-                        if len(files) > 10:
-                            st.info(f"... and {len(files) - 10} more files")
-                    else:
-                        st.info("No large files found")
-                else:
-                    st.error(f"Error: {result.stderr}")
-            except Exception as e:
-                st.error(f"Error finding large files: {str(e)}")
+            scan_disk_usage(directory or "/home", full=full_rescan)
         
         # Cleanup commands
         st.subheader("🧹 Cleanup Commands")
         st.code("sudo apt autoremove", language='bash')
         st.code("sudo apt autoclean", language='bash')
         st.code("journalctl --vacuum-time=7d", language='bash')
+    
+    show_disk_usage_report()
+    
+    # Duplicate files
+    st.subheader("🧬 Duplicate Files")
+    duplicate_root = st.text_input("Directory to scan for duplicates:", value=os.path.expanduser("~"),
+                                   key="duplicate_root_input")
+    if os.path.isdir(duplicate_root):
+        show_duplicate_finder(duplicate_root, key="disk_duplicates")
+    else:
+        st.warning("Please enter an existing directory")
 
 def linux_nfs_mount_tool():
     """NFS mount management tool"""
@@ -290,12 +372,9 @@ def linux_advanced_disk_info():
         # I/O statistics
         if st.button("📈 Show I/O Statistics"):
             try:
-                result = subprocess.run(['iostat', '-x', '1', '3'], 
-                                     capture_output=True, text=True)
-                if result.returncode == 0:
-                    st.code(result.stdout, language='bash')
-                else:
-                    st.warning("iostat not available")
+                stream_command(['iostat', '-x', '1', '3'], key="iostat_stream")
+            except FileNotFoundError:
+                st.warning("iostat not available")
             except Exception as e:
                 st.error(f"Error showing I/O stats: {str(e)}")
     
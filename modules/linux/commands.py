@@ -2,7 +2,12 @@
 import streamlit as st
 import subprocess
 import os
-import paramiko
+import time
+from core.ssh_pool import ssh_pool, run_remote_command
+from core.ssh_fleet import parse_inventory, run_on_hosts, summarize
+from core.streaming import stream_command
+from core.system_snapshot import collect_snapshot, to_dataframe
+from core.process_scanner import get_process_scanner
 from .advanced_commands import advanced_linux_commands_menu
 
 def ssh_configuration():
@@ -24,11 +29,10 @@ def ssh_configuration():
         if st.button("🔍 Test Connection", key="test_ssh_btn"):
             if ssh_host and ssh_username and ssh_password:
                 try:
-                    ssh = paramiko.SSHClient()
-                    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                    ssh.connect(ssh_host, port=ssh_port, username=ssh_username, password=ssh_password, timeout=10)
+                    # Leaves the transport in the pool so the first command skips the handshake
+                    with ssh_pool.session(ssh_host, ssh_port, ssh_username, ssh_password):
+                        pass
                     st.success("✅ SSH connection successful!")
-                    ssh.close()
                 except Exception as e:
                     st.error(f"❌ SSH connection failed: {str(e)}")
             else:
@@ -38,33 +42,32 @@ def ssh_configuration():
         st.subheader("📊 Connection Status")
         if 'ssh_connection' not in st.session_state:
             st.session_state.ssh_connection = None
-            st.session_state.ssh_client = None
         
         if st.session_state.ssh_connection:
             st.success("🟢 Connected to remote server")
             st.write(f"**Host:** {st.session_state.ssh_connection['host']}")
             st.write(f"**User:** {st.session_state.ssh_connection['username']}")
+            st.caption(f"♻️ {len(ssh_pool.stats())} pooled SSH connection(s) shared by this server")
             
             if st.button("❌ Disconnect", key="disconnect_ssh_btn"):
-                if st.session_state.ssh_client:
-                    st.session_state.ssh_client.close()
+                conn = st.session_state.ssh_connection
+                # Other sessions may still be using the same transport
+                ssh_pool.close(conn['host'], conn['port'], conn['username'], only_idle=True)
                 st.session_state.ssh_connection = None
-                st.session_state.ssh_client = None
                 st.rerun()
         else:
             st.info("🔴 Not connected to remote server")
             if st.button("🔌 Connect", key="connect_ssh_btn"):
                 if ssh_host and ssh_username and ssh_password:
                     try:
-                        ssh = paramiko.SSHClient()
-                        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                        ssh.connect(ssh_host, port=ssh_port, username=ssh_username, password=ssh_password, timeout=10)
+                        with ssh_pool.session(ssh_host, ssh_port, ssh_username, ssh_password):
+                            pass
                         
-                        st.session_state.ssh_client = ssh
                         st.session_state.ssh_connection = {
                             'host': ssh_host,
                             'port': ssh_port,
-                            'username': ssh_username
+                            'username': ssh_username,
+                            'password': ssh_password
                         }
                         st.success("✅ Connected to remote server!")
                         st.rerun()
@@ -74,17 +77,95 @@ def ssh_configuration():
                     st.warning("Please fill in all connection details")
 
 def execute_remote_command(command, timeout=30):
-    """Execute command on remote server via SSH"""
-    if not st.session_state.ssh_client:
-        return None, "Not connected to remote server"
+    """Execute command on remote server via SSH using the shared connection pool"""
+    return run_remote_command(st.session_state.get('ssh_connection'), command, timeout=timeout)
+
+def refresh_snapshot(sections, use_remote):
+    """Collect and parse system snapshot sections into session state"""
+    if 'linux_snapshot' not in st.session_state:
+        st.session_state.linux_snapshot = {}
     
+    connection = st.session_state.ssh_connection if use_remote else None
     try:
-        stdin, stdout, stderr = st.session_state.ssh_client.exec_command(command, timeout=timeout)
-        output = stdout.read().decode('utf-8')
-        error = stderr.read().decode('utf-8')
-        return output, error
+        with st.spinner("Collecting system information..."):
+            snapshot = collect_snapshot(connection, sections)
     except Exception as e:
-        return None, str(e)
+        st.error(f"Error collecting system information: {str(e)}")
+        return
+    
+    for section in sections:
+        if section in snapshot['errors']:
+            st.error(f"Error: {snapshot['errors'][section]}")
+        df = to_dataframe(snapshot, section)
+        # Convert byte counts once here so reruns only filter and sort
+        for column in ("rss", "total", "used", "free"):
+            if column in df.columns:
+                df[f"{column}_mb"] = (df.pop(column) / (1024 ** 2)).round(1)
+        st.session_state.linux_snapshot[section] = {
+            'df': df,
+            'source': snapshot['source'],
+            'collected_at': snapshot['collected_at'],
+        }
+
+def show_snapshot_table(section, title, sort_by, ascending=False):
+    """Render a filterable, sortable table for a snapshot section"""
+    entry = st.session_state.get('linux_snapshot', {}).get(section)
+    if not entry:
+        return
+    
+    df = entry['df']
+    st.subheader(title)
+    st.caption(f"{entry['source']} at {time.strftime('%H:%M:%S', time.localtime(entry['collected_at']))}")
+    
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        query = st.text_input("Filter:", key=f"{section}_filter_input")
+    with col2:
+        columns = list(df.columns)
+        sort_column = st.selectbox("Sort by:", columns, index=columns.index(sort_by) if sort_by in columns else 0,
+                                   key=f"{section}_sort_select")
+    with col3:
+        sort_ascending = st.checkbox("Ascending", value=ascending, key=f"{section}_sort_asc")
+    
+    view = df
+    if query:
+        mask = None
+        for column in df.select_dtypes(include=["object", "string"]).columns:
+            matches = df[column].astype(str).str.contains(query, case=False, regex=False, na=False)
+            mask = matches if mask is None else mask | matches
+        if mask is not None:
+            view = df[mask]
+    view = view.sort_values(sort_column, ascending=sort_ascending, kind="stable")
+    
+    st.dataframe(view, use_container_width=True, hide_index=True)
+    st.caption(f"Showing {len(view)} of {len(df)} rows")
+
+TOP_METRICS = {
+    "Memory (RSS)": "rss",
+    "CPU": "cpu",
+    "Disk I/O": "io",
+    "Open files": "fds",
+}
+
+def show_top_processes(by, n=15):
+    """Show the top local processes by one metric with growth since the last scan"""
+    scanner = get_process_scanner()
+    top = scanner.top(n, by=by)
+    rows = [{
+        "pid": p.pid,
+        "name": p.name,
+        "user": p.username,
+        "rss_mb": round(p.rss / (1024 ** 2), 1),
+        "rss_growth_mb": round(p.rss_delta / (1024 ** 2), 2),
+        "cpu_percent": p.cpu_percent,
+        "io_mb": round(p.io_bytes / (1024 ** 2), 1) if p.io_bytes is not None else None,
+        "open_files": p.num_fds,
+    } for p in top]
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    st.caption(f"Scanned in {scanner.last_scan_seconds * 1000:.0f} ms; "
+               "CPU and growth are measured since the previous scan")
+    for p in scanner.growing(samples=top):
+        st.warning(f"📈 {p.name} (PID {p.pid}) grew on {p.growth_streak} scans in a row")
 
 def linux_basic_commands():
     """Basic Linux commands"""
@@ -123,21 +204,7 @@ def linux_basic_commands():
         
         # Disk usage
         if st.button("💾 Disk Usage", key="disk_usage_btn"):
-            try:
-                if use_remote:
-                    output, error = execute_remote_command('df -h')
-                    if output:
-                        st.code(output, language='bash')
-                    else:
-                        st.error(f"Error: {error}")
-                else:
-                    result = subprocess.run(['df', '-h'], capture_output=True, text=True)
-                    if result.returncode == 0:
-                        st.code(result.stdout, language='bash')
-                    else:
-                        st.error(f"Error: {result.stderr}")
-            except Exception as e:
-                st.error(f"Error getting disk usage: {str(e)}")
+            refresh_snapshot(("filesystems",), use_remote)
         
         # Memory usage
         if st.button("🧠 Memory Usage", key="memory_usage_btn"):
@@ -222,6 +289,8 @@ def linux_basic_commands():
                     st.error(f"Error finding files: {str(e)}")
             else:
                 st.warning("Please enter search term")
+    
+    show_snapshot_table("filesystems", "💾 Filesystems", sort_by="percent")
 
 def linux_network_tools():
     """Linux networking tools"""
@@ -242,39 +311,11 @@ def linux_network_tools():
         
         # Network interfaces
         if st.button("🔌 Network Interfaces", key="network_interfaces_btn"):
-            try:
-                if use_remote:
-                    output, error = execute_remote_command('ip addr')
-                    if output:
-                        st.code(output, language='bash')
-                    else:
-                        st.error(f"Error: {error}")
-                else:
-                    result = subprocess.run(['ip', 'addr'], capture_output=True, text=True)
-                    if result.returncode == 0:
-                        st.code(result.stdout, language='bash')
-                    else:
-                        st.error(f"Error: {result.stderr}")
-            except Exception as e:
-                st.error(f"Error getting network interfaces: {str(e)}")
+            refresh_snapshot(("interfaces",), use_remote)
         
         # Network connections
         if st.button("🔗 Active Connections", key="active_connections_btn"):
-            try:
-                if use_remote:
-                    output, error = execute_remote_command('netstat -tuln')
-                    if output:
-                        st.code(output, language='bash')
-                    else:
-                        st.error(f"Error: {error}")
-                else:
-                    result = subprocess.run(['netstat', '-tuln'], capture_output=True, text=True)
-                    if result.returncode == 0:
-                        st.code(result.stdout, language='bash')
-                    else:
-                        st.error(f"Error: {result.stderr}")
-            except Exception as e:
-                st.error(f"Error getting connections: {str(e)}")
+            refresh_snapshot(("sockets",), use_remote)
     
     with col2:
         st.subheader("🌍 Network Testing")
@@ -285,19 +326,9 @@ def linux_network_tools():
         if st.button("🏓 Ping Host", key="ping_host_btn"):
             if host:
                 try:
-                    if use_remote:
-                        output, error = execute_remote_command(f'ping -c 4 {host}', timeout=60)
-                        if output:
-                            st.code(output, language='bash')
-                        else:
-                            st.error(f"Error: {error}")
-                    else:
-                        result = subprocess.run(['ping', '-c', '4', host], 
-                                             capture_output=True, text=True, timeout=30)
-                        if result.returncode == 0:
-                            st.code(result.stdout, language='bash')
-                        else:
-                            st.error(f"Error: {result.stderr}")
+                    connection = st.session_state.ssh_connection if use_remote else None
+                    stream_command(['ping', '-c', '4', host], connection=connection,
+                                   timeout=60 if use_remote else 30, key="ping_stream")
                 except Exception as e:
                     st.error(f"Error pinging host: {str(e)}")
             else:
@@ -307,23 +338,16 @@ def linux_network_tools():
         if st.button("🛤️ Traceroute", key="traceroute_btn"):
             if host:
                 try:
-                    if use_remote:
-                        output, error = execute_remote_command(f'traceroute {host}', timeout=90)
-                        if output:
-                            st.code(output, language='bash')
-                        else:
-                            st.error(f"Error: {error}")
-                    else:
-                        result = subprocess.run(['traceroute', host], 
-                                             capture_output=True, text=True, timeout=60)
-                        if result.returncode == 0:
-                            st.code(result.stdout, language='bash')
-                        else:
-                            st.error(f"Error: {result.stderr}")
+                    connection = st.session_state.ssh_connection if use_remote else None
+                    stream_command(['traceroute', host], connection=connection,
+                                   timeout=90 if use_remote else 60, key="traceroute_stream")
                 except Exception as e:
                     st.error(f"Error running traceroute: {str(e)}")
             else:
                 st.warning("Please enter host address")
+    
+    show_snapshot_table("interfaces", "🔌 Network Interfaces", sort_by="name", ascending=True)
+    show_snapshot_table("sockets", "🔗 Active Connections", sort_by="status", ascending=True)
 
 def linux_process_management():
     """Linux process management tools"""
@@ -344,31 +368,12 @@ def linux_process_management():
         
         # Running processes
         if st.button("🔄 Running Processes", key="running_processes_btn"):
-            try:
-                if use_remote:
-                    output, error = execute_remote_command('ps aux')
-                    if output:
-                        # Show first 20 lines to avoid overwhelming output
-                        lines = output.split('\n')[:20]
-                        st.code('\n'.join(lines), language='bash')
-                        if len(output.split('\n')) > 20:
-                            st.info(f"... and {len(output.split('\n')) - 20} more processes")
-                    else:
-                        st.error(f"Error: {error}")
-                else:
-                    result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-                    if result.returncode == 0:
-                        # Show first 20 lines to avoid overwhelming output
-                        lines = result.stdout.split('\n')[:20]
-                        st.code('\n'.join(lines), language='bash')
-                        if len(result.stdout.split('\n')) > 20:
-                            st.info(f"... and {len(result.stdout.split('\n')) - 20} more processes")
-                    else:
-                        st.error(f"Error: {result.stderr}")
-            except Exception as e:
-                st.error(f"Error getting processes: {str(e)}")
+            refresh_snapshot(("processes",), use_remote)
         
         # Top processes
+        top_by = None
+        if not use_remote:
+            top_by = st.selectbox("Rank by:", list(TOP_METRICS), key="top_processes_metric")
         if st.button("📈 Top Processes", key="top_processes_btn"):
             try:
                 if use_remote:
@@ -378,12 +383,7 @@ def linux_process_management():
                     else:
                         st.error(f"Error: {error}")
                 else:
-                    result = subprocess.run(['top', '-b', '-n', '1'], 
-                                         capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        st.code(result.stdout, language='bash')
-                    else:
-                        st.error(f"Error: {result.stderr}")
+                    show_top_processes(TOP_METRICS[top_by])
             except Exception as e:
                 st.error(f"Error getting top processes: {str(e)}")
     
@@ -428,6 +428,88 @@ def linux_process_management():
                         st.error(f"Error: {result.stderr}")
             except Exception as e:
                 st.error(f"Error getting process tree: {str(e)}")
+    
+    show_snapshot_table("processes", "🔄 Running Processes", sort_by="cpu_percent")
+
+def linux_fleet_commands():
+    """Run commands across a group of SSH hosts concurrently"""
+    st.subheader("🖧 Host Groups")
+    st.write("Run the same command on many servers at once")
+    
+    if 'fleet_groups' not in st.session_state:
+        st.session_state.fleet_groups = {}
+        st.session_state.fleet_results = []
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📋 Inventory")
+        saved_groups = list(st.session_state.fleet_groups.keys())
+        selected_group = st.selectbox("Saved group:", ["(new group)"] + saved_groups, key="fleet_group_select")
+        default_inventory = st.session_state.fleet_groups.get(selected_group, "")
+        inventory = st.text_area(
+            "Hosts (one per line: host, user@host or user@host:port):",
+            value=default_inventory, height=200,
+            placeholder="web-01\nubuntu@10.0.0.12\nadmin@db-01:2222",
+            key=f"fleet_inventory_{selected_group}"
+        )
+        group_name = st.text_input("Group name:", value="" if selected_group == "(new group)" else selected_group, key="fleet_group_name")
+        if st.button("💾 Save Group", key="fleet_save_group_btn"):
+            if group_name and inventory.strip():
+                st.session_state.fleet_groups[group_name] = inventory
+                st.success(f"✅ Saved group '{group_name}'")
+            else:
+                st.warning("Please enter a group name and at least one host")
+    
+    with col2:
+        st.subheader("🔐 Credentials & Limits")
+        default_username = st.text_input("Default username:", placeholder="ubuntu", key="fleet_username_input")
+        default_port = st.number_input("Default port:", min_value=1, max_value=65535, value=22, key="fleet_port_input")
+        password = st.text_input("Password:", type="password", key="fleet_password_input")
+        max_workers = st.slider("Parallel connections:", 1, 64, 16, key="fleet_workers_slider")
+        timeout = st.slider("Per-host timeout (s):", 5, 300, 30, key="fleet_timeout_slider")
+    
+    hosts = parse_inventory(inventory, default_username, default_port)
+    st.info(f"🖥️ {len(hosts)} host(s) in inventory")
+    
+    preset = st.selectbox("Command:", ["uptime", "df -h", "free -h", "ps aux", "uname -a", "Custom..."], key="fleet_command_select")
+    command = st.text_input("Custom command:", key="fleet_custom_command") if preset == "Custom..." else preset
+    
+    if st.button("🚀 Run on All Hosts", key="fleet_run_btn"):
+        if not hosts:
+            st.warning("Please add at least one host")
+        elif not command:
+            st.warning("Please enter a command")
+        else:
+            results = []
+            progress = st.progress(0)
+            table = st.empty()
+            for result in run_on_hosts(hosts, command, password, max_workers=max_workers, timeout=timeout):
+                results.append(result)
+                progress.progress(len(results) / len(hosts))
+                table.dataframe([
+                    {
+                        "Host": f"{r['username']}@{r['host']}:{r['port']}",
+                        "Status": r['status'],
+                        "Exit Code": r['exit_code'],
+                        "Latency (ms)": r['latency_ms'],
+                        "First Line": (r['output'] or r['error']).strip().split('\n')[0][:120],
+                    }
+                    for r in results
+                ], use_container_width=True)
+            st.session_state.fleet_results = results
+            summary = summarize(results)
+            st.success(f"✅ {summary['ok']} ok, ❌ {summary['failed']} failed, ⏱️ {summary['timeout']} timed out, ⚠️ {summary['error']} errors")
+    
+    # Full output of the last run, per host
+    if st.session_state.fleet_results:
+        labels = [f"{r['username']}@{r['host']}:{r['port']}" for r in st.session_state.fleet_results]
+        selected = st.selectbox("Show output for:", labels, key="fleet_output_select")
+        result = st.session_state.fleet_results[labels.index(selected)]
+        if result['output']:
+            st.code(result['output'], language='bash')
+        if result['error']:
+            st.error(result['error'])
 
 def linux_commands_menu():
     """Main Linux commands menu"""
@@ -438,8 +520,8 @@ def linux_commands_menu():
     
     st.markdown("---")
     
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "Basic Commands", "Network Tools", "Process Management", "Advanced Commands"
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        "Basic Commands", "Network Tools", "Process Management", "Host Groups", "Advanced Commands"
     ])
     
     with tab1:
@@ -452,4 +534,7 @@ def linux_commands_menu():
         linux_process_management()
     
     with tab4:
+        linux_fleet_commands()
+    
+    with tab5:
         advanced_linux_commands_menu()
@@ -2,10 +2,9 @@
 import streamlit as st
 import os
 import shutil
-import zipfile
+import re
 import cv2
 import numpy as np
-from PIL import Image
 import requests
 import datetime
 import math
@@ -17,6 +16,14 @@ import time
 from streamlit_webrtc import webrtc_streamer, VideoTransformerBase
 import mediapipe as mp
 import pandas as pd
+from core.dir_index import get_directory_index
+from core.content_index import get_content_index
+from core.duplicates import show_duplicate_finder
+from core.archive import ArchiveJob, zip_folder, extract_zip
+from core.file_viewer import get_line_index
+from core.image_ops import PREVIEW_MAX_SIDE, load_upload
+from core.transfers import create_upload, offer_download, save_upload
+from core.utils import format_bytes
 
 def project_all_in_one_tool():
     """All-in-One Utility Tool with full original functionality"""
@@ -142,17 +149,19 @@ def project_all_in_one_tool():
         st.info("🖼️ Image to Sketch Converter")
         uploaded_file = st.file_uploader("Upload an image", type=["jpg", "png", "jpeg"], key="sketch_image_uploader")
         if uploaded_file is not None:
-            image = Image.open(uploaded_file)
+            # Decoded once and sketched at preview size; reruns from other widgets hit the cache
+            pipeline, _ = load_upload(uploaded_file)
+            sketch = pipeline.sketch(21)
             col1, col2 = st.columns(2)
             with col1:
-                st.image(image, caption="Original Image", use_container_width=True)
+                st.image(pipeline.render(PREVIEW_MAX_SIDE), caption="Original Image", use_container_width=True)
             with col2:
-                img_array = np.array(image.convert("RGB"))
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-                inv = 255 - gray
-                blur = cv2.GaussianBlur(inv, (21, 21), 0)
-                sketch = cv2.divide(gray, 255 - blur, scale=256)
-                st.image(sketch, caption="Pencil Sketch", use_container_width=True)
+                st.image(sketch.render(PREVIEW_MAX_SIDE), caption="Pencil Sketch", use_container_width=True)
+                if st.button("🖼️ Prepare Full-Resolution Sketch", key="sketch_full_btn"):
+                    st.session_state.sketch_ready = sketch.digest
+                if st.session_state.get("sketch_ready") == sketch.digest:
+                    st.download_button("📥 Download Sketch", data=sketch.encode("PNG"), file_name="sketch.png",
+                                       mime="image/png", key="sketch_download_btn")
 
     # --- Sidebar for this specific tool ---
     with st.sidebar:
@@ -489,6 +498,112 @@ def project_roast_ya_toast():
         for msg in reversed(st.session_state.message_history):
             st.write(msg)
 
+LISTING_SORTS = {"Name": "path", "Size": "size", "Modified": "mtime"}
+LISTING_PAGE_SIZES = [50, 100, 250, 500]
+CONTENT_SEARCH_LIMIT = 500
+VIEWER_PAGE_SIZES = [100, 250, 500, 1000]
+
+def show_entry_page(entries, key):
+    """Render one page of directory entries; only that page is sent to the browser"""
+    if not entries:
+        st.write("No matching files or folders")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page:", LISTING_PAGE_SIZES, key=f"{key}_page_size_select")
+    pages = (len(entries) + page_size - 1) // page_size
+    # A narrower filter can leave the remembered page past the end
+    if st.session_state.get(f"{key}_page_input", 1) > pages:
+        st.session_state[f"{key}_page_input"] = 1
+    with col2:
+        page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, value=1, key=f"{key}_page_input")
+    
+    start = (page - 1) * page_size
+    rows = [{
+        "Path": f"{e.path}/" if e.is_dir else e.path,
+        "Type": "📂 Folder" if e.is_dir else "📄 File",
+        "Size": "" if e.is_dir else format_bytes(e.size),
+        "Modified": datetime.datetime.fromtimestamp(e.mtime).strftime("%Y-%m-%d %H:%M"),
+    } for e in entries[start:start + page_size]]
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    st.caption(f"Showing {start + 1}-{start + len(rows)} of {len(entries)}")
+
+def show_file_viewer(path, key):
+    """Show one page of a text file; only the lines on that page are read"""
+    try:
+        view = get_line_index(path)
+    except OSError as e:
+        st.error(f"❌ Could not open file: {e}")
+        return
+    if view.is_binary:
+        st.warning("⚠️ This looks like a binary file; use Download File instead")
+        return
+    total = view.line_count
+    st.caption(f"{format_bytes(view.size)}, {total:,} lines, {view.encoding} encoding")
+    if not total:
+        st.info("The file is empty")
+        return
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        mode = st.radio("View:", ["Page", "Go to line", "Tail"], horizontal=True, key=f"{key}_mode_radio")
+    with col2:
+        page_size = st.selectbox("Lines per page:", VIEWER_PAGE_SIZES, key=f"{key}_page_size_select")
+    pages = (total + page_size - 1) // page_size
+    
+    with col3:
+        if mode == "Page":
+            # A shorter file can leave the remembered page past the end
+            if st.session_state.get(f"{key}_page_input", 1) > pages:
+                st.session_state[f"{key}_page_input"] = 1
+            page = st.number_input(f"Page (of {pages:,}):", min_value=1, max_value=pages, value=1,
+                                   key=f"{key}_page_input")
+            start = (page - 1) * page_size
+        elif mode == "Go to line":
+            if st.session_state.get(f"{key}_line_input", 1) > total:
+                st.session_state[f"{key}_line_input"] = total
+            line = st.number_input("Line:", min_value=1, max_value=total, value=1, key=f"{key}_line_input")
+            start = line - 1
+        else:
+            st.button("🔄 Refresh", key=f"{key}_tail_refresh_btn")
+            start = max(0, total - page_size)
+    
+    lines = view.lines(start, page_size)
+    width = len(str(start + len(lines)))
+    st.code("\n".join(f"{start + i + 1:>{width}}  {text}" for i, text in enumerate(lines)), language=None)
+    st.caption(f"Lines {start + 1:,}-{start + len(lines):,} of {total:,}")
+
+def show_archive_job(index):
+    """Poll the running zip/unzip job and show its progress until it finishes"""
+    archive = st.session_state.get('file_manager_archive')
+    if not archive:
+        return
+    job = archive['job']
+    if not job.finished and st.button("⏹️ Cancel", key="archive_cancel_btn"):
+        job.cancel()
+    
+    status = st.empty()
+    progress_bar = st.progress(min(job.fraction, 1.0))
+    while not job.finished:
+        status.info(f"⏳ {job.description}: {job.done_files}/{job.total_files} files, "
+                    f"{format_bytes(job.done_bytes)} of {format_bytes(job.total_bytes)}  {job.current}")
+        progress_bar.progress(min(job.fraction, 1.0))
+        time.sleep(0.25)
+    progress_bar.progress(1.0)
+    
+    if not archive.get('indexed'):
+        index.invalidate(archive['touched'])
+        archive['indexed'] = True
+    elapsed = job.finished_at - job.started_at
+    if job.error:
+        status.error(f"❌ {job.description} failed: {job.error}")
+    else:
+        status.success(f"✅ {job.description} finished: {job.done_files} files, "
+                       f"{format_bytes(job.done_bytes)} in {elapsed:.1f}s")
+        if archive['output'] and os.path.exists(archive['output']):
+            offer_download(archive['output'], label="📥 Download Zip", key="archive_download_btn")
+
 def advanced_file_manager():
     """Advanced File Manager with full original functionality"""
     st.title("📁 Full File Management System")
@@ -521,56 +636,47 @@ def advanced_file_manager():
         "📤 Upload File", "📥 Download File",
         "✏ Rename File", "📋 Copy File", "📦 Move File", "❌ Delete File", "🔁 Replace File",
         "📂 Create Folder", "✏ Rename Folder", "🗑 Delete Folder", "📦 Move Folder",
-        "🔍 Search Files", "🔽 Zip Folder", "📂 Unzip File"
+        "🔍 Search Files", "🧬 Find Duplicates", "🔽 Zip Folder", "📂 Unzip File"
     ])
     
     # Base directory
     base_dir = st.text_input("📂 Enter Base Directory:", value=os.getcwd())
     
-    # Helper functions
-    def list_all_files(base_dir):
-        files = []
-        for root, dirs, filenames in os.walk(base_dir):
-            for filename in filenames:
-                rel_path = os.path.relpath(os.path.join(root, filename), base_dir)
-                files.append(rel_path)
-        return files
-
-    def list_all_folders(base_dir):
-        folders = []
-        for root, dirs, filenames in os.walk(base_dir):
-            for dirname in dirs:
-                rel_path = os.path.relpath(os.path.join(root, dirname), base_dir)
-                folders.append(rel_path)
-        return folders
-    
     # ========== FILE & FOLDER OPERATIONS ========== #
     if os.path.isdir(base_dir):
-        files = list_all_files(base_dir)
-        folders = list_all_folders(base_dir)
+        # Cached across reruns; only directories whose mtime changed are rescanned
+        index = get_directory_index(base_dir)
+        files = index.files()
+        folders = index.folders()
         
         with st.container():
             st.subheader(f"🔧 Operation: {operation}")
             
             if operation == "📄 List Files/Folders":
                 st.info(f"📁 Found {len(files)} files and {len(folders)} folders")
+                if st.button("🔄 Rescan", key="file_manager_rescan_btn"):
+                    # Full rescan also picks up files edited outside the app
+                    index.invalidate()
+                    index.refresh(force=True)
+                    files = index.files()
+                    folders = index.folders()
+                st.caption(f"Index refreshed in {index.last_refresh_seconds * 1000:.0f} ms "
+                           f"({index.rescanned_dirs} folder(s) rescanned)")
                 
-                col1, col2 = st.columns(2)
+                col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
                 with col1:
-                    st.subheader("📂 Folders")
-                    if folders:
-                        for folder in folders:
-                            st.markdown(f"- {folder}/")
-                    else:
-                        st.write("No folders found")
-                
+                    prefix = st.text_input("🔎 Path starts with:", key="file_list_prefix_input")
                 with col2:
-                    st.subheader("📄 Files")
-                    if files:
-                        for file in files:
-                            st.markdown(f"- {file}")
-                    else:
-                        st.write("No files found")
+                    kind = st.selectbox("Show:", ["All", "Files", "Folders"], key="file_list_kind_select")
+                with col3:
+                    sort_label = st.selectbox("Sort by:", list(LISTING_SORTS), key="file_list_sort_select")
+                with col4:
+                    descending = st.checkbox("Descending", key="file_list_desc_checkbox")
+                
+                entries = index.entries(prefix, LISTING_SORTS[sort_label], descending)
+                if kind != "All":
+                    entries = [e for e in entries if e.is_dir == (kind == "Folders")]
+                show_entry_page(entries, "file_list")
             
             elif operation == "📝 Create File":
                 name = st.text_input("🆕 File Name (with extension)")
@@ -579,15 +685,13 @@ def advanced_file_manager():
                     path = os.path.join(base_dir, name)
                     with open(path, 'w') as f:
                         f.write(content)
+                    index.invalidate(os.path.dirname(name))
                     st.success(f"✅ File '{name}' created!")
             
             elif operation == "📖 Read File":
                 if files:
                     file = st.selectbox("📄 Select File", files)
-                    if st.button("Read"):
-                        with open(os.path.join(base_dir, file), 'r', encoding='utf-8') as f:
-                            st.subheader(f"📄 Content of {file}")
-                            st.code(f.read())
+                    show_file_viewer(os.path.join(base_dir, file), "file_viewer")
                 else:
                     st.warning("No files available to read")
             
@@ -598,6 +702,7 @@ def advanced_file_manager():
                     if st.button("Write"):
                         with open(os.path.join(base_dir, file), 'w') as f:
                             f.write(content)
+                        index.invalidate(os.path.dirname(file))
                         st.success(f"✅ Content written to '{file}'!")
                 else:
                     st.warning("No files available to write")
@@ -609,23 +714,69 @@ def advanced_file_manager():
                     if st.button("Append"):
                         with open(os.path.join(base_dir, src), 'r') as s, open(os.path.join(base_dir, tgt), 'a') as t:
                             t.write("\n" + s.read())
+                        index.invalidate(os.path.dirname(tgt))
                         st.success(f"✅ Appended '{src}' to '{tgt}'!")
                 else:
                     st.warning("Need at least 2 files for this operation")
             
             elif operation == "📤 Upload File":
                 upload = st.file_uploader("Upload a File")
+                expected = st.text_input("🔐 Expected SHA-256 (optional)", key="file_manager_upload_sha")
                 if upload:
-                    path = os.path.join(base_dir, upload.name)
-                    with open(path, 'wb') as f:
-                        f.write(upload.read())
-                    st.success(f"✅ Uploaded '{upload.name}' to {base_dir}")
+                    saved = st.session_state.get("file_manager_saved_upload")
+                    # Reruns keep the same upload; only copy it to disk once
+                    if not saved or saved[0] != (upload.file_id, expected):
+                        try:
+                            digest = save_upload(upload, os.path.join(base_dir, upload.name), expected or None)
+                            st.session_state.file_manager_saved_upload = ((upload.file_id, expected), digest)
+                            index.invalidate("")
+                            st.success(f"✅ Uploaded '{upload.name}' to {base_dir}")
+                        except (OSError, ValueError) as e:
+                            st.error(f"❌ Upload failed: {e}")
+                    saved = st.session_state.get("file_manager_saved_upload")
+                    if saved and saved[0][0] == upload.file_id:
+                        st.caption(f"SHA-256: `{saved[1]}`")
+                
+                with st.expander("📦 Large or resumable upload"):
+                    st.caption("For multi-GB files: the upload link streams straight to disk and can be "
+                               "resumed after an interruption")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        dest_name = st.text_input("Save as (path under base directory):", key="resumable_upload_name")
+                    with col2:
+                        dest_sha = st.text_input("Expected SHA-256 (optional):", key="resumable_upload_sha")
+                    if st.button("🔗 Create Upload Link", key="resumable_upload_btn"):
+                        if not dest_name:
+                            st.warning("Enter a file name")
+                        else:
+                            try:
+                                url, target = create_upload(os.path.join(base_dir, dest_name), dest_sha or None)
+                                st.session_state.file_manager_upload_link = (url, target, dest_name)
+                            except OSError as e:
+                                st.error(f"❌ Could not start the upload server: {e}")
+                    
+                    link = st.session_state.get("file_manager_upload_link")
+                    if link:
+                        url, target, dest_name = link
+                        file_arg = os.path.basename(dest_name)
+                        st.code(f"curl -T '{file_arg}' '{url}'", language="bash")
+                        offset = target.offset
+                        if target.completed:
+                            index.invalidate(os.path.dirname(dest_name))
+                            st.success(f"✅ Received {format_bytes(offset)}; SHA-256 `{target.sha256}`")
+                        elif target.error:
+                            st.error(f"❌ {target.error}")
+                        else:
+                            st.info(f"⏳ {format_bytes(offset)} received so far")
+                            if offset:
+                                st.caption("To resume after an interruption, send the rest from that offset:")
+                                st.code(f"curl -C {offset} -T '{file_arg}' '{url}'", language="bash")
+                        st.button("🔄 Refresh Status", key="resumable_upload_refresh_btn")
             
             elif operation == "📥 Download File":
                 if files:
                     file = st.selectbox("📄 Select File", files)
-                    with open(os.path.join(base_dir, file), 'rb') as f:
-                        st.download_button("📥 Download", data=f, file_name=file)
+                    offer_download(os.path.join(base_dir, file), key="file_manager_download_btn")
                 else:
                     st.warning("No files available to download")
             
@@ -635,6 +786,7 @@ def advanced_file_manager():
                     new = st.text_input("🆕 New File Name")
                     if st.button("Rename"):
                         os.rename(os.path.join(base_dir, file), os.path.join(base_dir, new))
+                        index.invalidate(os.path.dirname(file))
                         st.success(f"✅ Renamed '{file}' to '{new}'!")
                 else:
                     st.warning("No files available to rename")
@@ -655,6 +807,7 @@ def advanced_file_manager():
                     dest = st.text_input("📍 Destination Directory")
                     if st.button("Move"):
                         shutil.move(os.path.join(base_dir, file), os.path.join(dest, os.path.basename(file)))
+                        index.invalidate(os.path.dirname(file))
                         st.success(f"✅ Moved '{file}' to '{dest}'!")
                 else:
                     st.warning("No files available to move")
@@ -664,6 +817,7 @@ def advanced_file_manager():
                     file = st.selectbox("🗑 File to Delete", files)
                     if st.button("Delete"):
                         os.remove(os.path.join(base_dir, file))
+                        index.invalidate(os.path.dirname(file))
                         st.success(f"✅ Deleted '{file}'!")
                 else:
                     st.warning("No files available to delete")
@@ -674,6 +828,7 @@ def advanced_file_manager():
                     tgt = st.selectbox("📥 Target File", files)
                     if st.button("Replace"):
                         shutil.copyfile(os.path.join(base_dir, src), os.path.join(base_dir, tgt))
+                        index.invalidate(os.path.dirname(tgt))
                         st.success(f"✅ Replaced '{tgt}' with '{src}'!")
                 else:
                     st.warning("Need at least 2 files for this operation")
@@ -682,6 +837,7 @@ def advanced_file_manager():
                 folder = st.text_input("📁 Folder Name (Nested allowed)")
                 if st.button("Create Folder"):
                     os.makedirs(os.path.join(base_dir, folder), exist_ok=True)
+                    index.invalidate(os.path.dirname(folder))
                     st.success(f"✅ Folder '{folder}' created!")
             
             elif operation == "✏ Rename Folder":
@@ -690,6 +846,7 @@ def advanced_file_manager():
                     new = st.text_input("🆕 New Folder Name")
                     if st.button("Rename"):
                         os.rename(os.path.join(base_dir, folder), os.path.join(base_dir, new))
+                        index.invalidate(os.path.dirname(folder))
                         st.success(f"✅ Folder renamed to '{new}'!")
                 else:
                     st.warning("No folders available to rename")
@@ -701,6 +858,7 @@ def advanced_file_manager():
                     confirm = st.checkbox(f"⚠ Confirm deletion of '{folder}' and all its contents")
                     if confirm and st.button("Delete Folder"):
                         shutil.rmtree(full_path)
+                        index.invalidate(os.path.dirname(folder))
                         st.success(f"✅ Folder '{folder}' deleted!")
                 else:
                     st.warning("No folders available to delete")
@@ -711,25 +869,90 @@ def advanced_file_manager():
                     dest = st.text_input("📍 Destination Directory")
                     if st.button("Move"):
                         shutil.move(os.path.join(base_dir, folder), os.path.join(dest, os.path.basename(folder)))
+                        index.invalidate(os.path.dirname(folder))
                         st.success(f"✅ Moved '{folder}' to '{dest}'!")
                 else:
                     st.warning("No folders available to move")
             
             elif operation == "🔍 Search Files":
-                query = st.text_input("🔎 Search Query")
-                if query:
-                    results = [f for f in files if query.lower() in f.lower()]
-                    st.subheader(f"🔍 Found {len(results)} matching files")
-                    for file in results:
-                        st.markdown(f"- {file}")
+                search_mode = st.radio("Search in:", ["📄 File names", "📚 File contents (indexed)"],
+                                       horizontal=True, key="file_search_mode_radio")
+                if search_mode == "📄 File names":
+                    query = st.text_input("🔎 Search Query")
+                    if query:
+                        query = query.lower()
+                        results = [e for e in index.entries() if not e.is_dir and query in e.path.lower()]
+                        st.subheader(f"🔍 Found {len(results)} matching files")
+                        show_entry_page(results, "file_search")
+                else:
+                    content_index = get_content_index(base_dir)
+                    stats = content_index.stats()
+                    if stats['updated_at']:
+                        updated = datetime.datetime.fromtimestamp(stats['updated_at']).strftime("%Y-%m-%d %H:%M")
+                        st.caption(f"🗂️ {stats['indexed']} of {stats['files']} files indexed, last updated {updated}")
+                    else:
+                        st.info("Build the index once to search file contents; later updates only re-read changed files")
+                    
+                    col1, col2 = st.columns([1, 2])
+                    with col1:
+                        max_mb = st.number_input("Skip files larger than (MB):", min_value=1, max_value=100,
+                                                 value=content_index.max_file_bytes // (1024 * 1024), key="content_index_max_mb")
+                    with col2:
+                        st.write("")
+                        if st.button("🔄 Build / Update Index", key="content_index_btn"):
+                            content_index.max_file_bytes = max_mb * 1024 * 1024
+                            progress_bar = st.progress(0.0)
+                            # Stat every file, so files edited in place are re-read too
+                            index.invalidate()
+                            index.refresh(force=True)
+                            result = content_index.update(
+                                index.entries(),
+                                progress=lambda done, total: progress_bar.progress(done / total if total else 1.0))
+                            st.success(f"✅ Indexed {result['indexed']} changed files in {result['seconds']:.1f}s "
+                                       f"({result['unchanged']} unchanged, {result['skipped']} binary or too large, "
+                                       f"{result['removed']} removed)")
+                    
+                    col1, col2, col3 = st.columns([3, 1, 1])
+                    with col1:
+                        query = st.text_input("🔎 Search Query", key="content_search_input")
+                    with col2:
+                        match_type = st.selectbox("Match:", ["Substring", "Glob", "Regex"], key="content_search_match")
+                    with col3:
+                        scope = st.selectbox("Scope:", ["Contents", "Names"], key="content_search_scope")
+                    
+                    if query:
+                        try:
+                            started = time.perf_counter()
+                            results = content_index.search(query, match_type.lower(), scope.lower(), limit=CONTENT_SEARCH_LIMIT)
+                            elapsed_ms = (time.perf_counter() - started) * 1000
+                            st.subheader(f"🔍 Found {len(results)} matching files in {elapsed_ms:.0f} ms")
+                            if len(results) == CONTENT_SEARCH_LIMIT:
+                                st.caption(f"Showing the first {CONTENT_SEARCH_LIMIT} matches; refine the query to narrow them down")
+                            if results:
+                                st.dataframe(pd.DataFrame(results, columns=["Path", "Line", "Match"]),
+                                             use_container_width=True, hide_index=True)
+                        except re.error as e:
+                            st.error(f"❌ Invalid regular expression: {e}")
+            
+            elif operation == "🧬 Find Duplicates":
+                # Reuse the cached listing instead of walking the tree again
+                show_duplicate_finder(base_dir, files=((os.path.join(base_dir, e.path), e.size)
+                                                       for e in index.entries() if not e.is_dir),
+                                      key="file_manager_duplicates")
             
             elif operation == "🔽 Zip Folder":
                 if folders:
                     folder = st.selectbox("📁 Folder to Zip", folders)
                     zip_name = st.text_input("📦 Output Zip File Name", value=f"{folder}.zip")
                     if st.button("Create Zip"):
-                        shutil.make_archive(os.path.join(base_dir, zip_name.replace(".zip", "")), 'zip', os.path.join(base_dir, folder))
-                        st.success(f"✅ Folder '{folder}' zipped as '{zip_name}'!")
+                        zip_path = os.path.join(base_dir, zip_name.replace(".zip", "") + ".zip")
+                        # Runs on a background thread; the page only polls its progress
+                        st.session_state.file_manager_archive = {
+                            'job': ArchiveJob(f"Zipping '{folder}'").start(zip_folder, os.path.join(base_dir, folder), zip_path),
+                            'touched': os.path.dirname(zip_name),
+                            'output': zip_path,
+                        }
+                    show_archive_job(index)
                 else:
                     st.warning("No folders available to zip")
             
@@ -739,9 +962,13 @@ def advanced_file_manager():
                     zip_file = st.selectbox("📦 Zip File", zip_files)
                     extract_path = st.text_input("📂 Extract To", value=os.path.join(base_dir, "extracted"))
                     if st.button("Unzip"):
-                        with zipfile.ZipFile(os.path.join(base_dir, zip_file), 'r') as zip_ref:
-                            zip_ref.extractall(os.path.join(base_dir, extract_path))
-                        st.success(f"✅ Unzipped '{zip_file}' to '{extract_path}'!")
+                        st.session_state.file_manager_archive = {
+                            'job': ArchiveJob(f"Unzipping '{zip_file}'").start(
+                                extract_zip, os.path.join(base_dir, zip_file), os.path.join(base_dir, extract_path)),
+                            'touched': os.path.relpath(os.path.join(base_dir, extract_path), base_dir),
+                            'output': None,
+                        }
+                    show_archive_job(index)
                 else:
                     st.warning("No zip files available to unzip")
     else:
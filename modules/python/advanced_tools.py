@@ -22,10 +22,15 @@ import time
 import pandas as pd
 import psutil
 from datetime import datetime
-import csv
 import tempfile
 import matplotlib.pyplot as plt
 from instagrapi import Client
+from core.ram_log import get_ram_sampler
+from core.process_scanner import get_process_scanner, LEAK_STREAK
+from core.image_ops import PREVIEW_MAX_SIDE, load_upload
+from core.image_batch import DEFAULT_WORKERS, OUTPUT_FORMATS, RESAMPLING_FILTERS, resize_to_zip
+from core.transfers import offer_download, scratch_path, spooled_paths
+from core.utils import format_bytes
 
 def python_face_swap():
     """Face swap application"""
@@ -145,52 +150,58 @@ def python_digital_image():
     uploaded_image = st.file_uploader("Upload an image", type=['jpg', 'jpeg', 'png'], key="digital_image_upload")
     
     if uploaded_image:
-        image = Image.open(uploaded_image)
+        # Decoded once per upload; edits below reuse cached intermediate results
+        try:
+            pipeline, info = load_upload(uploaded_image)
+        except Exception as e:
+            st.error(f"Error opening image: {str(e)}")
+            return
+        width, height = info['size']
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📸 Original Image")
-            st.image(image, caption="Original Image", use_column_width=True)
+            st.image(pipeline.render(PREVIEW_MAX_SIDE), caption="Original Image", use_column_width=True)
             
             # Image information
-            st.write(f"**Size:** {image.size[0]} x {image.size[1]} pixels")
-            st.write(f"**Mode:** {image.mode}")
-            st.write(f"**Format:** {image.format}")
+            st.write(f"**Size:** {width} x {height} pixels")
+            st.write(f"**Mode:** {info['mode']}")
+            st.write(f"**Format:** {info['format']}")
         
         with col2:
             st.subheader("🔧 Image Operations")
             
             # Resize
-            new_width = st.number_input("New width:", min_value=100, max_value=2000, value=image.size[0])
-            new_height = st.number_input("New height:", min_value=100, max_value=2000, value=image.size[1])
-            
-            if st.button("📏 Resize Image", key="resize_img_btn"):
-                if uploaded_image is not None:
-                    try:
-                        resized_image = image.resize((new_width, new_height))
-                        st.image(resized_image, caption="Resized Image", use_column_width=True)
-                    except Exception as e:
-                        st.error(f"Error resizing image: {str(e)}")
+            do_resize = st.checkbox("📏 Resize", key="digital_image_resize_check")
+            new_width = st.number_input("New width:", min_value=100, max_value=max(2000, width), value=width)
+            new_height = st.number_input("New height:", min_value=100, max_value=max(2000, height), value=height)
             
             # Rotate
-            rotation_angle = st.slider("Rotation angle:", -180, 180, 0)
-            if st.button("🔄 Rotate Image", key="rotate_img_btn"):
-                if uploaded_image is not None:
-                    try:
-                        rotated_image = image.rotate(rotation_angle)
-                        st.image(rotated_image, caption="Rotated Image", use_column_width=True)
-                    except Exception as e:
-                        st.error(f"Error rotating image: {str(e)}")
+            rotation_angle = st.slider("🔄 Rotation angle:", -180, 180, 0)
             
             # Convert to grayscale
-            if st.button("⚫ Convert to Grayscale", key="grayscale_btn"):
-                if uploaded_image is not None:
-                    try:
-                        gray_image = image.convert('L')
-                        st.image(gray_image, caption="Grayscale Image", use_column_width=True)
-                    except Exception as e:
-                        st.error(f"Error converting to grayscale: {str(e)}")
+            grayscale = st.checkbox("⚫ Convert to Grayscale", key="digital_image_gray_check")
+        
+        if do_resize:
+            pipeline = pipeline.resize(new_width, new_height)
+        pipeline = pipeline.rotate(rotation_angle)
+        if grayscale:
+            pipeline = pipeline.grayscale()
+        
+        if pipeline.steps:
+            try:
+                st.subheader("✨ Result")
+                st.image(pipeline.render(PREVIEW_MAX_SIDE), caption="Preview", use_column_width=True)
+                # The full-resolution image is only computed when asked for
+                if st.button("🖼️ Prepare Full-Resolution Download", key="digital_image_full_btn"):
+                    st.session_state.digital_image_ready = pipeline.steps
+                if st.session_state.get("digital_image_ready") == pipeline.steps:
+                    st.download_button("📥 Download PNG", data=pipeline.encode("PNG"),
+                                       file_name="processed_image.png", mime="image/png",
+                                       key="digital_image_download_btn")
+            except Exception as e:
+                st.error(f"Error processing image: {str(e)}")
 
 def batch_image_resize():
     """Batch image resizing tool"""
@@ -207,64 +218,55 @@ def batch_image_resize():
         with col1:
             target_width = st.number_input("Target width:", min_value=100, max_value=2000, value=800)
             target_height = st.number_input("Target height:", min_value=100, max_value=2000, value=600)
-            maintain_aspect = st.checkbox("Maintain aspect ratio", value=True)
+            maintain_aspect = st.checkbox("Maintain aspect ratio (fit inside, never enlarge)", value=True)
         
         with col2:
             quality = st.slider("JPEG quality:", 1, 100, 85)
-            output_format = st.selectbox("Output format:", ["JPEG", "PNG"])
+            output_format = st.selectbox("Output format:", list(OUTPUT_FORMATS))
+            resample = st.selectbox("Resampling filter:", list(RESAMPLING_FILTERS), key="batch_resize_filter")
+            workers = st.number_input("Worker processes:", min_value=1, max_value=64, value=DEFAULT_WORKERS,
+                                      key="batch_resize_workers")
         
-        if st.button("�� Process All Images", key="process_all_btn"):
-            if uploaded_files:
-                processed_images = []
-                
-                with st.spinner("Processing images..."):
-                    for i, uploaded_file in enumerate(uploaded_files):
-                        try:
-                            image = Image.open(uploaded_file)
-                            
-                            if maintain_aspect:
-                                # Calculate aspect ratio
-                                aspect_ratio = image.size[0] / image.size[1]
-                                if target_width / target_height > aspect_ratio:
-                                    new_height = target_height
-                                    new_width = int(target_height * aspect_ratio)
-                                else:
-                                    new_width = target_width
-                                    new_height = int(target_width / aspect_ratio)
-                            else:
-                                new_width, new_height = target_width, target_height
-                            
-                            # Resize image
-                            resized_image = image.resize((new_width, new_height))
-                            
-                            # Save to bytes
-                            import io
-                            img_byte_arr = io.BytesIO()
-                            
-                            if output_format == "JPEG":
-                                resized_image.save(img_byte_arr, format='JPEG', quality=quality)
-                                file_ext = "jpg"
-                            else:
-                                resized_image.save(img_byte_arr, format='PNG')
-                                file_ext = "png"
-                            
-                            img_byte_arr.seek(0)
-                            processed_images.append((img_byte_arr, f"resized_{i+1}.{file_ext}"))
-                            
-                        except Exception as e:
-                            st.error(f"Error processing {uploaded_file.name}: {str(e)}")
-                
-                if processed_images:
-                    st.success(f"✅ {len(processed_images)} images processed successfully!")
-                    
-                    # Download all images
-                    for img_bytes, filename in processed_images:
-                        st.download_button(
-                            label=f"📥 Download {filename}",
-                            data=img_bytes.getvalue(),
-                            file_name=filename,
-                            mime=f"image/{file_ext}"
-                        )
+        if st.button("🚀 Process All Images", key="process_all_btn"):
+            # Spooled to disk in chunks; workers open the files themselves
+            spooled = spooled_paths(uploaded_files, "batch_resize_spool")
+            items = [(f.name, path) for f, path in zip(uploaded_files, spooled)]
+            # Unique per run; swept with the other scratch files if the session never comes back
+            zip_path = scratch_path("resized_", ".zip")
+            
+            status = st.empty()
+            progress_bar = st.progress(0.0)
+            
+            def report_progress(done, total, rate):
+                progress_bar.progress(done / total)
+                status.info(f"⏳ {done}/{total} images, {rate:.1f} images/s")
+            
+            try:
+                result = resize_to_zip(items, zip_path, (int(target_width), int(target_height)),
+                                       keep_aspect=maintain_aspect, output_format=output_format, quality=quality,
+                                       resample=RESAMPLING_FILTERS[resample], workers=int(workers),
+                                       progress=report_progress)
+                previous = st.session_state.get("batch_resize_zip")
+                if previous and previous != zip_path and os.path.exists(previous):
+                    os.remove(previous)
+                st.session_state.batch_resize_zip = zip_path
+                st.session_state.batch_resize_result = result
+            except Exception as e:
+                if os.path.exists(zip_path):
+                    os.remove(zip_path)
+                st.error(f"❌ Error processing images: {str(e)}")
+            progress_bar.empty()
+            status.empty()
+        
+        result = st.session_state.get("batch_resize_result")
+        zip_path = st.session_state.get("batch_resize_zip")
+        if result and zip_path and os.path.exists(zip_path):
+            st.success(f"✅ {result['images']} images processed in {result['seconds']:.1f}s "
+                       f"({result['images_per_second']:.1f} images/s)")
+            st.caption(f"{format_bytes(result['input_bytes'])} in, {format_bytes(result['output_bytes'])} out")
+            for name, error in result['errors']:
+                st.error(f"Error processing {name}: {error}")
+            offer_download(zip_path, label="📥 Download All (zip)", key="batch_resize_download_btn")
 
 def python_send_sms():
     """SMS sending application"""
@@ -408,7 +410,8 @@ def python_pdf_to_text():
     
     if uploaded_pdf:
         try:
-            # Read PDF
+            # The upload is already in memory; read it in place rather than copying it to disk
+            uploaded_pdf.seek(0)
             pdf_reader = PyPDF2.PdfReader(uploaded_pdf)
             
             st.success(f"✅ PDF loaded successfully! Pages: {len(pdf_reader.pages)}")
@@ -770,41 +773,38 @@ def python_send_email_app():
             except Exception as e:
                 st.error(f"❌ Error sending email: {str(e)}")
 
+def _set_ram_sample_interval():
+    """Apply an edited sample interval to the shared sampler"""
+    get_ram_sampler().interval = st.session_state.ram_sample_interval
+
 def python_advanced_ram_reader():
     """Advanced RAM monitoring tool"""
     st.subheader("🧠 Advanced RAM Monitor")
     st.markdown("This tool displays real-time memory usage using the **psutil** library.")
 
-    # Helper Functions
-    def log_ram_to_csv(file_name='ram_log.csv'):
-        ram = psutil.virtual_memory()
-        # Create header if file doesn't exist
-        if not os.path.exists(file_name):
-            with open(file_name, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Time", "Total_GB", "Available_GB", "Used_GB", "Usage_%"])
-        # Append data
-        with open(file_name, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                round(ram.total / (1024 ** 3), 2),
-                round(ram.available / (1024 ** 3), 2),
-                round(ram.used / (1024 ** 3), 2),
-                ram.percent
-            ])
-
-    def get_top_memory_processes(n=5):
-        processes = []
-        for p in psutil.process_iter(['name', 'memory_info']):
-            try:
-                # memory_info().rss returns memory usage in bytes
-                processes.append((p.info['name'], p.info['memory_info'].rss))
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-        top = sorted(processes, key=lambda x: x[1], reverse=True)[:n]
-        return top
-
+    # Continuous sampler shared by every session of this server process
+    sampler = get_ram_sampler()
+    
+    if sampler.running():
+        st.success(f"🟢 Logging every {sampler.interval:g}s ({len(sampler.buffer)} samples buffered)")
+    else:
+        st.info("🔴 Background logging is stopped")
+
+    with st.expander("⚙️ Logging settings (affects all users)"):
+        st.caption("The sampler is shared by every session of this server; changes here apply to everyone.")
+        # Only an actual edit changes the shared rate; a rerun never writes this page's value back
+        st.number_input("Sample interval (seconds):", min_value=0.2, max_value=60.0,
+                        value=float(sampler.interval), step=0.5, key="ram_sample_interval",
+                        on_change=_set_ram_sample_interval)
+        confirm = st.checkbox("I understand this starts or stops logging for all users", key="ram_logging_confirm")
+        if sampler.running():
+            if st.button("⏸️ Stop Logging", key="stop_ram_logging_btn", disabled=not confirm):
+                sampler.stop()
+                st.rerun()
+        elif st.button("▶️ Start Logging", key="start_ram_logging_btn", disabled=not confirm):
+            sampler.start()
+            st.rerun()
+    
     # Main App UI
     if 'ram_info' not in st.session_state:
         st.session_state.ram_info = None
@@ -812,11 +812,11 @@ def python_advanced_ram_reader():
     if st.button("�� Refresh RAM Info", key="refresh_ram_btn", use_container_width=True):
         ram = psutil.virtual_memory()
         swap = psutil.swap_memory()
-        top_procs = get_top_memory_processes()
+        # The scanner keeps process handles between refreshes, so growth is since the last click
+        top_procs = get_process_scanner().top(5, by="rss")
         st.session_state.ram_info = {
             "ram": ram, "swap": swap, "top_procs": top_procs
         }
-        log_ram_to_csv() # Log data on each refresh
 
     if st.session_state.ram_info:
         ram = st.session_state.ram_info["ram"]
@@ -834,18 +834,43 @@ def python_advanced_ram_reader():
 
         st.subheader("🔥 Top 5 Memory Consuming Processes")
         df = pd.DataFrame(
-            [(p[0], f"{p[1]/(1024**2):.2f} MB") for p in top_procs],
-            columns=["Process Name", "Memory Usage"]
+            [(p.pid, p.name, f"{p.rss/(1024**2):.2f} MB", f"{p.rss_delta/(1024**2):+.2f} MB") for p in top_procs],
+            columns=["PID", "Process Name", "Memory Usage", "Growth Since Last Refresh"]
         )
         st.table(df)
-
-    # Display historical logs
-    st.subheader("📁 RAM Usage Log (Last 20 Readings)")
-    try:
-        log_df = pd.read_csv("ram_log.csv")
-        st.line_chart(log_df.set_index("Time")[["Used_GB", "Available_GB"]].tail(20))
-    except FileNotFoundError:
-        st.info("No log file found yet. Click 'Refresh RAM Info' to start logging.")
+        leaking = [p for p in top_procs if p.growth_streak >= LEAK_STREAK]
+        for p in leaking:
+            st.warning(f"📈 {p.name} (PID {p.pid}) has grown on {p.growth_streak} refreshes in a row")
+
+    # Display historical logs; only the requested window is read from disk
+    st.subheader("📁 RAM Usage Log")
+    windows = {
+        "Last 20 readings": None,
+        "Last 5 minutes": 300,
+        "Last hour": 3600,
+        "Last 24 hours": 86400,
+        "Last 30 days": 30 * 86400,
+    }
+    window = st.selectbox("Window:", list(windows.keys()), key="ram_log_window")
+    seconds = windows[window]
+    
+    if seconds is None:
+        records = sampler.recent(20)
+        if len(records) < 20:
+            records = sampler.log.read_last(20)
+    else:
+        records = sampler.read_window(time.time() - seconds, max_points=1000)
+    
+    if len(records):
+        log_df = pd.DataFrame({
+            "Time": pd.to_datetime(records["timestamp"], unit="s"),
+            "Used_GB": records["used"] / (1024 ** 3),
+            "Available_GB": records["available"] / (1024 ** 3),
+        })
+        st.line_chart(log_df.set_index("Time")[["Used_GB", "Available_GB"]])
+        st.caption(f"{len(records)} points · log size {sampler.log.size_bytes() / (1024 ** 2):.1f} MB")
+    else:
+        st.info("No samples logged yet. Start logging to build a history.")
 
 def advanced_python_tools_menu():
     """Main advanced Python tools menu"""
@@ -0,0 +1,238 @@
+# Fake Docker daemon on a Unix socket
+#
+# Serves canned Engine API responses so DockerClient can be tested without a
+# real daemon: start a FakeDockerDaemon, point DockerClient(socket_path=...)
+# at its socket, and inspect `requests` afterwards. Keep-alive works as with dockerd.
+import hashlib
+import json
+import os
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, unquote, urlsplit
+
+API_VERSION = "1.43"
+
+def fake_container(number, state="running", image="nginx:latest"):
+    """A /containers/json entry"""
+    container_id = hashlib.sha256(f"container-{number}".encode()).hexdigest()
+    return {
+        "Id": container_id,
+        "Names": [f"/container-{number}"],
+        "Image": image,
+        "State": state,
+        "Status": "Up 5 minutes" if state == "running" else "Exited (0) 1 hour ago",
+        "Ports": [{"IP": "0.0.0.0", "PrivatePort": 80, "PublicPort": 8000 + number, "Type": "tcp"}],
+        "Created": int(time.time()) - 3600,
+    }
+
+def fake_stats(number, tick):
+    """One sample of the /containers/{id}/stats stream"""
+    return {
+        "read": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "cpu_stats": {"cpu_usage": {"total_usage": (tick + 1) * 10_000_000 * (number % 4 + 1)},
+                      "system_cpu_usage": (tick + 1) * 1_000_000_000, "online_cpus": 4},
+        "precpu_stats": {"cpu_usage": {"total_usage": tick * 10_000_000 * (number % 4 + 1)},
+                         "system_cpu_usage": tick * 1_000_000_000, "online_cpus": 4},
+        "memory_stats": {"usage": (50 + number) * 1024 * 1024, "limit": 2 * 1024 ** 3,
+                         "stats": {"inactive_file": 1024 * 1024}},
+        "networks": {"eth0": {"rx_bytes": tick * 1000 * number, "tx_bytes": tick * 500 * number}},
+        "blkio_stats": {"io_service_bytes_recursive": [{"op": "read", "value": tick * 4096},
+                                                       {"op": "write", "value": tick * 8192}]},
+    }
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body=None):
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        daemon = self.server.fake_daemon
+        parts = urlsplit(self.path)
+        path = re.sub(r"^/v[\d.]+", "", unquote(parts.path))
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        with daemon.lock:
+            daemon.requests.append((method, path, query, body))
+        if daemon.latency:
+            time.sleep(daemon.latency)
+
+        stats = re.fullmatch(r"/containers/([^/]+)/stats", path)
+        if method == "GET" and stats:
+            self._stream_stats(stats.group(1), query.get("stream", "1") not in ("0", "false"))
+            return
+        for (route_method, pattern), handler in daemon.routes.items():
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                status, response = handler(query, body, *match.groups())
+                self._reply(status, response)
+                return
+        self._reply(404, {"message": f"page not found: {method} {path}"})
+
+    def _stream_stats(self, container, stream):
+        daemon = self.server.fake_daemon
+        number = daemon.container_number(container)
+        if number is None:
+            self._reply(404, {"message": f"No such container: {container}"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tick = 0
+        try:
+            while True:
+                line = json.dumps(fake_stats(number, tick)).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+                tick += 1
+                if not stream or daemon.stopped.wait(daemon.stats_interval):
+                    break
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        # A one-shot sample ends cleanly and keeps the connection, as with dockerd
+        self.close_connection = bool(stream)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeDockerDaemon:
+    """Threaded fake dockerd serving containers, images, networks and volumes"""
+
+    def __init__(self, socket_path, containers=10, networks=3, volumes=5, latency=0.0, stats_interval=1.0):
+        self.socket_path = socket_path
+        self.latency = latency
+        self.stats_interval = stats_interval
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.requests = []
+        self.containers = [fake_container(i, "running" if i % 3 else "exited") for i in range(1, containers + 1)]
+        self.images = [{"Id": "sha256:" + hashlib.sha256(f"image-{i}".encode()).hexdigest(), "RepoTags": [f"app{i}:latest"], "Size": i * 10_000_000,
+                        "Created": int(time.time()) - i * 86400} for i in range(1, 4)]
+        self.networks = {f"net-{i}": {"Name": f"net-{i}", "Id": hashlib.sha256(f"net-{i}".encode()).hexdigest(), "Driver": "bridge", "Scope": "local",
+                                      "IPAM": {"Config": [{"Subnet": f"172.{18 + i}.0.0/16"}]},
+                                      "Containers": {}, "Options": {}, "Labels": {}}
+                         for i in range(networks)}
+        self.volumes = {f"volume-{i}": {"Name": f"volume-{i}", "Driver": "local", "Mountpoint":
+                                        f"/var/lib/docker/volumes/volume-{i}/_data",
+                                        "CreatedAt": "2024-01-01T00:00:00Z", "Labels": {}, "Scope": "local"}
+                        for i in range(volumes)}
+        self.routes = {
+            ("GET", r"/version"): lambda q, b: (200, {"Version": "24.0.0", "ApiVersion": API_VERSION}),
+            ("GET", r"/containers/json"): self._list_containers,
+            ("POST", r"/containers/([^/]+)/(start|stop|restart|pause|unpause|kill)"): self._container_action,
+            ("DELETE", r"/containers/([^/]+)"): self._remove_container,
+            ("GET", r"/images/json"): lambda q, b: (200, self.images),
+            ("POST", r"/images/prune"): lambda q, b: (200, {"ImagesDeleted": None, "SpaceReclaimed": 0}),
+            ("GET", r"/networks"): lambda q, b: (200, [dict(n, Containers=None) for n in self.networks.values()]),
+            ("GET", r"/networks/([^/]+)"): lambda q, b, name: self._lookup(self.networks, name, "network"),
+            ("POST", r"/networks/create"): self._create_network,
+            ("DELETE", r"/networks/([^/]+)"): lambda q, b, name: self._delete(self.networks, name, "network"),
+            ("GET", r"/volumes"): lambda q, b: (200, {"Volumes": list(self.volumes.values()), "Warnings": None}),
+            ("GET", r"/volumes/([^/]+)"): lambda q, b, name: self._lookup(self.volumes, name, "volume"),
+            ("POST", r"/volumes/create"): self._create_volume,
+            ("DELETE", r"/volumes/([^/]+)"): lambda q, b, name: self._delete(self.volumes, name, "volume"),
+        }
+        self._server = None
+
+    def _find(self, ref):
+        return next((c for c in self.containers if c["Id"].startswith(ref) or f"/{ref}" in c["Names"]), None)
+
+    def container_number(self, ref):
+        container = self._find(ref)
+        return int(container["Names"][0].rsplit("-", 1)[1]) if container else None
+
+    def _list_containers(self, query, body):
+        if query.get("all") in ("1", "true"):
+            return 200, self.containers
+        return 200, [c for c in self.containers if c["State"] == "running"]
+
+    def _container_action(self, query, body, ref, action):
+        container = self._find(ref)
+        if container is None:
+            return 404, {"message": f"No such container: {ref}"}
+        states = {"start": "running", "restart": "running", "unpause": "running",
+                  "stop": "exited", "kill": "exited", "pause": "paused"}
+        container["State"] = states[action]
+        return 204, None
+
+    def _remove_container(self, query, body, ref):
+        container = self._find(ref)
+        if container is None:
+            return 404, {"message": f"No such container: {ref}"}
+        if container["State"] == "running" and query.get("force") not in ("1", "true"):
+            return 409, {"message": "You cannot remove a running container. Stop the container before "
+                                    "attempting removal or force remove"}
+        self.containers.remove(container)
+        return 204, None
+
+    def _lookup(self, table, name, kind):
+        item = table.get(name) or next((v for v in table.values() if v.get("Id", "").startswith(name)), None)
+        return (200, item) if item else (404, {"message": f"{kind} {name} not found"})
+
+    def _delete(self, table, name, kind):
+        if name not in table:
+            return 404, {"message": f"{kind} {name} not found"}
+        del table[name]
+        return 204, None
+
+    def _create_network(self, query, body):
+        name = body["Name"]
+        if name in self.networks:
+            return 409, {"message": f"network with name {name} already exists"}
+        self.networks[name] = {"Name": name, "Id": hashlib.sha256(name.encode()).hexdigest(), "Driver": body.get("Driver", "bridge"),
+                               "Scope": "local", "IPAM": {"Config": []}, "Containers": {}, "Options": {},
+                               "Labels": {}}
+        return 201, {"Id": self.networks[name]["Id"], "Warning": ""}
+
+    def _create_volume(self, query, body):
+        name = body["Name"]
+        self.volumes.setdefault(name, {"Name": name, "Driver": "local", "Mountpoint":
+                                       f"/var/lib/docker/volumes/{name}/_data", "CreatedAt":
+                                       "2024-01-01T00:00:00Z", "Labels": {}, "Scope": "local"})
+        return 201, self.volumes[name]
+
+    def start(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = socketserver.ThreadingUnixStreamServer(self.socket_path, _FakeHandler)
+        server.daemon_threads = True
+        server.fake_daemon = self
+        threading.Thread(target=server.serve_forever, name="fake-dockerd", daemon=True).start()
+        self._server = server
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
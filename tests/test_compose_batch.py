@@ -0,0 +1,67 @@
+# Ordering and scheduling of multi-project compose runs
+import sys
+
+import pytest
+
+from core.compose_batch import ComposeBatch, run_order
+from core.compose_index import ComposeProject
+
+def project(name, depends_on=(), root="/srv"):
+    directory = f"{root}/{name}"
+    return ComposeProject(name, f"{directory}/compose.yaml", directory, ["web"], list(depends_on), None)
+
+def test_waits_follow_declared_dependencies():
+    db, api, web = project("db"), project("api", ["db"]), project("web", ["api", "db"])
+    waits = run_order([db, api, web])
+    assert waits == {db.path: set(), api.path: {db.path}, web.path: {api.path, db.path}}
+
+def test_reverse_order_stops_dependents_first():
+    db, api = project("db"), project("api", ["db"])
+    assert run_order([db, api], reverse=True) == {db.path: {api.path}, api.path: set()}
+
+def test_dependencies_outside_the_batch_are_ignored():
+    api = project("api", ["db", "api"])
+    assert run_order([api]) == {api.path: set()}
+
+def test_cycles_are_rejected():
+    with pytest.raises(ValueError, match="a, b"):
+        run_order([project("a", ["c"]), project("b", ["a"]), project("c", ["b"]), project("d")])
+
+@pytest.fixture
+def fake_compose(tmp_path):
+    # Stands in for docker-compose: fails for projects whose directory has a "fail" file
+    script = tmp_path / "fake_compose.py"
+    script.write_text(
+        "import os, sys\n"
+        "path = sys.argv[2]\n"
+        "print('running', ' '.join(sys.argv[3:]))\n"
+        "sys.exit(1 if os.path.exists(os.path.join(os.path.dirname(path), 'fail')) else 0)\n")
+    return f"{sys.executable} {script}"
+
+def make_projects(tmp_path, specs):
+    projects = []
+    for name, depends_on in specs:
+        (tmp_path / name).mkdir()
+        projects.append(project(name, depends_on, root=str(tmp_path)))
+    return projects
+
+def test_batch_runs_projects_and_skips_dependents_of_failures(tmp_path, fake_compose):
+    db, api, web, cache = make_projects(tmp_path, [("db", []), ("api", ["db"]), ("web", ["api"]), ("cache", [])])
+    (tmp_path / "api" / "fail").touch()
+    batch = ComposeBatch([db, api, web, cache], "up -d", max_workers=2, compose_command=fake_compose)
+    assert batch.start().wait(timeout=30)
+
+    status = {run.project.name: run.status for run in batch.runs.values()}
+    assert status == {"db": "ok", "api": "failed", "web": "skipped", "cache": "ok"}
+    assert list(batch.runs[db.path].lines) == ["running up -d"]
+    assert batch.runs[db.path].finished <= batch.runs[api.path].started
+    summary = batch.summary()
+    assert summary["counts"] == {"ok": 2, "failed": 1, "skipped": 1}
+
+def test_cancel_before_start_spawns_nothing(tmp_path, fake_compose):
+    projects = make_projects(tmp_path, [(f"p{i}", []) for i in range(4)])
+    batch = ComposeBatch(projects, "up -d", max_workers=1, compose_command=fake_compose)
+    batch.cancel()
+    assert batch.start().wait(timeout=30)
+    assert {run.status for run in batch.runs.values()} == {"cancelled"}
+    assert all(run.started is None for run in batch.runs.values())
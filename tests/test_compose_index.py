@@ -0,0 +1,62 @@
+# Compose file parsing and project discovery
+import os
+
+from core.compose_index import ComposeIndex, parse_compose_file
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+    return str(path)
+
+def test_parses_name_services_and_dependencies(tmp_path):
+    path = write(tmp_path / "Shop" / "compose.yaml",
+                 "name: shop\nx-depends-on: [db, cache]\nservices:\n  web: {image: nginx}\n  worker: {}\n")
+    project = parse_compose_file(path)
+    assert project.name == "shop"
+    assert project.services == ["web", "worker"]
+    assert project.depends_on == ["db", "cache"]
+    assert project.error is None
+
+def test_defaults_to_lowercased_directory_name(tmp_path):
+    project = parse_compose_file(write(tmp_path / "Billing" / "docker-compose.yml",
+                                       "services:\n  api: {}\nx-depends-on: db\n"))
+    assert project.name == "billing"
+    assert project.depends_on == ["db"]
+
+def test_invalid_yaml_is_kept_as_an_error(tmp_path):
+    project = parse_compose_file(write(tmp_path / "broken" / "compose.yaml", "services: [\n"))
+    assert project.services == []
+    assert project.error
+
+def test_invalid_dependencies_are_kept_as_an_error(tmp_path):
+    for value in ("5", "{a: b}", "[db, 3]"):
+        project = parse_compose_file(write(tmp_path / "app" / "compose.yaml",
+                                           f"x-depends-on: {value}\nservices:\n  web: {{}}\n"))
+        assert project.depends_on == []
+        assert "x-depends-on" in project.error
+        assert project.services == ["web"]
+
+def test_scan_skips_excluded_directories_and_prefers_compose_yaml(tmp_path):
+    write(tmp_path / "a" / "docker-compose.yml", "services:\n  old: {}\n")
+    write(tmp_path / "a" / "compose.yaml", "services:\n  new: {}\n")
+    write(tmp_path / "b" / "deep" / "compose.yml", "services:\n  b: {}\n")
+    write(tmp_path / "node_modules" / "pkg" / "compose.yaml", "services:\n  hidden: {}\n")
+    write(tmp_path / ".git" / "compose.yaml", "services:\n  hidden: {}\n")
+    index = ComposeIndex([str(tmp_path)], [".git", "node_modules"])
+    projects = index.projects()
+    assert [p.services for p in projects] == [["new"], ["b"]]
+
+def test_rerun_uses_cached_scan_and_reparses_changed_files(tmp_path):
+    path = write(tmp_path / "app" / "compose.yaml", "services:\n  web: {}\n")
+    index = ComposeIndex([str(tmp_path)], [])
+    assert index.projects()[0].services == ["web"]
+    scanned_at = index.scanned_at
+
+    # New files are only found by a rescan
+    write(tmp_path / "other" / "compose.yaml", "services:\n  x: {}\n")
+    write(path, "services:\n  web: {}\n  db: {}\n")
+    projects = index.projects()
+    assert index.scanned_at == scanned_at
+    assert [p.services for p in projects] == [["web", "db"]]
+    assert len(index.projects(rescan=True)) == 2
@@ -0,0 +1,55 @@
+# DirectoryIndex incremental refresh
+import os
+import time
+
+from core.dir_index import SORT_KEYS, DirectoryIndex
+
+def write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("x" * size)
+
+def full_view(index):
+    return sorted((e for node in index._nodes.values() for e in node.entries), key=lambda e: e.path)
+
+def assert_matches_full_sort(index):
+    expected = full_view(index)
+    assert index.entries() == expected
+    assert index.files() == [e.path for e in expected if not e.is_dir]
+    assert index.folders() == [e.path for e in expected if e.is_dir]
+    for sort_by in SORT_KEYS:
+        for descending in (False, True):
+            assert index.entries(sort_by=sort_by, descending=descending) == \
+                sorted(expected, key=SORT_KEYS[sort_by], reverse=descending)
+
+def test_changed_directory_is_merged_without_a_full_rebuild(tmp_path, monkeypatch):
+    for d in range(5):
+        for f in range(10):
+            write(str(tmp_path / f"d{d}" / f"f{f}"), d * 10 + f)
+    index = DirectoryIndex(str(tmp_path), min_refresh_interval=0)
+    index.refresh()
+    # Cache the size and mtime orderings so the merge has to keep them in step
+    index.entries(sort_by="size", descending=True)
+    index.entries(sort_by="mtime")
+
+    rebuilds = []
+    monkeypatch.setattr(index, "_rebuild", lambda: rebuilds.append(1))
+    time.sleep(0.01)
+    write(str(tmp_path / "d2" / "new"), 1000)
+    os.remove(str(tmp_path / "d3" / "f0"))
+    write(str(tmp_path / "d1" / "f5"), 3)
+    index.invalidate("d1")
+
+    assert index.refresh()
+    assert rebuilds == []
+    assert index.rescanned_dirs == 3
+    assert "d2/new" in index.files() and "d3/f0" not in index.files()
+    assert_matches_full_sort(index)
+
+def test_nothing_changed_returns_false(tmp_path):
+    write(str(tmp_path / "a" / "b"), 1)
+    index = DirectoryIndex(str(tmp_path), min_refresh_interval=0)
+    assert index.refresh()
+    assert not index.refresh()
+    index.invalidate("a")
+    assert not index.refresh()
@@ -0,0 +1,120 @@
+# DockerClient against the fake daemon in tests/fake_docker.py
+import http.client
+
+import pytest
+
+from core.docker_api import DockerAPIError, DockerClient, container_rows
+from fake_docker import API_VERSION, FakeDockerDaemon
+
+@pytest.fixture
+def daemon(tmp_path):
+    with FakeDockerDaemon(str(tmp_path / "docker.sock"), containers=6, stats_interval=0.05) as fake:
+        yield fake
+
+@pytest.fixture
+def client(daemon):
+    client = DockerClient(socket_path=daemon.socket_path)
+    yield client
+    client.close()
+
+def test_lists_containers(client, daemon):
+    everything = client.containers(all=True)
+    running = client.containers(all=False)
+    assert len(everything) == 6
+    assert {c["State"] for c in running} == {"running"}
+    assert len(running) == 4
+    rows = container_rows(everything)
+    assert rows[0]["Name"] == "container-1"
+    assert rows[0]["Ports"] == "0.0.0.0:8001->80/tcp"
+
+def test_pins_api_version_before_first_request(client, daemon):
+    client.images()
+    client.images()
+    paths = [path for _, path, _, _ in daemon.requests]
+    assert paths == ["/version", "/images/json", "/images/json"]
+    assert client._prefix == f"/v{API_VERSION}"
+
+def test_error_status_raises_with_daemon_message(client):
+    container = client.containers(all=False)[0]["Id"]
+    with pytest.raises(DockerAPIError) as error:
+        client.remove_container(container)
+    assert error.value.status == 409
+    assert "cannot remove a running container" in error.value.message
+
+    with pytest.raises(DockerAPIError) as error:
+        client.container_action("no-such-container", "start")
+    assert error.value.status == 404
+
+def test_successful_action_returns_none(client):
+    container = client.containers(all=False)[0]["Id"]
+    assert client.container_action(container, "stop") is None
+    states = {c["Id"]: c["State"] for c in client.containers(all=True)}
+    assert states[container] == "exited"
+
+def test_keep_alive_reuses_one_connection(client):
+    opened = []
+    open_socket = client._open_socket
+
+    def counting_open(timeout):
+        opened.append(timeout)
+        return open_socket(timeout)
+
+    client._open_socket = counting_open
+    for _ in range(10):
+        client.networks()
+    assert len(opened) == 1
+    assert len(client._idle) == 1
+
+class DroppedConnection:
+    """Takes the request, then the daemon hangs up before answering"""
+
+    def __init__(self, sent):
+        self.sent = sent
+
+    def request(self, method, url, body=None, headers=None):
+        self.sent.append((method, url))
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected("Remote end closed connection without response")
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def dropping_client():
+    client = DockerClient(socket_path="/nonexistent/docker.sock")
+    client._prefix = "/v1.43"
+    client.sent = []
+    client._checkout = lambda fresh=False: DroppedConnection(client.sent)
+    return client
+
+def test_get_is_resent_once_after_a_dropped_connection(dropping_client):
+    with pytest.raises(http.client.RemoteDisconnected):
+        dropping_client.request("GET", "/networks")
+    assert dropping_client.sent == [("GET", "/v1.43/networks")] * 2
+
+def test_post_is_not_resent_after_it_went_out(dropping_client):
+    with pytest.raises(http.client.RemoteDisconnected):
+        dropping_client.request("POST", "/containers/web/stop")
+    assert dropping_client.sent == [("POST", "/v1.43/containers/web/stop")]
+
+def test_close_idle_drops_expired_connections(client):
+    client.volumes()
+    assert len(client._idle) == 1
+    client.close_idle(max_age=0)
+    assert client._idle == []
+    # The next request simply opens a new connection
+    assert len(client.volumes()) == 5
+
+def test_stream_yields_stats_documents(client):
+    container = client.containers(all=False)[0]["Id"]
+    stream = client.stream(f"/containers/{container}/stats", {"stream": 1})
+    first, second = next(stream), next(stream)
+    stream.close()
+    assert first["memory_stats"]["usage"] > 0
+    assert second["cpu_stats"]["cpu_usage"]["total_usage"] > first["cpu_stats"]["cpu_usage"]["total_usage"]
+
+def test_stream_error_raises_before_yielding(client):
+    with pytest.raises(DockerAPIError) as error:
+        next(client.stream("/containers/missing/stats"))
+    assert error.value.status == 404
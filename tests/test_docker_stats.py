@@ -0,0 +1,38 @@
+# Polling stats from a remote-style host against the fake daemon
+import pytest
+
+from core.docker_api import DockerClient
+from core.docker_stats import POLL_INTERVAL, POLL_MAX_WORKERS, ContainerStatsMonitor
+from fake_docker import FakeDockerDaemon
+
+@pytest.fixture
+def monitor(tmp_path):
+    with FakeDockerDaemon(str(tmp_path / "docker.sock"), containers=10) as daemon:
+        monitor = ContainerStatsMonitor(DockerClient(socket_path=daemon.socket_path))
+        # Poll the way an SSH host is polled, over the local socket
+        monitor.polled = True
+        monitor.poll_client = DockerClient(socket_path=daemon.socket_path, max_idle=POLL_MAX_WORKERS)
+        monitor.discover()
+        yield monitor
+        monitor.stop()
+
+def test_poll_uses_one_kept_alive_connection_per_worker(monitor):
+    opened = []
+    open_socket = monitor.poll_client._open_socket
+
+    def counting_open(timeout):
+        opened.append(timeout)
+        return open_socket(timeout)
+
+    monitor.poll_client._open_socket = counting_open
+    for _ in range(3):
+        monitor.poll()
+    assert monitor.poll_workers == POLL_MAX_WORKERS
+    assert len(opened) <= POLL_MAX_WORKERS
+    assert len(monitor.snapshot()) == len(monitor.streams) > 0
+
+def test_sample_interval_reports_slow_passes(monitor):
+    monitor.poll_seconds = 0.1
+    assert monitor.sample_interval() == POLL_INTERVAL
+    monitor.poll_seconds = POLL_INTERVAL * 3
+    assert monitor.sample_interval() == POLL_INTERVAL * 3
@@ -0,0 +1,101 @@
+# SSHConnectionPool sharing and channel cleanup, with the SSH handshake replaced
+import socket
+import threading
+import time
+
+import pytest
+
+from core.ssh_pool import SSHConnectionPool
+
+class FakeTransport:
+    def is_active(self):
+        return True
+
+class FakeChannel:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeStream:
+    def __init__(self, channel, data=b"", error=None):
+        self.channel = channel
+        self.data = data
+        self.error = error
+
+    def read(self):
+        if self.error:
+            raise self.error
+        return self.data
+
+class FakeClient:
+    def __init__(self, error=None):
+        self.error = error
+        self.channels = []
+
+    def get_transport(self):
+        return FakeTransport()
+
+    def exec_command(self, command, timeout=None):
+        channel = FakeChannel()
+        self.channels.append(channel)
+        return None, FakeStream(channel, b"out", self.error), FakeStream(channel)
+
+    def close(self):
+        pass
+
+class FakePool(SSHConnectionPool):
+    """Counts handshakes instead of opening real transports"""
+
+    def __init__(self, handshake_seconds=0.0, error=None, **kwargs):
+        super().__init__(**kwargs)
+        self.handshake_seconds = handshake_seconds
+        self.error = error
+        self.clients = []
+
+    def _connect(self, host, port, username, password):
+        time.sleep(self.handshake_seconds)
+        client = FakeClient(self.error)
+        self.clients.append(client)
+        return client
+
+def test_concurrent_first_requests_share_one_transport():
+    pool = FakePool(handshake_seconds=0.2)
+    conns = []
+    threads = [threading.Thread(target=lambda: conns.append(pool.acquire("h", 22, "u", "pw"))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(pool.clients) == 1
+    assert {id(conn) for conn in conns} == {id(conns[0])}
+    assert conns[0].active_channels == 6
+
+def test_failed_handshake_clears_the_connecting_marker():
+    pool = FakePool()
+    pool._connect = lambda *args: (_ for _ in ()).throw(OSError("refused"))
+    with pytest.raises(OSError):
+        pool.acquire("h", 22, "u", "pw")
+    assert pool._connecting == {}
+
+def test_exec_command_closes_the_channel():
+    pool = FakePool()
+    assert pool.exec_command("h", 22, "u", "pw", "uptime") == ("out", "")
+    assert pool.clients[0].channels[0].closed
+
+def test_exec_command_closes_the_channel_on_timeout():
+    pool = FakePool(error=socket.timeout())
+    with pytest.raises(socket.timeout):
+        pool.exec_command("h", 22, "u", "pw", "sleep 60")
+    assert pool.clients[0].channels[0].closed
+    assert pool.stats()[0]["active_channels"] == 0
+
+def test_fleet_run_closes_the_channel_on_timeout(monkeypatch):
+    from core import ssh_fleet
+
+    pool = FakePool(error=socket.timeout())
+    monkeypatch.setattr(ssh_fleet, "ssh_pool", pool)
+    result = ssh_fleet.run_on_host({"host": "h", "port": 22, "username": "u"}, "sleep 60", "pw", timeout=1)
+    assert result["status"] == "timeout"
+    assert pool.clients[0].channels[0].closed
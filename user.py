@@ -1,10 +1,11 @@
 # User page module
 import streamlit as st
 import os
-import json
-from datetime import datetime
+import html
+import time
 from dotenv import load_dotenv, dotenv_values
 import os.path
+from core.history_store import get_history_store
 
 # Apply custom CSS for purple background and white text in selection lists
 st.markdown("""
@@ -63,16 +64,12 @@ ul[data-baseweb="menu"] li:hover {
 # Path to the .env file
 ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
 
-# Path to store user history
-HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'user_history.json')
-
-# Ensure the data directory exists
-os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
-
-# Initialize history file if it doesn't exist
-if not os.path.exists(HISTORY_PATH):
-    with open(HISTORY_PATH, 'w') as f:
-        json.dump([], f)
+HISTORY_PERIODS = {
+    "All time": None,
+    "Last 24 hours": 86400,
+    "Last 7 days": 7 * 86400,
+    "Last 30 days": 30 * 86400,
+}
 
 def load_env_variables():
     """Load environment variables from .env file"""
@@ -88,32 +85,11 @@ def save_env_variables(env_vars):
 
 def add_to_history(category, action):
     """Add an action to the user history"""
-    try:
-        with open(HISTORY_PATH, 'r') as f:
-            history = json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        history = []
-    
-    history.append({
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "category": category,
-        "action": action
-    })
-    
-    # Keep only the last 50 actions
-    if len(history) > 50:
-        history = history[-50:]
-    
-    with open(HISTORY_PATH, 'w') as f:
-        json.dump(history, f, indent=4)
+    get_history_store().record(category, action)
 
-def load_history():
-    """Load user history from file"""
-    try:
-        with open(HISTORY_PATH, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+def load_history(limit=50):
+    """Load the most recent user history entries, oldest first"""
+    return list(reversed(get_history_store().query(limit=limit)))
 
 def show_user_dashboard():
     """Show the user dashboard"""
@@ -318,63 +294,76 @@ def show_history():
     </div>
     """, unsafe_allow_html=True)
     
-    # Load user history
-    history = load_history()
+    store = get_history_store()
     
-    if not history:
+    # Filters run as indexed queries, so only the visible page is loaded
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        category = st.selectbox("Category:", ["All"] + store.categories(), key="history_category_select")
+    with col2:
+        period = st.selectbox("Period:", list(HISTORY_PERIODS), key="history_period_select")
+    with col3:
+        page_size = st.selectbox("Rows per page:", [25, 50, 100, 250], index=1, key="history_page_size")
+    
+    category = None if category == "All" else category
+    seconds = HISTORY_PERIODS[period]
+    start = time.time() - seconds if seconds else None
+    total = store.count(category, start)
+    
+    if not total:
         st.info("No activity history found.")
         return
     
+    pages = (total + page_size - 1) // page_size
+    if st.session_state.get("history_page_input", 1) > pages:
+        st.session_state.history_page_input = 1
+    page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, value=1, key="history_page_input")
+    history = store.query(category, start, limit=page_size, offset=(page - 1) * page_size)
+    
     # Display history in a table with custom styling
-    st.markdown("""
+    rows = "".join(
+        f"<tr><td>{html.escape(item['timestamp'])}</td><td>{html.escape(item['category'])}</td>"
+        f"<td>{html.escape(item['action'])}</td></tr>"
+        for item in history  # Newest first
+    )
+    st.markdown(f"""
     <style>
-    .history-table {
+    .history-table {{
         width: 100%;
         border-collapse: collapse;
         margin-bottom: 20px;
-    }
-    .history-table th {
+    }}
+    .history-table th {{
         background-color: #6a0dad;
         color: white;
         padding: 12px;
         text-align: left;
-    }
-    .history-table td {
+    }}
+    .history-table td {{
         padding: 10px;
         border-bottom: 1px solid #ddd;
-    }
-    .history-table tr:nth-child(even) {
+    }}
+    .history-table tr:nth-child(even) {{
         background-color: #f9f9f9;
-    }
-    .history-table tr:hover {
+    }}
+    .history-table tr:hover {{
         background-color: #f1f1f1;
-    }
+    }}
     </style>
-    
     <table class="history-table">
         <tr>
             <th>Timestamp</th>
             <th>Category</th>
             <th>Action</th>
         </tr>
+        {rows}
+    </table>
     """, unsafe_allow_html=True)
-    
-    # Add each history item to the table
-    for item in reversed(history):  # Show newest first
-        st.markdown(f"""
-        <tr>
-            <td>{item['timestamp']}</td>
-            <td>{item['category']}</td>
-            <td>{item['action']}</td>
-        </tr>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("</table>", unsafe_allow_html=True)
+    st.caption(f"Showing {len(history)} of {total} entries")
     
     # Add button to clear history
     if st.button("Clear History"):
-        with open(HISTORY_PATH, 'w') as f:
-            json.dump([], f)
+        store.clear()
         st.success("History cleared successfully!")
         st.experimental_rerun()
 